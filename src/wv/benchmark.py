@@ -0,0 +1,181 @@
+"""
+組織マッチングの各処理の実行時間を計測するベンチマークスクリプト。
+
+架空の組織データをユーザー数ごとに生成して各処理を計測し、
+結果をJSON Lines形式で追記する。バージョン間で結果を比較して性能の劣化を検出する。
+
+使い方:
+    python benchmark.py --sizes 1000 10000 100000 --output benchmark_results.jsonl
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from export_to_excel import export_to_excel
+from main import load_config
+from membership_index import build_membership_indexes
+from organization_processor import OrganizationProcessor
+from streaming_ingest import DEFAULT_CHUNK_ROWS, build_membership_indexes_from_files  # noqa: E501
+from synthetic_data import generate_month_pair
+
+
+def get_git_revision() -> str:
+    """
+    計測対象のgitリビジョンを取得する関数。
+
+    Returns:
+        str: コミットハッシュ。取得できない場合は空文字。
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def measure(func, repeat: int) -> tuple[float, object]:
+    """
+    関数を繰り返し実行し、最短の実行時間を計測する関数。
+
+    Args:
+        func (Callable): 計測する関数。
+        repeat (int): 繰り返し回数。
+
+    Returns:
+        tuple[float, object]: 最短の実行秒数と最後の戻り値。
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(
+    n_users: int, config: dict, repeat: int = 1, seed: int = 0
+) -> list[dict]:
+    """
+    1つのデータ規模について各処理の実行時間を計測する関数。
+
+    Args:
+        n_users (int): ユーザー数。
+        config (dict): 組織マッチングの設定辞書。
+        repeat (int): 繰り返し回数。
+        seed (int): データ生成の乱数シード。
+
+    Returns:
+        list[dict]: 処理ごとの計測結果のリスト。
+    """
+    df_A, df_B = generate_month_pair(n_users, depth=4, seed=seed)
+    processor = OrganizationProcessor(config)
+    records = []
+
+    def record(stage: str, seconds: float, rows: int) -> None:
+        records.append({"stage": stage, "seconds": seconds, "rows": rows})
+
+    with tempfile.TemporaryDirectory() as directory:
+        # ファイル入力の経路と同じく、CSVを分割して読み込みながら所属インデックスを作成する
+        prev_file = os.path.join(directory, "prev.csv")
+        curr_file = os.path.join(directory, "curr.csv")
+        df_A.to_csv(prev_file, index=False)
+        df_B.to_csv(curr_file, index=False)
+        seconds, indexes = measure(
+            lambda: build_membership_indexes_from_files(
+                prev_file, curr_file, DEFAULT_CHUNK_ROWS
+            ),
+            repeat,
+        )
+    record("build_membership_indexes_from_files", seconds, len(df_A) + len(df_B))  # noqa: E501
+
+    seconds, indexes = measure(
+        lambda: build_membership_indexes(df_A, df_B), repeat
+    )
+    record("build_membership_indexes", seconds, len(indexes[0]) + len(indexes[1]))  # noqa: E501
+
+    seconds, df_scores = measure(
+        lambda: processor.score_prev_orgs(indexes[0], indexes[1]), repeat
+    )
+    record("score_prev_orgs", seconds, len(df_scores))
+
+    seconds, df_results = measure(
+        lambda: processor.calculate_and_update_organization_scores(df_A, df_B),  # noqa: E501
+        repeat,
+    )
+    record("calculate_and_update_organization_scores", seconds, len(df_results))  # noqa: E501
+
+    seconds, _ = measure(
+        lambda: processor.update_organization_matches(df_results.copy()), repeat  # noqa: E501
+    )
+    record("update_organization_matches", seconds, len(df_results))
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "benchmark.xlsx")
+        seconds, _ = measure(
+            lambda: export_to_excel(df_results, file_path), repeat
+        )
+    record("export_to_excel", seconds, len(df_results))
+
+    for item in records:
+        item.update(
+            {
+                "n_users": n_users,
+                "n_orgs_prev": len(indexes[0]),
+                "n_orgs_curr": len(indexes[1]),
+            }
+        )
+    return records
+
+
+def main():
+    """
+    メイン関数。コマンドライン引数に従ってベンチマークを実行し、結果を追記する。
+    """
+    parser = argparse.ArgumentParser(description="組織マッチングのベンチマーク")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="計測するユーザー数",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="繰り返し回数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.jsonl",
+        help="結果を追記するJSON Linesファイル",
+    )
+    args = parser.parse_args()
+
+    config = load_config()
+    run_info = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": get_git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "engine": config.get("processing", {}).get("engine", "python"),
+    }
+
+    with open(args.output, "a", encoding="utf-8") as file:
+        for n_users in args.sizes:
+            for item in run_benchmark(n_users, config, args.repeat, args.seed):
+                item.update(run_info)
+                file.write(json.dumps(item, ensure_ascii=False) + "\n")
+                print(f"{item['stage']:<45} n_users={n_users:>7} {item['seconds']:.3f}s")  # noqa: E501
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@
 メインスクリプト。
 """
 
-import pandas as pd
+from confirmation_journal import DEFAULT_CHECKPOINT_INTERVAL, ConfirmationJournal  # noqa: E501
+from input_cache import read_excel_cached
 from integrity_check import check_results_integrity
+from main import load_config
 from prepare_data import prepare_update_data
+from review_store import ReviewStore
+from run_report import RunReport, get_report_path
 from simulate_updates import simulate_updates_with_hierarchy
 from update_results import update_results_with_confirmation
 
@@ -13,25 +17,70 @@ def main():
     """
     メイン関数。データの準備、整合性チェック、結果の更新、および更新シミュレーションを行う。
     """
+    output_path = "update_data.xlsx"
+    processing = load_config().get("processing", {})
+    report = RunReport(
+        processing.get("run_report", False),
+        processing.get("run_report_trace_memory", False),
+    )
+
     # データの準備
-    confirmed_df = pd.read_excel("confirmed_data.xlsx")
-    prev_df = pd.read_excel("prev_month_orgs.xlsx")
-    curr_df = pd.read_excel("curr_month_orgs.xlsx")
+    # 入力は内容が変わらない限り列指向形式のキャッシュから読み込む
+    with report.stage("read_inputs") as stage:
+        confirmed_df = read_excel_cached("confirmed_data.xlsx")
+        prev_df = read_excel_cached("prev_month_orgs.xlsx")
+        curr_df = read_excel_cached("curr_month_orgs.xlsx")
+        stage["rows"] = len(confirmed_df) + len(prev_df) + len(curr_df)
 
     # データの整合性チェック
-    checked_df = check_results_integrity("unchecked_data.xlsx")
+    with report.stage("check_results_integrity") as stage:
+        checked_df = check_results_integrity("unchecked_data.xlsx")
+        stage["rows"] = len(checked_df)
+
+    # 確認結果を保存し、翌月に所属が変わっていないペアの確認を省く
+    review_store_path = processing.get("review_store")
+    if review_store_path:
+        with report.stage("record_review_decisions") as stage:
+            store = ReviewStore.load(review_store_path)
+            stage["recorded"] = store.record(checked_df)
+            store.save(review_store_path)
+            stage["rows"] = len(store)
+
+    # ジャーナルを使う場合は、これまでの確認結果をスナップショットに適用して現在の状態にする
+    journal = None
+    journal_path = processing.get("confirmation_journal")
+    if journal_path:
+        with report.stage("replay_confirmation_journal") as stage:
+            journal = ConfirmationJournal(
+                journal_path,
+                processing.get(
+                    "journal_checkpoint_interval", DEFAULT_CHECKPOINT_INTERVAL
+                ),
+            )
+            confirmed_df = journal.replay(confirmed_df)
+            stage["batches"] = journal.next_batch
+            stage["rows"] = len(confirmed_df)
 
     # resultsの更新
-    df_results = update_results_with_confirmation(confirmed_df, checked_df)
+    with report.stage("update_results_with_confirmation") as stage:
+        df_results = update_results_with_confirmation(
+            confirmed_df, checked_df, journal
+        )
+        stage["rows"] = len(df_results)
 
     # 更新データの準備
-    combined_df = prepare_update_data(df_results, prev_df, curr_df)
+    with report.stage("prepare_update_data"):
+        combined_df = prepare_update_data(df_results, prev_df, curr_df)
 
     # 更新シミュレーション
-    update_df = simulate_updates_with_hierarchy(prev_df, curr_df, combined_df)
+    with report.stage("simulate_updates_with_hierarchy") as stage:
+        update_df = simulate_updates_with_hierarchy(prev_df, curr_df, combined_df)  # noqa: E501
+        stage["rows"] = len(update_df)
 
     # 結果の出力
-    update_df.to_excel("update_data.xlsx", index=False)
+    with report.stage("write_output", rows=len(update_df)):
+        update_df.to_excel(output_path, index=False)
+    report.write(get_report_path(output_path))
 
 
 if __name__ == "__main__":
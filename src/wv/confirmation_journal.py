@@ -0,0 +1,341 @@
+"""
+確認結果を追記専用のジャーナルに記録し、結果のスナップショットから現在の状態を
+再構築するモジュール。
+
+ジャーナルは1行に1回分の確認結果（バッチ）として確定した組織ペアをJSONで書き込む
+テキストファイルで、行は追記するだけで書き換えない。現在の状態はスナップショットに先頭から順に
+バッチを適用して求める。一定のバッチ数ごとにチェックポイント（適用後の同一組織と
+確定の列と、ジャーナル上の位置）を保存し、次回はそこから先のバッチだけを適用する。
+
+各バッチには確認結果のハッシュ値を記録し、直前のバッチと同じ確認結果は追記しない。
+チェックポイントにはその位置までのジャーナルのハッシュ値を記録し、ジャーナルが
+置き換えられていた場合はチェックポイントを使わない。
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections.abc import Iterator
+from datetime import datetime
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from integrity_check import CHECK_COLUMN, CHECK_CONFIRMED
+from results_store import ResultsStore
+
+# チェックポイントの保存形式を変更した場合は値を上げ、古いチェックポイントを使わないようにする
+CHECKPOINT_VERSION = 3
+
+# チェックポイントを保存する間隔（バッチ数）
+DEFAULT_CHECKPOINT_INTERVAL = 50
+
+# ジャーナルのハッシュ値を計算するときに一度に読むバイト数
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def calculate_snapshot_digest(df_results: pd.DataFrame) -> str:
+    """
+    結果のスナップショットを識別するハッシュ値を計算する関数。
+
+    チェックポイントは同じスナップショットに対してのみ使えるため、組織ペアの並びと
+    同一組織・確定の列から計算する。
+
+    Args:
+        df_results (pd.DataFrame): 結果データフレーム。
+
+    Returns:
+        str: SHA-256のハッシュ値。
+    """
+    columns = [cst.PREV_ORG, cst.CURR_ORG, cst.SAME_ORG, cst.CONFIRMED]
+    hashes = pd.util.hash_pandas_object(
+        df_results[[column for column in columns if column in df_results.columns]],  # noqa: E501
+        index=False,
+    )
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def _to_pairs(df: pd.DataFrame) -> list[list]:
+    """
+    データフレームの組織ペアをJSONに書けるリストにする関数。
+
+    Args:
+        df (pd.DataFrame): 前月の組織と当月の組織の列を持つデータフレーム。
+
+    Returns:
+        list[list]: [前月の組織, 当月の組織] のリスト。
+    """
+    return df[[cst.PREV_ORG, cst.CURR_ORG]].astype(object).values.tolist()
+
+
+def calculate_batch_digest(confirmed: list[list]) -> str:
+    """
+    1回分の確認結果を識別するハッシュ値を計算する関数。
+
+    Args:
+        confirmed (list[list]): 確定した [前月の組織, 当月の組織] のリスト。
+
+    Returns:
+        str: SHA-256のハッシュ値。
+    """
+    content = json.dumps(confirmed, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _entry_digest(entry: dict) -> str:
+    """
+    ジャーナルの行に記録した確認結果のハッシュ値を返す関数。
+
+    Args:
+        entry (dict): ジャーナルの1行の内容。
+
+    Returns:
+        str: 確認結果のハッシュ値。記録していない行は確認結果から計算する。
+    """
+    if "digest" in entry:
+        return entry["digest"]
+    return calculate_batch_digest(entry["confirmed"])
+
+
+class ConfirmationJournal:
+    """
+    確認結果を追記するジャーナルと、そのチェックポイントを扱うクラス。
+    """
+
+    def __init__(
+        self, file_path: str, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL  # noqa: E501
+    ):
+        """
+        コンストラクタ。
+
+        チェックポイントがあればその位置から、なければ先頭からジャーナルを読み、
+        次のバッチ番号と最後の完全な行の終わりの位置、最後のバッチの確認結果の
+        ハッシュ値を求める。
+
+        Args:
+            file_path (str): ジャーナルのファイルパス。
+            checkpoint_interval (int): チェックポイントを保存する間隔（バッチ数）。
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_intervalは1以上にしてください")
+        self.file_path = file_path
+        self.checkpoint_path = file_path + ".checkpoint"
+        self.checkpoint_interval = checkpoint_interval
+        # replayで状態を再構築したスナップショットのハッシュ値
+        self.snapshot_digest = None
+        # 先頭からend_offsetまでのジャーナルのハッシュ値
+        self._journal_hash = hashlib.sha256()
+        self._checkpoint = self._load_checkpoint()
+        self._checkpoint_batch = self._checkpoint["batch"] if self._checkpoint else 0  # noqa: E501
+        self.next_batch = self._checkpoint_batch
+        self.end_offset = self._checkpoint["offset"] if self._checkpoint else 0  # noqa: E501
+        # 最後のバッチの確認結果のハッシュ値
+        self._last_digest = self._checkpoint["last_digest"] if self._checkpoint else None  # noqa: E501
+        for line, end_offset in self._iter_lines(self.end_offset):
+            entry = json.loads(line)
+            self._journal_hash.update(line)
+            self._last_digest = _entry_digest(entry)
+            self.next_batch = entry["batch"] + 1
+            self.end_offset = end_offset
+
+    def _iter_lines(self, offset: int = 0) -> Iterator[tuple[bytes, int]]:
+        """
+        ジャーナルの完全な行を指定位置から順に読み込む。
+
+        書き込み途中で中断した最後の不完全な行は読み飛ばす。
+
+        Args:
+            offset (int): 読み始める位置（バイト）。
+
+        Yields:
+            tuple[bytes, int]: 改行を含む行と、行の終わりの位置。
+        """
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                yield line, offset
+
+    def iter_batches(
+        self, offset: int = 0
+    ) -> Iterator[tuple[int, pd.DataFrame, int]]:
+        """
+        ジャーナルのバッチを指定位置から順に読み込む。
+
+        書き込み途中で中断した最後の不完全な行は読み飛ばす。
+
+        Args:
+            offset (int): 読み始める位置（バイト）。
+
+        Yields:
+            tuple[int, pd.DataFrame, int]: バッチ番号、確定した組織ペア、行の終わりの位置。
+        """
+        for line, end_offset in self._iter_lines(offset):
+            entry = json.loads(line)
+            yield (
+                entry["batch"],
+                pd.DataFrame(entry["confirmed"], columns=[cst.PREV_ORG, cst.CURR_ORG]),  # noqa: E501
+                end_offset,
+            )
+
+    def append(self, checked_df: pd.DataFrame) -> int | None:
+        """
+        チェック済みのデータフレームで確定した組織ペアを1つのバッチとして追記する。
+
+        状態の更新に使うのは確定した組織ペアだけのため、"⚪︎" 以外の行は記録しない。
+        1行を書き込んでからディスクに同期するため、中断しても既存の行は壊れない。
+        前回の書き込みが途中で中断していた場合は、その不完全な行を切り捨ててから追記する。
+        直前のバッチと確認結果が同じ場合は、同じワークブックを再度チェックしたと
+        みなして追記しない。それより前のバッチと同じ確認結果は、元に戻す確認として追記する。
+
+        Args:
+            checked_df (pd.DataFrame): 確認・前月の組織・当月の組織の列を持つデータフレーム。
+
+        Returns:
+            int | None: 追記したバッチの番号。追記しなかった場合はNone。
+        """
+        confirmed = _to_pairs(checked_df[checked_df[CHECK_COLUMN] == CHECK_CONFIRMED])  # noqa: E501
+        digest = calculate_batch_digest(confirmed)
+        if digest == self._last_digest:
+            return None
+        entry = {
+            "batch": self.next_batch,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "digest": digest,
+            "confirmed": confirmed,
+        }
+        line = (
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")  # noqa: E501
+            + b"\n"
+        )
+        mode = "r+b" if os.path.exists(self.file_path) else "wb"
+        with open(self.file_path, mode) as file:
+            file.seek(self.end_offset)
+            file.truncate()
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+            self.end_offset = file.tell()
+        self._journal_hash.update(line)
+        self._last_digest = digest
+        self.next_batch += 1
+        return entry["batch"]
+
+    def replay(self, df_results: pd.DataFrame) -> pd.DataFrame:
+        """
+        結果のスナップショットにジャーナルのバッチを順に適用し、現在の状態を再構築する。
+
+        同じスナップショットのチェックポイントがあれば、その状態から先のバッチだけを
+        適用する。適用したバッチが多い場合は新しいチェックポイントを保存する。
+
+        Args:
+            df_results (pd.DataFrame): 結果のスナップショット。
+
+        Returns:
+            pd.DataFrame: 全てのバッチを適用した結果データフレーム。
+        """
+        self.snapshot_digest = calculate_snapshot_digest(df_results)
+        store = ResultsStore(df_results)
+        offset = 0
+        checkpoint = self._checkpoint
+        if checkpoint and checkpoint["snapshot_digest"] == self.snapshot_digest:  # noqa: E501
+            store.same_org = checkpoint["same_org"].copy()
+            store.confirmed = checkpoint["confirmed"].copy()
+            offset = checkpoint["offset"]
+            self._checkpoint_batch = checkpoint["batch"]
+        else:
+            self._checkpoint_batch = 0
+
+        for _, confirmed_pairs, _ in self.iter_batches(offset):
+            store.apply_confirmations(confirmed_pairs)
+        self.maybe_checkpoint(store)
+        return store.to_frame()
+
+    def maybe_checkpoint(self, store: ResultsStore) -> bool:
+        """
+        前回のチェックポイントから一定数のバッチを適用していればチェックポイントを保存する。
+
+        replayで状態を再構築していない場合は、どのスナップショットの状態か
+        分からないため保存しない。
+
+        Args:
+            store (ResultsStore): 最後のバッチまで適用した結果。
+
+        Returns:
+            bool: 保存した場合はTrue。
+        """
+        if self.snapshot_digest is None:
+            return False
+        if self.next_batch - self._checkpoint_batch < self.checkpoint_interval:
+            return False
+        self._save_checkpoint(store)
+        return True
+
+    def _save_checkpoint(self, store: ResultsStore) -> None:
+        """
+        最後のバッチまで適用した状態をチェックポイントとして保存する。
+
+        書き込み途中で中断しても前回のファイルが壊れないよう、
+        一時ファイルに書いてから置き換える。
+
+        Args:
+            store (ResultsStore): 最後のバッチまで適用した結果。
+        """
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "snapshot_digest": self.snapshot_digest,
+            "batch": self.next_batch,
+            "offset": self.end_offset,
+            "journal_digest": self._journal_hash.hexdigest(),
+            "last_digest": self._last_digest,
+            "same_org": np.array(store.same_org, dtype=bool),
+            "confirmed": np.array(store.confirmed, dtype=bool),
+        }
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.checkpoint_path)
+        self._checkpoint = checkpoint
+        self._checkpoint_batch = self.next_batch
+
+    def _load_checkpoint(self) -> dict:
+        """
+        チェックポイントを読み込む。
+
+        チェックポイントの位置までのジャーナルのハッシュ値を計算して記録した値と
+        比べ、一致した場合はその値をジャーナルのハッシュ値の途中経過として使う。
+
+        Returns:
+            dict: チェックポイントの内容。ファイルがない場合や保存形式が異なる場合、
+                ジャーナルより先の位置を指している場合、その位置までのジャーナルが
+                保存したときと異なる場合はNone。
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "rb") as file:
+            checkpoint = pickle.load(file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            return None
+        journal_size = (
+            os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0  # noqa: E501
+        )
+        if checkpoint["offset"] > journal_size:
+            return None
+        journal_hash = hashlib.sha256()
+        remaining = checkpoint["offset"]
+        if remaining:
+            with open(self.file_path, "rb") as file:
+                while remaining:
+                    block = file.read(min(HASH_BLOCK_SIZE, remaining))
+                    journal_hash.update(block)
+                    remaining -= len(block)
+        if journal_hash.hexdigest() != checkpoint["journal_digest"]:
+            return None
+        self._journal_hash = journal_hash
+        return checkpoint
+
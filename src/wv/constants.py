@@ -6,6 +6,8 @@ TYPE = "type"
 FULL_TIME = "full_time"
 PART_TIME = "part_time"
 CONTRACT_EMPLOYEE = "contract_employee"
+# 構成比の計算で常に扱う雇用区分
+EMPLOYEE_TYPES = [FULL_TIME, PART_TIME, CONTRACT_EMPLOYEE]
 
 
 # 結果の定義
@@ -19,7 +21,36 @@ SIMILARITY_INDEX = "類似度指数"
 RATIO_DIFF = "構成比率差"
 RANK_DIFF = "ランク差"
 CONFIRMED = "確定"
+# 組織ペアのグラフの連結成分の番号
+COMPONENT_ID = "クラスタID"
 SAME_ORG = "同一組織と判定"
+# スコアの定義
+RANK_SCORE = "ランクスコア"
+SIMILARITY_SCORE = "類似度スコア"
+MEMBER_SCORE = "メンバースコア"
+TOTAL_SCORE = "総合スコア"
+APPLIED_RULE = "適用ルール"
+# 1対1の割り当ての定義
+ASSIGNED = "割当"
+PREV_RUNNER_UP = "前月組織の次点"
+PREV_RUNNER_UP_SCORE = "前月組織の次点スコア"
+CURR_RUNNER_UP = "当月組織の次点"
+CURR_RUNNER_UP_SCORE = "当月組織の次点スコア"
+# 確認結果の再利用に使う所属内容の指紋の列（16進数の文字列）
+PREV_FINGERPRINT = "前月組織の指紋"
+CURR_FINGERPRINT = "当月組織の指紋"
+# 組織ペアの統計量の列
+PAIR_COLUMNS = [
+    PREV_ORG,
+    CURR_ORG,
+    PREV_SIZE,
+    CURR_SIZE,
+    COMMON_MEMBERS,
+    COMMON_RATIO,
+    SIMILARITY_INDEX,
+    RATIO_DIFF,
+    RANK_DIFF,
+]
 # 重みの定義
 RANK_WEIGHT = "rank_weight"
 SIMILARITY_WEIGHT = "similarity_weight"
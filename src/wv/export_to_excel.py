@@ -2,70 +2,202 @@
 結果データをExcelファイルにエクスポートするモジュール。
 """
 
+import warnings
+from collections.abc import Callable, Iterable, Iterator
+
 import constants as cst
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+from run_report import DISABLED_REPORT, RunReport
+
+
+# 結果データフレームを一度に書き出す行数
+DEFAULT_EXPORT_CHUNK_ROWS = 50_000
 
 
-def export_to_excel(df_results: pd.DataFrame, file_path: str) -> None:
+def export_to_excel(
+    df_results: pd.DataFrame,
+    file_path: str,
+    report: RunReport = DISABLED_REPORT,
+    chunk_rows: int = DEFAULT_EXPORT_CHUNK_ROWS,
+    reviewed: np.ndarray = None,
+) -> None:
     """
     結果データをExcelファイルにエクスポートする関数。
 
+    書き込み専用モードのワークブックに一定行数ずつ書き出すため、
+    ワークブックのセルをメモリ上に保持しない。
+
     Args:
         df_results (pd.DataFrame): 結果データフレーム。
         file_path (str): エクスポート先のファイルパス。
+        report (RunReport, optional): 段階ごとの計測値を記録する実行レポート。
+        chunk_rows (int, optional): 一度に書き出す行数。
+        reviewed (np.ndarray, optional): 前回の確認結果を反映済みの行でTrueとなる配列。
+            指定した場合、未確定シートからは除く（全体シートには全ての行を書き出す）。
+    """
+    with report.stage("export_to_excel", rows=len(df_results)):
+        unconfirmed = ~df_results[cst.CONFIRMED].to_numpy(dtype=bool)
+        if reviewed is not None:
+            unconfirmed &= ~reviewed
+        _write_workbook(
+            lambda: _iter_row_chunks(df_results, chunk_rows),
+            file_path,
+            lambda: _iter_row_chunks(df_results, chunk_rows, unconfirmed),
+        )
+
+
+def export_partitions_to_excel(
+    iter_partitions: Callable[[], Iterable[pd.DataFrame]],
+    file_path: str,
+    report: RunReport = DISABLED_REPORT,
+) -> None:
+    """
+    ディスクに保存した結果のパーティションをExcelファイルにエクスポートする関数。
+
+    パーティションを1つずつ書き出すため、結果全体をメモリに読み込まない。
+    出力はexport_to_excelと同じ内容になる。
+
+    Args:
+        iter_partitions (Callable[[], Iterable[pd.DataFrame]]):
+            パーティションを順に返すイテラブルを作成する関数。シートごとに呼び出す。
+        file_path (str): エクスポート先のファイルパス。
+        report (RunReport, optional): 段階ごとの計測値を記録する実行レポート。
+    """
+    with report.stage("export_to_excel") as stage:
+        stage["rows"] = _write_workbook(iter_partitions, file_path)
+
+
+def _iter_row_chunks(
+    df: pd.DataFrame, chunk_rows: int, mask: np.ndarray = None
+) -> Iterator[pd.DataFrame]:
+    """
+    データフレームを一定行数ずつに分けて返すヘルパー関数。
+
+    Args:
+        df (pd.DataFrame): データフレーム。
+        chunk_rows (int): 1つに含める行数（絞り込む前の行数）。
+        mask (np.ndarray, optional): 返す行でTrueとなる配列。省略時は全ての行。
+
+    Yields:
+        pd.DataFrame: 分けたデータフレーム。
     """
-    # ワークブックの作成
-    wb = Workbook()
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        if mask is not None:
+            chunk = chunk[mask[start : start + chunk_rows]]
+        yield chunk
+
+
+def _write_workbook(
+    iter_partitions: Callable[[], Iterable[pd.DataFrame]],
+    file_path: str,
+    iter_unconfirmed: Callable[[], Iterable[pd.DataFrame]] = None,
+) -> int:
+    """
+    結果データの全体シートと未確定シートを持つワークブックを書き込み専用モードで保存する関数。
+
+    Args:
+        iter_partitions (Callable[[], Iterable[pd.DataFrame]]):
+            結果データを順に返すイテラブルを作成する関数。シートごとに呼び出す。
+        file_path (str): 保存先のファイルパス。
+        iter_unconfirmed (Callable[[], Iterable[pd.DataFrame]], optional):
+            未確定シートに書き出す行を順に返すイテラブルを作成する関数。
+            省略時はiter_partitionsのうち確定していない行。
+
+    Returns:
+        int: 全体シートに書き出したデータの行数。
+    """
+    wb = Workbook(write_only=True)
 
     # 全体シートの作成
-    ws_all = wb.active
-    ws_all.title = "全体"
-    for r in dataframe_to_rows(df_results, index=False, header=True):
-        ws_all.append(r)
-    create_table_and_style(ws_all, "全体")
+    ws_all = wb.create_sheet(title="全体")
+    n_rows = _append_partitions(ws_all, "全体", iter_partitions())
 
     # 未確定シートの作成
-    df_unconfirmed = df_results[~df_results[cst.CONFIRMED]]
     ws_unconfirmed = wb.create_sheet(title="未確定")
-
-    for r in dataframe_to_rows(df_unconfirmed, index=False, header=True):
-        ws_unconfirmed.append(r)
-    create_table_and_style(ws_unconfirmed, "未確定")
+    if iter_unconfirmed is None:
+        unconfirmed = (df[~df[cst.CONFIRMED]] for df in iter_partitions())
+    else:
+        unconfirmed = iter_unconfirmed()
+    _append_partitions(ws_unconfirmed, "未確定", unconfirmed)
 
     # ファイルに保存
     wb.save(file_path)
+    return n_rows
 
 
-def create_table_and_style(ws, title: str) -> None:
+def _append_partitions(ws, title: str, partitions: Iterable[pd.DataFrame]) -> int:  # noqa: E501
     """
-    Excelシートにテーブルとスタイルを適用するヘルパー関数。
+    書き込み専用のワークシートにパーティションの行を追加し、テーブルとスタイルを適用するヘルパー関数。
 
     Args:
-        ws (Worksheet): 対象のワークシート。
+        ws (WriteOnlyWorksheet): 対象のワークシート。
         title (str): テーブルのタイトル。
+        partitions (Iterable[pd.DataFrame]): 書き出すデータフレーム。
+
+    Returns:
+        int: 書き出したデータの行数。
+    """
+    # 書き込み専用モードでは書き出す前にウィンドウ枠を固定する
+    ws.freeze_panes = "C2"
+    columns = None
+    n_rows = 0
+    for df_partition in partitions:
+        rows = dataframe_to_rows(df_partition, index=False, header=True)
+        header = next(rows)
+        if columns is None:
+            columns = list(header)
+            # 見出しを縦書きに設定
+            ws.append([_vertical_cell(ws, column) for column in columns])
+        for r in rows:
+            ws.append(r)
+            n_rows += 1
+
+    if columns:
+        # 書き込み専用モードではシートから列名を読み取れないため、テーブルの列を設定する
+        table_range = f"A1:{get_column_letter(len(columns))}{n_rows + 1}"
+        table = Table(
+            displayName=title,
+            ref=table_range,
+            autoFilter=AutoFilter(ref=table_range),
+            tableColumns=[
+                TableColumn(id=number, name=str(column))
+                for number, column in enumerate(columns, start=1)
+            ],
+            tableStyleInfo=TableStyleInfo(
+                name="TableStyleMedium2",
+                showFirstColumn=False,
+                showLastColumn=False,
+                showRowStripes=True,
+                showColumnStripes=False,
+            ),
+        )
+        with warnings.catch_warnings():
+            # 列を設定済みでも書き込み専用モードでは常に警告が出るため抑制する
+            warnings.simplefilter("ignore", UserWarning)
+            ws.add_table(table)
+    return n_rows
+
+
+def _vertical_cell(ws, value) -> WriteOnlyCell:
+    """
+    縦書きの見出しセルを作成するヘルパー関数。
+
+    Args:
+        ws (WriteOnlyWorksheet): 対象のワークシート。
+        value: セルの値。
+
+    Returns:
+        WriteOnlyCell: 見出しセル。
     """
-    # テーブル範囲の設定
-    table_range = f"A1:{chr(64 + ws.max_column)}{ws.max_row}"
-    table = Table(displayName=title, ref=table_range)
-
-    # テーブルスタイルの設定
-    style = TableStyleInfo(
-        name="TableStyleMedium2",
-        showFirstColumn=False,
-        showLastColumn=False,
-        showRowStripes=True,
-        showColumnStripes=False,
-    )
-    table.tableStyleInfo = style
-    ws.add_table(table)
-
-    # 見出しを縦書きに設定
-    for cell in ws["1:1"]:
-        cell.alignment = Alignment(textRotation=255)
-
-    # ウィンドウ枠の固定
-    ws.freeze_panes = ws["C2"]
+    cell = WriteOnlyCell(ws, value=value)
+    cell.alignment = Alignment(textRotation=255)
+    return cell
@@ -0,0 +1,173 @@
+"""
+前回実行時の組織ごとの所属と組織ペアの結果を保存し、差分計算に使うモジュール。
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from membership_index import OrgMembershipIndex
+
+# 保存形式を変更した場合は値を上げ、古い状態ファイルを使わないようにする
+STATE_VERSION = 1
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """
+    64bit整数をかき混ぜる関数（splitmix64の最終段）。
+
+    Args:
+        values (np.ndarray): uint64の配列。
+
+    Returns:
+        np.ndarray: かき混ぜたuint64の配列。
+    """
+    values = values.astype(np.uint64)
+    # uint64の桁あふれは2^64を法とする計算としてそのまま使う
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)  # noqa: E501
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)  # noqa: E501
+    return values ^ (values >> np.uint64(31))
+
+
+def compute_org_fingerprints(index: OrgMembershipIndex) -> dict[str, int]:
+    """
+    組織ごとの所属内容の指紋を計算する関数。
+
+    指紋は所属ユーザー名の集合、元データの行数、区分別人数から求める。
+    ユーザーIDは実行ごとに振り直されるため、IDではなくユーザー名を使い、
+    並び順に依存しないようハッシュ値の和をとる。
+
+    Args:
+        index (OrgMembershipIndex): 所属インデックス。
+
+    Returns:
+        dict[str, int]: 組織名から指紋への辞書。
+    """
+    user_names = np.empty(len(index.user_ids), dtype=object)
+    user_names[list(index.user_ids.values())] = list(index.user_ids.keys())
+    user_hashes = _mix64(pd.util.hash_array(user_names.astype(str)))
+
+    fingerprints = np.zeros(len(index), dtype=np.uint64)
+    nonempty = index.sizes > 0
+    if nonempty.any():
+        fingerprints[nonempty] = np.add.reduceat(
+            user_hashes[index.indices], index.indptr[:-1][nonempty]
+        )
+
+    with np.errstate(over="ignore"):
+        fingerprints = _mix64(fingerprints ^ _mix64(index.row_counts))
+        category_hashes = _mix64(
+            pd.util.hash_array(np.asarray(index.categories, dtype=str))
+        )
+        for i, category_hash in enumerate(category_hashes):
+            fingerprints += _mix64(category_hash ^ _mix64(index.category_counts[:, i]))  # noqa: E501
+    return dict(zip(index.org_names, fingerprints.tolist()))
+
+
+def calculate_config_digest(config: dict) -> str:
+    """
+    結果に影響する設定のハッシュ値を計算する関数。
+
+    Args:
+        config (dict): 設定辞書。
+
+    Returns:
+        str: SHA-256のハッシュ値。
+    """
+    text = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def find_changed_orgs(
+    index: OrgMembershipIndex, fingerprints: dict[str, int], previous: dict[str, int]  # noqa: E501
+) -> np.ndarray:
+    """
+    前回から所属内容が変わった組織、または新たに現れた組織を求める関数。
+
+    Args:
+        index (OrgMembershipIndex): 今回の所属インデックス。
+        fingerprints (dict[str, int]): 今回の組織ごとの指紋。
+        previous (dict[str, int]): 前回の組織ごとの指紋。
+
+    Returns:
+        np.ndarray: 組織IDごとに変更があればTrueとなる配列。
+    """
+    return np.array(
+        [fingerprints[org] != previous.get(org) for org in index.org_names],
+        dtype=bool,
+    )
+
+
+class MatchingState:
+    """
+    前回実行時の組織ごとの指紋と、確定処理前の組織ペアの結果を保持するクラス。
+    """
+
+    def __init__(
+        self,
+        config_digest: str,
+        categories: list,
+        prev_fingerprints: dict[str, int],
+        curr_fingerprints: dict[str, int],
+        results: pd.DataFrame,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            config_digest (str): 結果を計算したときの設定のハッシュ値。
+            categories (list): 構成比率の計算に使った区分のリスト。
+            prev_fingerprints (dict[str, int]): 前月組織ごとの指紋。
+            curr_fingerprints (dict[str, int]): 当月組織ごとの指紋。
+            results (pd.DataFrame): スコアが計算された組織ペアの結果。
+        """
+        self.config_digest = config_digest
+        self.categories = categories
+        self.prev_fingerprints = prev_fingerprints
+        self.curr_fingerprints = curr_fingerprints
+        self.results = results
+
+    def save(self, file_path: str) -> None:
+        """
+        状態をファイルに保存する。
+
+        書き込み途中で中断しても前回の状態ファイルが壊れないよう、
+        一時ファイルに書いてから置き換える。
+
+        Args:
+            file_path (str): 保存先のファイルパス。
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = file_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(
+                {"version": STATE_VERSION, **vars(self)},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "MatchingState":
+        """
+        ファイルから状態を読み込む。
+
+        Args:
+            file_path (str): 状態ファイルのパス。
+
+        Returns:
+            MatchingState: 読み込んだ状態。ファイルがない場合や
+                保存形式が異なる場合はNone。
+        """
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "rb") as file:
+            data = pickle.load(file)
+        if data.pop("version", None) != STATE_VERSION:
+            return None
+        return cls(**data)
@@ -0,0 +1,124 @@
+"""
+Excelの入力ファイルを列指向形式（Feather）に変換して保存し、次回以降の読み込みに使うモジュール。
+
+キャッシュは元ファイルの内容のハッシュ値とシート名ごとに作成するため、
+元ファイルが変わると自動的に作り直される。キャッシュからの読み込みは
+Excelの解析を省けるため速いが、データフレームへの変換でデータはコピーされる。
+pyarrowがない環境ではキャッシュを使わずに元ファイルを読み込む。
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+from streaming_ingest import read_table
+
+# キャッシュを保存するディレクトリ名。元ファイルと同じ場所に作成する
+CACHE_DIR_NAME = ".input_cache"
+
+# キャッシュの内容の形式。読み込み方法を変えた場合は値を上げ、古いキャッシュを作り直す
+CACHE_FORMAT_VERSION = 2
+
+# ハッシュ値の計算で一度に読み込むバイト数
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def calculate_file_digest(file_path: str) -> str:
+    """
+    ファイルの内容のハッシュ値を計算する関数。
+
+    Args:
+        file_path (str): ファイルパス。
+
+    Returns:
+        str: SHA-256のハッシュ値。
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_cache_path(file_path: str, sheet_name: str, cache_dir: str = None) -> str:  # noqa: E501
+    """
+    元ファイルとシート名に対応するキャッシュファイルのパスを返す関数。
+
+    Args:
+        file_path (str): 元ファイルのパス。
+        sheet_name (str): シート名。Noneは最初のシート。
+        cache_dir (str, optional): キャッシュディレクトリ。
+            省略時は元ファイルと同じ場所の .input_cache。
+
+    Returns:
+        str: キャッシュファイルのパス。
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(
+            os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME
+        )
+    sheet_key = hashlib.sha256(str(sheet_name).encode("utf-8")).hexdigest()[:16]  # noqa: E501
+    name = os.path.basename(file_path)
+    digest = calculate_file_digest(file_path)
+    return os.path.join(
+        cache_dir, f"{name}.{sheet_key}.{digest}-v{CACHE_FORMAT_VERSION}.feather"  # noqa: E501
+    )
+
+
+def remove_stale_caches(cache_path: str) -> None:
+    """
+    同じ元ファイル・シートの古いキャッシュを削除する関数。
+
+    Args:
+        cache_path (str): 現在のキャッシュファイルのパス。
+    """
+    cache_dir = os.path.dirname(cache_path)
+    prefix = os.path.basename(cache_path).rsplit(".", 2)[0] + "."
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if entry.startswith(prefix) and path != cache_path:
+            os.remove(path)
+
+
+def read_excel_cached(
+    file_path: str, sheet_name: str = None, cache_dir: str = None
+) -> pd.DataFrame:
+    """
+    Excelのシートをキャッシュ経由で読み込む関数。
+
+    キャッシュがあればキャッシュから、なければ読み取り専用モードで元ファイルを
+    読み込んでキャッシュを作成する。Featherに変換できない列（型が混在する列など）
+    を含むシートはキャッシュせずにそのまま返す。
+
+    Args:
+        file_path (str): Excelファイルのパス。
+        sheet_name (str, optional): シート名。省略時は最初のシート。
+        cache_dir (str, optional): キャッシュディレクトリ。
+
+    Returns:
+        pd.DataFrame: 読み込んだデータフレーム。
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        return read_table(file_path, sheet_name=sheet_name)
+
+    cache_path = get_cache_path(file_path, sheet_name, cache_dir)
+    if os.path.exists(cache_path):
+        return feather.read_feather(cache_path)
+
+    df = read_table(file_path, sheet_name=sheet_name)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    try:
+        # 読み込みで展開の時間がかからないよう圧縮せずに保存する
+        feather.write_feather(df, temp_path, compression="uncompressed")
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return df
+    os.replace(temp_path, cache_path)
+    remove_stale_caches(cache_path)
+    # 初回とキャッシュ利用時で列の型が揃うよう、保存したキャッシュから読み直す
+    return feather.read_feather(cache_path)
@@ -1,43 +1,232 @@
 """
 データの整合性チェックを行うモジュール。
+
+確認済みのワークブックは読み取り専用モードで順に読み込み、1回の走査で全ての違反を
+行番号付きで集める。読み込む列を指定しない場合はシートの全ての列を返す。
 """
 
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
 import constants as constants
 import pandas as pd
+from parallel_scoring import resolve_worker_count
+from streaming_ingest import DEFAULT_CHUNK_ROWS, iter_table_chunks
+
+# 確認列の名前と、確認列に使える値
+CHECK_COLUMN = "確認"
+CHECK_CONFIRMED = "⚪︎"
+CHECK_VALUES = [CHECK_CONFIRMED, "-"]
+
+# 整合性チェックと確認結果の反映に必要な列（指紋の列は確認結果を保存する場合のみ存在する）
+CHECK_COLUMNS = [
+    CHECK_COLUMN,
+    constants.PREV_ORG,
+    constants.CURR_ORG,
+    constants.PREV_FINGERPRINT,
+    constants.CURR_FINGERPRINT,
+]
+
+# 例外のメッセージに含める違反の最大件数
+MAX_REPORTED_VIOLATIONS = 20
+
+
+class IntegrityViolation:
+    """
+    整合性チェックの違反1件を表すクラス。
+    """
+
+    def __init__(self, row: int, column: str, value, message: str):
+        """
+        コンストラクタ。
+
+        Args:
+            row (int): Excel上の行番号（見出しが1行目）。
+            column (str): 違反のある列名。
+            value: 違反のある値。
+            message (str): 違反の内容。
+        """
+        self.row = row
+        self.column = column
+        self.value = value
+        self.message = message
 
+    def __repr__(self) -> str:
+        """
+        違反の内容を表す文字列を返す。
 
-def check_results_integrity(file_path: str, sheet_name: str = "未確定") -> pd.DataFrame:  # noqa: E501
+        Returns:
+            str: 違反の内容。
+        """
+        return (
+            f"IntegrityViolation(row={self.row!r}, column={self.column!r}, "
+            f"value={self.value!r}, message={self.message!r})"
+        )
+
+    def __str__(self) -> str:
+        """
+        違反の内容を行番号付きの読みやすい文字列で返す。
+
+        Returns:
+            str: 違反の内容。
+        """
+        return f"{self.row}行目 {self.column}={self.value!r}: {self.message}"
+
+
+class IntegrityError(ValueError):
+    """
+    整合性チェックで違反が見つかった場合に送出する例外。
+    """
+
+    def __init__(self, file_path: str, violations: list[IntegrityViolation]):
+        """
+        コンストラクタ。
+
+        Args:
+            file_path (str): チェックしたファイルのパス。
+            violations (list[IntegrityViolation]): 見つかった全ての違反。
+        """
+        lines = [str(violation) for violation in violations[:MAX_REPORTED_VIOLATIONS]]  # noqa: E501
+        if len(violations) > MAX_REPORTED_VIOLATIONS:
+            lines.append(f"ほか{len(violations) - MAX_REPORTED_VIOLATIONS}件")
+        super().__init__(
+            f"{file_path}に{len(violations)}件の不正なデータがあります。\n"
+            + "\n".join(lines)
+        )
+        self.file_path = file_path
+        self.violations = violations
+
+
+def find_integrity_violations(
+    file_path: str,
+    sheet_name: str = "未確定",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: list[str] = None,
+) -> tuple[pd.DataFrame, list[IntegrityViolation]]:
+    """
+    ファイルの未確定シートを読み込み、データの整合性の違反を全て求める関数。
+
+    次の違反を1回の走査で調べる。
+    - 確認列がない。
+    - 確認列に "⚪︎" と "-" 以外の値がある。
+    - 確認列が "⚪︎" の行で前月組織または当月組織が重複している（重複する全ての行）。
+
+    Args:
+        file_path (str): Excelファイルのパス。
+        sheet_name (str): シート名。
+        chunk_rows (int): 一度に読み込む行数。
+        columns (list[str], optional): 読み込む列名のリスト。シートにない列は無視する。
+            省略時は全列。確認列は常に読み込む。
+
+    Returns:
+        tuple[pd.DataFrame, list[IntegrityViolation]]: 読み込んだデータフレームと、
+            行番号順の違反のリスト。
+    """
+    if columns is not None and CHECK_COLUMN not in columns:
+        columns = [CHECK_COLUMN] + list(columns)
+    frames = []
+    violations = []
+    # チャンクのインデックスはExcel上の行番号。末尾の空の行は読み込まれない。
+    # データの行がないシートでも見出しの列を持つ空のチャンクが1つ返る
+    for chunk in iter_table_chunks(file_path, columns, chunk_rows, sheet_name):  # noqa: E501
+        if CHECK_COLUMN not in chunk.columns:
+            frames = [chunk]
+            break
+
+        # 確認列が "⚪︎" または "-" のみ含んでいるかチェック
+        invalid = chunk[~chunk[CHECK_COLUMN].isin(CHECK_VALUES)]
+        violations.extend(
+            IntegrityViolation(row, CHECK_COLUMN, value, "確認列に不正な値が含まれています。")  # noqa: E501
+            for row, value in invalid[CHECK_COLUMN].items()
+        )
+        frames.append(chunk)
+
+    # チャンクごとに推定した型をまとめ、pd.read_excelで一度に読み込んだ場合と同じ型にする
+    df = pd.concat(frames).infer_objects() if frames else pd.DataFrame()
+    if CHECK_COLUMN not in df.columns:
+        violations.append(
+            IntegrityViolation(
+                1,
+                CHECK_COLUMN,
+                None,
+                "確認列が見つかりません。ファイルが正しいか確認してください。",
+            )
+        )
+        return df.reset_index(drop=True), violations
+
+    # 確認列が "⚪︎" の前月組織と当月組織が一意かチェック
+    confirmed = df[df[CHECK_COLUMN] == CHECK_CONFIRMED]
+    for column, label in [
+        (constants.PREV_ORG, "前月組織"),
+        (constants.CURR_ORG, "当月組織"),
+    ]:
+        if column not in confirmed.columns:
+            continue
+        duplicated = confirmed[confirmed[column].duplicated(keep=False)]
+        violations.extend(
+            IntegrityViolation(
+                row, column, value, f"確認列において{label}が重複しています。"
+            )
+            for row, value in duplicated[column].items()
+        )
+
+    violations.sort(key=lambda violation: violation.row)
+    return df.reset_index(drop=True), violations
+
+
+def check_results_integrity(
+    file_path: str, sheet_name: str = "未確定", columns: list[str] = None
+) -> pd.DataFrame:
     """
     ファイルの未確定シートを読み込み、データの整合性をチェックする関数。
 
     Args:
         file_path (str): Excelファイルのパス。
         sheet_name (str): シート名。
+        columns (list[str], optional): 読み込む列名のリスト。省略時は全列。
+            確認結果の反映だけに使う場合はCHECK_COLUMNSを渡すと読み込みが速くなる。
 
     Returns:
-        pd.DataFrame: チェック済みのデータフレーム。
+        pd.DataFrame: チェック済みのデータフレーム。columnsを省略した場合は
+            pd.read_excelで読み込んだシートと同じ列を持つ。
 
     Raises:
-        ValueError: 確認列が不正な場合や重複がある場合。
+        IntegrityError: 確認列が不正な場合や重複がある場合。全ての違反を含む。
     """
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    df, violations = find_integrity_violations(
+        file_path, sheet_name, columns=columns
+    )
+    if violations:
+        raise IntegrityError(file_path, violations)
+    return df
 
-    # 確認列が含まれているかチェック
-    if "確認" not in df.columns:
-        raise ValueError("確認列が見つかりません。ファイルが正しいか確認してください。")
 
-    # 確認列が "⚪︎" または "-" のみ含んでいるかチェック
-    if not df["確認"].isin(["⚪︎", "-"]).all():
-        raise ValueError("確認列に不正な値が含まれています。")
+def check_workbooks_integrity(
+    file_paths: Iterable[str], sheet_name: str = "未確定", workers: int = 0
+) -> dict[str, tuple[pd.DataFrame, list[IntegrityViolation]]]:
+    """
+    複数のワークブックの整合性を並行してチェックする関数。
 
-    # 確認列が "⚪︎" の前月組織が一意かチェック
-    duplicate_prev_orgs = df[df["確認"] == "⚪︎"][constants.PREV_ORG].duplicated().any()  # noqa: E501
-    if duplicate_prev_orgs:
-        raise ValueError("確認列において前月組織が重複しています。")
+    Excelの解析はCPUを使うため、ワークブックごとに別のプロセスで読み込む。
 
-    # 確認列が "⚪︎" の当月組織が一意かチェック
-    duplicate_curr_orgs = df[df["確認"] == "⚪︎"][constants.CURR_ORG].duplicated().any()  # noqa: E501
-    if duplicate_curr_orgs:
-        raise ValueError("確認列において当月組織が重複しています。")
+    Args:
+        file_paths (Iterable[str]): Excelファイルのパス。
+        sheet_name (str): シート名。
+        workers (int): プロセス数（0: CPU数）。
 
-    return df
+    Returns:
+        dict[str, tuple[pd.DataFrame, list[IntegrityViolation]]]: ファイルパスごとの
+            読み込んだデータフレームと違反のリスト。
+    """
+    file_paths = list(file_paths)
+    workers = min(resolve_worker_count(workers), len(file_paths))
+    if workers <= 1:
+        return {
+            file_path: find_integrity_violations(file_path, sheet_name)
+            for file_path in file_paths
+        }
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            find_integrity_violations, file_paths, [sheet_name] * len(file_paths)  # noqa: E501
+        )
+        return dict(zip(file_paths, results))
@@ -0,0 +1,592 @@
+"""
+組織ペアの結果をメモリに保持し、組織ごとの対応先や候補をHTTPで返す常駐サービス。
+
+前月と当月の所属データから結果を一度だけ計算し、組織名ごとの行の位置を
+総合スコアの降順に並べた索引を作っておく。問い合わせは索引を引くだけで答える。
+新しい月のデータは起動時に指定したファイルを置き換えてから /reload で読み込み直し、
+計算が終わるまでは前の結果で応答する。読み込むファイルをクライアントから指定する
+ことはできない。
+
+エンドポイント:
+    GET  /health                          読み込み状況
+    GET  /prev?org=前月組織&limit=5        前月組織の対応先と候補
+    GET  /curr?org=当月組織&limit=5        当月組織の対応元と候補
+    POST /lookup {"side": "prev", "orgs": [...], "limit": 5}  一括問い合わせ
+    POST /reload                          起動時に指定したファイルの再読み込み
+
+実行例:
+    python lookup_service.py prev.csv curr.csv --port 8765
+    python lookup_service.py prev.csv curr.csv --socket /tmp/org_lookup.sock
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import signal
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from main import load_config, load_sample_data
+from matcher_config import CONFIG_PATH, ConfigWatcher
+from membership_index import build_membership_indexes
+from organization_processor import OrganizationProcessor
+from streaming_ingest import DEFAULT_CHUNK_ROWS, build_membership_indexes_from_files  # noqa: E501
+
+# 候補の件数の既定値
+DEFAULT_LIMIT = 5
+
+# 受け付けるリクエスト本文の最大バイト数
+MAX_BODY_BYTES = 1 << 20
+
+# 問い合わせの向きと、組織の列・相手の組織の列の対応
+SIDES = {
+    "prev": (cst.PREV_ORG, cst.CURR_ORG),
+    "curr": (cst.CURR_ORG, cst.PREV_ORG),
+}
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    """
+    リクエストが不正な場合に送出する例外。
+    """
+
+    def __init__(self, status: int, message: str):
+        """
+        コンストラクタ。
+
+        Args:
+            status (int): HTTPステータスコード。
+            message (str): エラーメッセージ。
+        """
+        super().__init__(message)
+        self.status = status
+
+
+def _to_json_value(value):
+    """
+    データフレームの値をJSONに変換できる値にする関数。
+
+    Args:
+        value: データフレームの値。
+
+    Returns:
+        JSONに変換できる値。欠損値はNone。
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NA or value is None:
+        return None
+    return value
+
+
+class MatchLookup:
+    """
+    組織ペアの結果と、組織名ごとの行の位置の索引を保持するクラス。
+    """
+
+    def __init__(self, df_results: pd.DataFrame, sources: dict = None):
+        """
+        コンストラクタ。
+
+        Args:
+            df_results (pd.DataFrame): 組織ペアの結果。
+            sources (dict, optional): 結果の元になった入力ファイルなどの情報。
+        """
+        self.df_results = df_results.reset_index(drop=True)
+        self.sources = sources or {}
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.same_org = self.df_results[cst.SAME_ORG].to_numpy(dtype=bool)
+        self.confirmed = self.df_results[cst.CONFIRMED].to_numpy(dtype=bool)
+        self.org_names = {
+            column: self.df_results[column].to_numpy(dtype=object)
+            for column in (cst.PREV_ORG, cst.CURR_ORG)
+        }
+        self.positions = {
+            column: self._build_positions(column)
+            for column in (cst.PREV_ORG, cst.CURR_ORG)
+        }
+
+    def _build_positions(self, column: str) -> dict[str, np.ndarray]:
+        """
+        組織名ごとに、行の位置を総合スコアの降順に並べた索引を作成する。
+
+        Args:
+            column (str): 組織の列名。
+
+        Returns:
+            dict[str, np.ndarray]: 組織名と行の位置の配列の辞書。
+        """
+        codes, orgs = pd.factorize(self.org_names[column])
+        scores = self.df_results[cst.TOTAL_SCORE].to_numpy(dtype=np.float64)
+        # 同じスコアの行は結果の並び順のまま残す
+        order = np.lexsort((-scores, codes))
+        bounds = np.concatenate(
+            [[0], np.cumsum(np.bincount(codes, minlength=len(orgs)))]
+        )
+        return {
+            org: order[bounds[code] : bounds[code + 1]]
+            for code, org in enumerate(orgs)
+        }
+
+    def lookup(self, side: str, org: str, limit: int = DEFAULT_LIMIT) -> dict:
+        """
+        組織の対応先と、総合スコアの高い順の候補を返す。
+
+        Args:
+            side (str): "prev"なら前月組織、"curr"なら当月組織として探す。
+            org (str): 組織名。
+            limit (int): 返す候補の最大件数。
+
+        Returns:
+            dict: 対応先（同一組織と判定された相手）と候補の辞書。
+        """
+        column, other_column = SIDES[side]
+        positions = self.positions[column].get(org)
+        if positions is None:
+            return {"org": org, "found": False, "matches": [], "candidates": []}  # noqa: E501
+        others = self.org_names[other_column]
+        return {
+            "org": org,
+            "found": True,
+            "matches": others[positions[self.same_org[positions]]].tolist(),
+            "confirmed": bool(self.confirmed[positions].any()),
+            "candidates": [
+                {key: _to_json_value(value) for key, value in row.items()}
+                for row in self.df_results.iloc[positions[:limit]].to_dict("records")  # noqa: E501
+            ],
+        }
+
+    def describe(self) -> dict:
+        """
+        読み込み状況を返す。
+
+        Returns:
+            dict: 行数・組織数・読み込み日時などの辞書。
+        """
+        return {
+            "rows": len(self.df_results),
+            "prev_orgs": len(self.positions[cst.PREV_ORG]),
+            "curr_orgs": len(self.positions[cst.CURR_ORG]),
+            "loaded_at": self.loaded_at,
+            **self.sources,
+        }
+
+
+class LookupService:
+    """
+    MatchLookupをHTTPで公開するasyncioのサービス。
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        prev_file: str = None,
+        curr_file: str = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            config (dict): 設定辞書。
+            prev_file (str, optional): 前月組織データのファイル。省略時はサンプルデータ。
+            curr_file (str, optional): 当月組織データのファイル。
+            chunk_rows (int): ファイルを一度に読み込む行数。
+        """
+        self.config = config
+        self.prev_file = prev_file
+        self.curr_file = curr_file
+        self.chunk_rows = chunk_rows
+        self.match_lookup = None
+        self.last_error = None
+        self._reload_lock = None
+
+    def build_lookup(self, config: dict, prev_file: str, curr_file: str) -> MatchLookup:  # noqa: E501
+        """
+        所属データを読み込んで結果を計算し、索引を作成する。
+
+        Args:
+            config (dict): 設定辞書。
+            prev_file (str): 前月組織データのファイル。Noneはサンプルデータ。
+            curr_file (str): 当月組織データのファイル。
+
+        Returns:
+            MatchLookup: 作成した索引。
+        """
+        processor = OrganizationProcessor(config)
+        if prev_file:
+            index_A, index_B = build_membership_indexes_from_files(
+                prev_file, curr_file, self.chunk_rows
+            )
+        else:
+            index_A, index_B = build_membership_indexes(*load_sample_data())
+        df_results = processor.calculate_and_update_index_scores(index_A, index_B)  # noqa: E501
+        return MatchLookup(
+            df_results,
+            {
+                "prev_file": prev_file,
+                "curr_file": curr_file,
+                "config_digest": processor.matcher.matcher_config.digest,
+            },
+        )
+
+    async def reload(self, config: dict = None) -> MatchLookup:
+        """
+        起動時に指定したファイルから結果を計算し直して差し替える。
+        計算中も前の結果で応答を続ける。
+
+        Args:
+            config (dict, optional): 新しい設定辞書。省略時は現在の設定。
+
+        Returns:
+            MatchLookup: 差し替えた索引。
+        """
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        async with self._reload_lock:
+            config = config or self.config
+            try:
+                match_lookup = await asyncio.to_thread(
+                    self.build_lookup, config, self.prev_file, self.curr_file
+                )
+            except Exception as error:
+                self.last_error = f"{type(error).__name__}: {error}"
+                raise
+            self.config = config
+            self.match_lookup = match_lookup
+            self.last_error = None
+            return match_lookup
+
+    async def handle_request(self, method: str, target: str, body: bytes) -> dict:  # noqa: E501
+        """
+        リクエストを処理して応答の内容を返す。
+
+        Args:
+            method (str): HTTPメソッド。
+            target (str): リクエストのパスとクエリ文字列。
+            body (bytes): リクエスト本文。
+
+        Returns:
+            dict: 応答の内容。
+
+        Raises:
+            RequestError: リクエストが不正な場合。
+        """
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        routes = {
+            "/health": ("GET", self._handle_health),
+            "/prev": ("GET", self._handle_point),
+            "/curr": ("GET", self._handle_point),
+            "/lookup": ("POST", self._handle_batch),
+            "/reload": ("POST", self._handle_reload),
+        }
+        if url.path not in routes:
+            raise RequestError(404, f"不明なパスです: {url.path}")
+        allowed, handler = routes[url.path]
+        if method != allowed:
+            raise RequestError(405, f"{url.path}は{allowed}で呼び出してください")
+        if url.path != "/health" and url.path != "/reload" and self.match_lookup is None:  # noqa: E501
+            raise RequestError(503, "結果を読み込み中です")
+        payload = {}
+        if method == "POST" and body:
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError as error:
+                raise RequestError(400, f"JSONを解析できません: {error}")
+            if not isinstance(payload, dict):
+                raise RequestError(400, "本文はJSONオブジェクトで指定してください")
+        return await handler(url.path, query, payload)
+
+    async def _handle_health(self, path: str, query: dict, payload: dict) -> dict:  # noqa: E501
+        """
+        読み込み状況を返す。
+
+        Args:
+            path (str): リクエストのパス。
+            query (dict): クエリ文字列の値。
+            payload (dict): リクエスト本文のJSON。
+
+        Returns:
+            dict: 応答の内容。
+        """
+        status = {"status": "ok" if self.match_lookup else "loading"}
+        if self.match_lookup is not None:
+            status.update(self.match_lookup.describe())
+        if self.last_error:
+            status["last_error"] = self.last_error
+        return status
+
+    async def _handle_point(self, path: str, query: dict, payload: dict) -> dict:  # noqa: E501
+        """
+        1つの組織の対応先と候補を返す。
+
+        Args:
+            path (str): リクエストのパス。
+            query (dict): クエリ文字列の値。
+            payload (dict): リクエスト本文のJSON。
+
+        Returns:
+            dict: 応答の内容。
+        """
+        if "org" not in query:
+            raise RequestError(400, "orgを指定してください")
+        limit = _parse_limit(query.get("limit", [DEFAULT_LIMIT])[0])
+        return self.match_lookup.lookup(path.lstrip("/"), query["org"][0], limit)  # noqa: E501
+
+    async def _handle_batch(self, path: str, query: dict, payload: dict) -> dict:  # noqa: E501
+        """
+        複数の組織の対応先と候補をまとめて返す。
+
+        Args:
+            path (str): リクエストのパス。
+            query (dict): クエリ文字列の値。
+            payload (dict): リクエスト本文のJSON。
+
+        Returns:
+            dict: 応答の内容。
+        """
+        side = payload.get("side", "prev")
+        orgs = payload.get("orgs")
+        if side not in SIDES:
+            raise RequestError(400, f"sideはprevまたはcurrで指定してください: {side}")  # noqa: E501
+        if not isinstance(orgs, list):
+            raise RequestError(400, "orgsは組織名のリストで指定してください")
+        limit = _parse_limit(payload.get("limit", DEFAULT_LIMIT))
+        match_lookup = self.match_lookup
+        return {
+            "results": [match_lookup.lookup(side, str(org), limit) for org in orgs]  # noqa: E501
+        }
+
+    async def _handle_reload(self, path: str, query: dict, payload: dict) -> dict:  # noqa: E501
+        """
+        起動時に指定したファイルから読み込み直す。
+
+        サーバー上の任意のファイルを読ませないよう、ファイルの指定は受け付けない。
+
+        Args:
+            path (str): リクエストのパス。
+            query (dict): クエリ文字列の値。
+            payload (dict): リクエスト本文のJSON。
+
+        Returns:
+            dict: 応答の内容。
+        """
+        if "prev_file" in payload or "curr_file" in payload:
+            raise RequestError(
+                400, "読み込み直せるのは起動時に指定したファイルだけです"
+            )
+        try:
+            match_lookup = await self.reload()
+        except Exception as error:
+            raise RequestError(500, f"再読み込みに失敗しました: {error}")
+        return {"status": "ok", **match_lookup.describe()}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        1つの接続のリクエストを順に処理する。HTTP/1.1のkeep-aliveに対応する。
+
+        Args:
+            reader (asyncio.StreamReader): 受信用のストリーム。
+            writer (asyncio.StreamWriter): 送信用のストリーム。
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    len(parts) == 3
+                    and parts[2] == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    if len(parts) != 3:
+                        raise RequestError(400, "リクエスト行が不正です")
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise RequestError(413, "本文が大きすぎます")
+                    body = await reader.readexactly(length) if length else b""
+                    status, content = 200, await self.handle_request(
+                        parts[0], parts[1], body
+                    )
+                except RequestError as error:
+                    status, content = error.status, {"error": str(error)}
+                except ValueError as error:
+                    status, content = 400, {"error": str(error)}
+                data = json.dumps(content, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                        "Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"  # noqa: E501
+                        "\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: str = None,
+        watch_config: bool = False,
+    ) -> None:
+        """
+        結果を読み込んでから接続の受け付けを始め、停止されるまで応答を続ける。
+
+        SIGHUPを受け取ると同じファイルから読み込み直す。watch_configを有効にすると、
+        設定ファイルの重みや閾値が変わったときにも結果を計算し直す。
+
+        Args:
+            host (str): 待ち受けるホスト。
+            port (int): 待ち受けるポート番号。
+            socket_path (str, optional): 指定した場合はUnixソケットで待ち受ける。
+            watch_config (bool): 設定ファイルの変更を監視するかどうか。
+        """
+        loop = asyncio.get_running_loop()
+        await self.reload()
+        try:
+            loop.add_signal_handler(
+                signal.SIGHUP, lambda: loop.create_task(self._reload_quietly())
+            )
+        except (AttributeError, NotImplementedError):
+            pass  # WindowsではSIGHUPを扱えない
+
+        watcher = None
+        if watch_config:
+            watcher = ConfigWatcher(
+                CONFIG_PATH,
+                on_reload=lambda config, _: loop.call_soon_threadsafe(
+                    lambda: loop.create_task(self._reload_quietly(config))
+                ),
+            )
+            watcher.start()
+
+        if socket_path:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, path=socket_path
+            )
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)  # noqa: E501
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.stop()
+
+    async def _reload_quietly(self, config: dict = None) -> None:
+        """
+        現在のファイルから読み込み直す。失敗した場合は前の結果を使い続ける。
+
+        Args:
+            config (dict, optional): 新しい設定辞書。
+        """
+        try:
+            await self.reload(config=config)
+        except Exception:
+            pass  # エラーはlast_errorに記録され、/healthで確認できる
+
+
+def _parse_limit(value) -> int:
+    """
+    候補の件数を検証する関数。
+
+    Args:
+        value: 指定された件数。
+
+    Returns:
+        int: 1以上の件数。
+
+    Raises:
+        RequestError: 件数が不正な場合。
+    """
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"limitは整数で指定してください: {value}")
+    if limit < 1:
+        raise RequestError(400, f"limitは1以上で指定してください: {limit}")
+    return limit
+
+
+def main():
+    """
+    メイン関数。結果を読み込んで問い合わせサービスを起動する。
+    """
+    parser = argparse.ArgumentParser(description="組織マッチングの問い合わせサービス")  # noqa: E501
+    parser.add_argument(
+        "prev_file",
+        nargs="?",
+        help="前月組織データのファイル（CSV・Parquet・Excel）。省略時はサンプルデータ",  # noqa: E501
+    )
+    parser.add_argument(
+        "curr_file", nargs="?", help="当月組織データのファイル（CSV・Parquet・Excel）"  # noqa: E501
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="ファイルを一度に読み込む行数",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるホスト")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けるポート番号")  # noqa: E501
+    parser.add_argument("--socket", help="Unixソケットのパス（指定時はTCPで待ち受けない）")  # noqa: E501
+    parser.add_argument(
+        "--watch-config",
+        action="store_true",
+        help="設定ファイルの変更を検知して結果を計算し直す",
+    )
+    args = parser.parse_args()
+    if (args.prev_file is None) != (args.curr_file is None):
+        parser.error("前月と当月のファイルを両方指定してください")
+
+    service = LookupService(
+        load_config(), args.prev_file, args.curr_file, args.chunk_rows
+    )
+    try:
+        asyncio.run(
+            service.serve(args.host, args.port, args.socket, args.watch_config)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
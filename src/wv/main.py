@@ -2,12 +2,16 @@
 メインスクリプト。
 """
 
-import os
+import argparse
 
 import pandas as pd
-import yaml
-from export_to_excel import export_to_excel
+from export_to_excel import export_partitions_to_excel, export_to_excel
+from matcher_config import CONFIG_PATH, MatcherConfig, load_config_file
+from membership_index import build_membership_indexes
 from organization_processor import OrganizationProcessor
+from review_store import ReviewStore, add_pair_fingerprints, apply_prior_decisions  # noqa: E501
+from run_report import RunReport, get_report_path
+from streaming_ingest import DEFAULT_CHUNK_ROWS, build_membership_indexes_from_files  # noqa: E501
 
 data_A = [
     {"org": "営業部", "user": "u1", "type": "full_time"},
@@ -55,8 +59,6 @@ data_A = [
 ]
 
 
-df_A = pd.DataFrame(data_A)
-
 data_B = [
     {"org": "営業部", "user": "u1", "type": "full_time"},
     {"org": "営業部", "user": "u2", "type": "full_time"},
@@ -101,14 +103,22 @@ data_B = [
     {"org": "経理部/経理課", "user": "u43", "type": "part_time"},
     {"org": "経理部/経理課", "user": "u44", "type": "part_time"},
 ]
-df_B = pd.DataFrame(data_B)
+
+
+def load_sample_data() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    ファイルを指定しない場合に使うサンプルの前月と当月の組織データを作成する関数。
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: 前月と当月の組織データフレーム。
+    """
+    return pd.DataFrame(data_A), pd.DataFrame(data_B)
 
 
 def load_config():
-    path = os.path.dirname(__file__)
-    filepath = os.path.join(path, "organization_matching_config.yaml")
-    with open(filepath, "r") as file:
-        config = yaml.safe_load(file)
+    config = load_config_file(CONFIG_PATH)
+    # 重みと閾値の設定が不正な場合は処理を始める前にエラーにする
+    MatcherConfig.from_dict(config)
     return config
 
 
@@ -116,11 +126,67 @@ def main():
     """
     メイン関数。データの準備、整合性チェック、結果の更新、および更新シミュレーションを行う。
     """
+    parser = argparse.ArgumentParser(description="組織マッチング")
+    parser.add_argument(
+        "prev_file",
+        nargs="?",
+        help="前月組織データのファイル（CSV・Parquet・Excel）。省略時はサンプルデータ",  # noqa: E501
+    )
+    parser.add_argument(
+        "curr_file", nargs="?", help="当月組織データのファイル（CSV・Parquet・Excel）"  # noqa: E501
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="ファイルを一度に読み込む行数",
+    )
+    parser.add_argument("--output", default="pandas_to_excel.xlsx", help="出力ファイル")  # noqa: E501
+    args = parser.parse_args()
+    if (args.prev_file is None) != (args.curr_file is None):
+        parser.error("前月と当月のファイルを両方指定してください")
+
     config = load_config()
-    orgProcess = OrganizationProcessor(config)
+    processing = config.get("processing", {})
+    report = RunReport(
+        processing.get("run_report", False),
+        processing.get("run_report_trace_memory", False),
+    )
+    orgProcess = OrganizationProcessor(config, report)
+
+    if args.prev_file:
+        # ファイルを分割して読み込みながら所属インデックスを作成する
+        with report.stage("read_inputs") as stage:
+            index_A, index_B = build_membership_indexes_from_files(
+                args.prev_file, args.curr_file, args.chunk_rows
+            )
+            stage["orgs"] = len(index_A) + len(index_B)
+    else:
+        with report.stage("build_membership_indexes") as stage:
+            df_A, df_B = load_sample_data()
+            index_A, index_B = build_membership_indexes(df_A, df_B)
+            stage["rows"] = len(df_A) + len(df_B)
+            stage["orgs"] = len(index_A) + len(index_B)
 
-    df_results = orgProcess.calculate_and_update_organization_scores(df_A, df_B)
-    export_to_excel(df_results, "pandas_to_excel.xlsx")
+    if orgProcess.spill_dir:
+        # 結果をディスクに書き出し、パーティションごとにエクスポートする
+        spilled = orgProcess.calculate_and_spill_index_scores(index_A, index_B)  # noqa: E501
+        export_partitions_to_excel(spilled.iter_partitions, args.output, report)  # noqa: E501
+    else:
+        df_results = orgProcess.calculate_and_update_index_scores(index_A, index_B)  # noqa: E501
+        reviewed = None
+        if orgProcess.review_store:
+            # 所属が変わっていないペアには前回の確認結果を反映し、未確定シートには
+            # 新しいペアと所属が変わったペアだけを出力する。全体シートは確認結果を
+            # 反映する元になるため、全てのペアを出力する
+            with report.stage("apply_prior_decisions") as stage:
+                add_pair_fingerprints(df_results, index_A, index_B)
+                store = ReviewStore.load(orgProcess.review_store)
+                reviewed = apply_prior_decisions(df_results, store)
+                stage["reviewed"] = int(reviewed.sum())
+                stage["rows"] = len(df_results)
+        export_to_excel(df_results, args.output, report, reviewed=reviewed)
+    report.write(get_report_path(args.output))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,318 @@
+"""
+組織マッチングの重みと閾値の設定を検証し、判定に使う形に変換するモジュール。
+
+設定ファイルの辞書は読み込み時に一度だけ検証し、閾値はサイズ順に並べた配列に
+変換する。長時間動かすプロセスでは、ConfigWatcherで設定ファイルの変更を検知して
+再起動せずに読み込み直せる。
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import os
+import threading
+from collections.abc import Callable
+
+import constants as cst
+import numpy as np
+import yaml
+
+# 既定の設定ファイルのパス
+CONFIG_PATH = os.path.join(
+    os.path.dirname(__file__), "organization_matching_config.yaml"
+)
+
+# 判定に使う重みの名前
+WEIGHT_NAMES = [cst.RANK_WEIGHT, cst.SIMILARITY_WEIGHT, cst.MEMBER_WEIGHT]
+
+
+def load_config_file(file_path: str = CONFIG_PATH) -> dict:
+    """
+    設定ファイルを読み込む関数。
+
+    Args:
+        file_path (str, optional): 設定ファイルのパス。
+
+    Returns:
+        dict: 設定辞書。
+    """
+    with open(file_path, "r") as file:
+        return yaml.safe_load(file)
+
+
+def _validate_number(value, name: str, lower: float = None, upper: float = None) -> float:  # noqa: E501
+    """
+    設定値が有限の数値で、指定した範囲に収まるかを検証する関数。
+
+    Args:
+        value: 設定値。
+        name (str): エラーメッセージに使う設定値の名前。
+        lower (float, optional): 下限。
+        upper (float, optional): 上限。
+
+    Returns:
+        float: 検証した設定値。
+
+    Raises:
+        ValueError: 数値でない、または範囲外の場合。
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name}は数値で指定してください: {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"{name}は有限の値で指定してください: {value!r}")
+    if (lower is not None and value < lower) or (upper is not None and value > upper):  # noqa: E501
+        raise ValueError(f"{name}は{lower}以上{upper}以下で指定してください: {value!r}")  # noqa: E501
+    return value
+
+
+class MatcherConfig:
+    """
+    検証済みの重みと閾値の設定を保持するクラス。
+
+    閾値はサイズの昇順に並べ、サイズ・類似度の閾値・共通メンバー割合の閾値・
+    コメントをそれぞれ配列として持つ。digestは重みと閾値の内容から計算する
+    ハッシュ値で、同じ設定かどうかの判定やキャッシュのキーに使う。
+    """
+
+    def __init__(self, weights: dict, thresholds: list[dict]):
+        """
+        コンストラクタ。
+
+        Args:
+            weights (dict): 重みの辞書。
+            thresholds (list[dict]): 組織サイズごとの閾値の辞書のリスト。
+
+        Raises:
+            ValueError: 重みや閾値が不正な場合。
+        """
+        if not isinstance(weights, dict):
+            raise ValueError("weightsが設定されていません")
+        for name in WEIGHT_NAMES:
+            if name not in weights:
+                raise ValueError(f"weights.{name}が設定されていません")
+            _validate_number(weights[name], f"weights.{name}")
+        if not isinstance(thresholds, list) or not thresholds:
+            raise ValueError("thresholdsを1つ以上設定してください")
+
+        checked = []
+        for position, threshold in enumerate(thresholds):
+            name = f"thresholds[{position}]"
+            if not isinstance(threshold, dict):
+                raise ValueError(f"{name}は辞書で指定してください")
+            for key in [
+                cst.SIZE,
+                cst.SIMILARITY_THRESHOLD,
+                cst.MEMBER_RATIO_THRESHOLD,
+                cst.COMMENT,
+            ]:
+                if key not in threshold:
+                    raise ValueError(f"{name}.{key}が設定されていません")
+            _validate_number(threshold[cst.SIZE], f"{name}.{cst.SIZE}", lower=0)
+            _validate_number(
+                threshold[cst.SIMILARITY_THRESHOLD],
+                f"{name}.{cst.SIMILARITY_THRESHOLD}",
+                lower=0,
+                upper=1,
+            )
+            _validate_number(
+                threshold[cst.MEMBER_RATIO_THRESHOLD],
+                f"{name}.{cst.MEMBER_RATIO_THRESHOLD}",
+                lower=0,
+                upper=1,
+            )
+            if not isinstance(threshold[cst.COMMENT], str):
+                raise ValueError(f"{name}.{cst.COMMENT}は文字列で指定してください")
+            checked.append(threshold)
+
+        # 閾値はサイズ順に一度だけ並べ替えておく
+        self.thresholds = sorted(checked, key=lambda x: x[cst.SIZE])
+        sizes = [t[cst.SIZE] for t in self.thresholds]
+        if len(set(sizes)) != len(sizes):
+            raise ValueError(f"thresholdsのsizeが重複しています: {sizes}")
+
+        self.weights = {name: weights[name] for name in WEIGHT_NAMES}
+        self.rank_weight = weights[cst.RANK_WEIGHT]
+        self.similarity_weight = weights[cst.SIMILARITY_WEIGHT]
+        self.member_weight = weights[cst.MEMBER_WEIGHT]
+        self.total_weight = (
+            self.rank_weight + self.similarity_weight + self.member_weight
+        )
+        self._size_list = sizes
+        self.threshold_sizes = np.array(sizes)
+        self.similarity_thresholds = np.array(
+            [t[cst.SIMILARITY_THRESHOLD] for t in self.thresholds]
+        )
+        self.member_ratio_thresholds = np.array(
+            [t[cst.MEMBER_RATIO_THRESHOLD] for t in self.thresholds]
+        )
+        self.threshold_comments = np.array(
+            [t[cst.COMMENT] for t in self.thresholds], dtype=object
+        )
+        text = json.dumps(
+            {"weights": self.weights, cst.THRESHOLDS: self.thresholds},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "MatcherConfig":
+        """
+        設定辞書から作成する。
+
+        Args:
+            config (dict): 設定辞書。
+
+        Returns:
+            MatcherConfig: 検証済みの設定。
+        """
+        if not isinstance(config, dict):
+            raise ValueError("設定は辞書で指定してください")
+        return cls(config.get("weights"), config.get(cst.THRESHOLDS))
+
+    def get_threshold(self, size: int) -> dict:
+        """
+        組織サイズに対応する閾値を二分探索で取得する。
+
+        Args:
+            size (int): 組織サイズ。
+
+        Returns:
+            dict: 閾値辞書。最大サイズを超えた場合は最後の閾値。
+        """
+        position = bisect.bisect_left(self._size_list, size)
+        return self.thresholds[min(position, len(self.thresholds) - 1)]
+
+    def get_threshold_indices(self, sizes: np.ndarray) -> np.ndarray:
+        """
+        組織サイズの配列に対応する閾値の位置を二分探索で取得する。
+
+        Args:
+            sizes (np.ndarray): 組織サイズの配列。
+
+        Returns:
+            np.ndarray: thresholds上の位置の配列。
+        """
+        indices = np.searchsorted(self.threshold_sizes, sizes, side="left")
+        # 最大サイズを超えた場合は最後の閾値を使う
+        return np.minimum(indices, len(self.threshold_sizes) - 1)
+
+
+def compile_matcher_config(config) -> MatcherConfig:
+    """
+    設定辞書を検証済みの設定に変換する関数。検証済みの設定はそのまま返す。
+
+    Args:
+        config (dict | MatcherConfig): 設定辞書または検証済みの設定。
+
+    Returns:
+        MatcherConfig: 検証済みの設定。
+    """
+    if isinstance(config, MatcherConfig):
+        return config
+    return MatcherConfig.from_dict(config)
+
+
+class ConfigWatcher:
+    """
+    設定ファイルの変更を検知して検証済みの設定を読み込み直すクラス。
+
+    check_for_changesを呼び出すたびに、またはstartで開始したスレッドが一定間隔で、
+    ファイルの更新日時とサイズを確認する。変更後の設定が不正な場合は
+    それまでの設定を使い続け、エラーをlast_errorに保持する。
+    """
+
+    def __init__(
+        self,
+        file_path: str = CONFIG_PATH,
+        on_reload: Callable[[dict, MatcherConfig], None] = None,
+        interval: float = 1.0,
+    ):
+        """
+        コンストラクタ。設定ファイルを読み込んで検証する。
+
+        Args:
+            file_path (str, optional): 設定ファイルのパス。
+            on_reload (Callable[[dict, MatcherConfig], None], optional):
+                設定を読み込み直したときに、設定辞書と検証済みの設定を渡して呼び出す関数。
+            interval (float): スレッドでファイルを確認する間隔（秒）。
+        """
+        self.file_path = file_path
+        self.on_reload = on_reload
+        self.interval = interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = self._get_signature()
+        self.config = load_config_file(file_path)
+        self.matcher_config = MatcherConfig.from_dict(self.config)
+
+    def _get_signature(self) -> tuple:
+        """
+        設定ファイルの更新日時とサイズを取得する。
+
+        Returns:
+            tuple: 更新日時（ナノ秒）とサイズ。ファイルがない場合はNone。
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check_for_changes(self) -> bool:
+        """
+        設定ファイルが変わっていれば読み込み直す。
+
+        Returns:
+            bool: 新しい設定を読み込んだ場合はTrue。
+        """
+        with self._lock:
+            signature = self._get_signature()
+            if signature is None or signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                config = load_config_file(self.file_path)
+                matcher_config = MatcherConfig.from_dict(config)
+            except (OSError, ValueError, yaml.YAMLError) as error:
+                # 編集途中などで不正な場合は、それまでの設定を使い続ける
+                self.last_error = error
+                return False
+            self.last_error = None
+            self.config = config
+            self.matcher_config = matcher_config
+        if self.on_reload is not None:
+            self.on_reload(config, matcher_config)
+        return True
+
+    def start(self) -> None:
+        """
+        設定ファイルを一定間隔で確認するスレッドを開始する。
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="config-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        設定ファイルを確認するスレッドを停止する。
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self) -> None:
+        """
+        停止されるまで設定ファイルを確認し続ける。
+        """
+        while not self._stop.wait(self.interval):
+            self.check_for_changes()
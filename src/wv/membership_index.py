@@ -0,0 +1,400 @@
+"""
+組織ごとの所属ユーザーを整数IDで保持する所属インデックスのモジュール。
+"""
+
+from collections import Counter
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from utils import calculate_composition_ratios, calculate_ratio_difference
+
+# 最上位組織として扱わない組織名
+ROOT_ORG = "組織"
+
+
+class OrgMembershipIndex:
+    """
+    組織ごとの所属ユーザーと区分別人数を保持するクラス。
+
+    ユーザーと組織は整数IDに変換して保持する。組織iの所属ユーザーIDは
+    indices[indptr[i]:indptr[i + 1]] に昇順で格納される（CSR形式）。
+    区分（雇用区分など）は生の値のリストではなく、組織×区分の人数として持つ。
+    """
+
+    def __init__(
+        self,
+        org_names: list[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        categories: list,
+        category_counts: np.ndarray,
+        row_counts: np.ndarray,
+        user_ids: dict,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            org_names (list[str]): 組織名のリスト。位置が組織IDになる。
+            indptr (np.ndarray): 組織ごとの所属ユーザーの開始位置。
+            indices (np.ndarray): 所属ユーザーIDを組織順に連結した配列。
+            categories (list): 区分のリスト。
+            category_counts (np.ndarray): 組織×区分の人数行列。
+            row_counts (np.ndarray): 組織ごとの元データの行数。
+            user_ids (dict): ユーザーから整数IDへのマッピング。
+        """
+        self.org_names = org_names
+        self.org_ids = {org: i for i, org in enumerate(org_names)}
+        self.indptr = indptr
+        self.indices = indices
+        self.categories = categories
+        self.category_counts = category_counts
+        self.row_counts = row_counts
+        self.user_ids = user_ids
+        self.sizes = np.diff(indptr)
+        self.ranks = np.array(
+            [org.count("/") + 1 for org in org_names], dtype=np.int64
+        )
+        self._user_org_index = None
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        user_ids: dict = None,
+        category_column: str = cst.TYPE,
+    ) -> "OrgMembershipIndex":
+        """
+        データフレームから所属インデックスを作成する。
+
+        Args:
+            df (pd.DataFrame): 組織・ユーザー・区分の列を持つデータフレーム。
+            user_ids (dict, optional): 前月と当月で共有するユーザーIDのマッピング。
+            category_column (str): 区分を表す列名。
+
+        Returns:
+            OrgMembershipIndex: 所属インデックス。
+        """
+        builder = MembershipIndexBuilder(user_ids, category_column)
+        builder.add_chunk(df)
+        return builder.build()
+
+    def __len__(self) -> int:
+        """
+        組織数を返す。
+
+        Returns:
+            int: 組織数。
+        """
+        return len(self.org_names)
+
+    def members(self, org_id: int) -> np.ndarray:
+        """
+        組織の所属ユーザーIDを返す。
+
+        Args:
+            org_id (int): 組織ID。
+
+        Returns:
+            np.ndarray: 昇順に並んだ所属ユーザーIDの配列。
+        """
+        return self.indices[self.indptr[org_id]:self.indptr[org_id + 1]]
+
+    def to_matrix(self, n_users: int = None) -> sparse.csr_matrix:
+        """
+        組織×ユーザーの接続行列を返す。
+
+        Args:
+            n_users (int, optional): 列数。省略時は登録済みユーザー数。
+
+        Returns:
+            sparse.csr_matrix: 所属していれば1となる行列。
+        """
+        if n_users is None:
+            n_users = len(self.user_ids)
+        return sparse.csr_matrix(
+            (np.ones(len(self.indices), dtype=np.int32), self.indices, self.indptr),  # noqa: E501
+            shape=(len(self), n_users),
+        )
+
+    def user_org_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        ユーザーから所属組織への逆引きインデックスを返す。
+
+        一度作成した逆引きインデックスは保持して使い回す。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: ユーザーuの所属組織IDが
+                org_ids[indptr[u]:indptr[u + 1]] に昇順で入る (indptr, org_ids)。
+        """
+        if self._user_org_index is None:
+            self._user_org_index = self._build_user_org_index()
+        return self._user_org_index
+
+    def _build_user_org_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        ユーザーから所属組織への逆引きインデックスを作成する。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (indptr, org_ids)。
+        """
+        org_of_entry = np.repeat(np.arange(len(self), dtype=np.int64), self.sizes)  # noqa: E501
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(len(self.user_ids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.indices, minlength=len(self.user_ids)),
+            out=indptr[1:],
+        )
+        return indptr, org_of_entry[order]
+
+    def composition_ratios(self, categories: list) -> np.ndarray:
+        """
+        指定した区分の並びで組織ごとの構成比を計算する。
+
+        Args:
+            categories (list): 区分のリスト。
+
+        Returns:
+            np.ndarray: 組織×区分の構成比行列。
+        """
+        position = {category: i for i, category in enumerate(self.categories)}
+        counts = np.zeros((len(self), len(categories)), dtype=np.int64)
+        for i, category in enumerate(categories):
+            if category in position:
+                counts[:, i] = self.category_counts[:, position[category]]
+        return calculate_composition_ratios(counts, self.row_counts)
+
+
+class MembershipIndexBuilder:
+    """
+    データを分割して受け取りながら所属インデックスを組み立てるクラス。
+
+    行ごとには最下位組織への直接所属だけを記録し、上位組織の所属は
+    build時に子組織から集約して求める。
+    """
+
+    def __init__(self, user_ids: dict = None, category_column: str = cst.TYPE):  # noqa: E501
+        """
+        コンストラクタ。
+
+        Args:
+            user_ids (dict, optional): 前月と当月で共有するユーザーIDのマッピング。
+            category_column (str): 区分を表す列名。
+        """
+        self.user_ids = {} if user_ids is None else user_ids
+        self.category_column = category_column
+        self.direct_users: dict[str, list[np.ndarray]] = {}
+        self.direct_counts: dict[str, Counter] = {}
+        self.direct_rows: dict[str, int] = {}
+
+    def add_chunk(self, df: pd.DataFrame) -> None:
+        """
+        データの一部を取り込む。
+
+        組織またはユーザーが欠損している行は取り込まない。
+
+        Args:
+            df (pd.DataFrame): 組織・ユーザー・区分の列を持つデータフレーム。
+        """
+        df = df[
+            df[cst.ORG].notna() & (df[cst.ORG] != ROOT_ORG) & df[cst.USER].notna()  # noqa: E501
+        ]
+        if df.empty:
+            return
+
+        org_codes, orgs = pd.factorize(df[cst.ORG])
+        user_codes, users = pd.factorize(df[cst.USER])
+        user_ids = self.user_ids
+        user_map = np.array(
+            [user_ids.setdefault(user, len(user_ids)) for user in users],
+            dtype=np.int64,
+        )
+        ids = user_map[user_codes]
+
+        # 最下位組織ごとに直接所属するユーザーをまとめる
+        order = np.argsort(org_codes, kind="stable")
+        bounds = np.searchsorted(org_codes[order], np.arange(len(orgs) + 1))
+        for code, org in enumerate(orgs):
+            rows = order[bounds[code]:bounds[code + 1]]
+            self.direct_users.setdefault(org, []).append(ids[rows])
+            self.direct_rows[org] = self.direct_rows.get(org, 0) + len(rows)
+            self.direct_counts.setdefault(org, Counter())
+
+        if self.category_column in df.columns:
+            grouped = df.groupby([cst.ORG, self.category_column], sort=False).size()  # noqa: E501
+            for (org, category), count in grouped.items():
+                self.direct_counts[org][category] += count
+
+    def build(self) -> OrgMembershipIndex:
+        """
+        取り込んだデータから所属インデックスを作成する。
+
+        Returns:
+            OrgMembershipIndex: 所属インデックス。
+        """
+        # 組織は元データで最初に現れた順に、上位組織を先に並べる
+        org_names = {}
+        for leaf in self.direct_users:
+            hierarchy = leaf.split("/")
+            for i in range(len(hierarchy)):
+                current_org = "/".join(hierarchy[: i + 1])
+                if current_org != ROOT_ORG:
+                    org_names.setdefault(current_org)
+        org_names = list(org_names)
+        org_ids = {org: i for i, org in enumerate(org_names)}
+
+        categories = dict.fromkeys(cst.EMPLOYEE_TYPES)
+        for counter in self.direct_counts.values():
+            for category in counter:
+                if isinstance(category, str):
+                    categories.setdefault(category)
+        categories = list(categories)
+        category_ids = {category: i for i, category in enumerate(categories)}
+
+        category_counts = np.zeros((len(org_names), len(categories)), dtype=np.int64)  # noqa: E501
+        row_counts = np.zeros(len(org_names), dtype=np.int64)
+        members: list[np.ndarray] = [None] * len(org_names)
+        for org, arrays in self.direct_users.items():
+            org_id = org_ids[org]
+            members[org_id] = np.concatenate(arrays)
+            row_counts[org_id] = self.direct_rows[org]
+            for category, count in self.direct_counts[org].items():
+                if category in category_ids:
+                    category_counts[org_id, category_ids[category]] = count
+
+        # 深い組織から順に、子組織の所属と人数を親組織へ積み上げる
+        parents = [org_ids.get(org.rpartition("/")[0], -1) for org in org_names]  # noqa: E501
+        children: list[list[int]] = [[] for _ in org_names]
+        for org_id, parent_id in enumerate(parents):
+            if parent_id >= 0:
+                children[parent_id].append(org_id)
+        depth_order = sorted(
+            range(len(org_names)), key=lambda i: -org_names[i].count("/")
+        )
+        for org_id in depth_order:
+            arrays = [members[child] for child in children[org_id]]
+            if members[org_id] is not None:
+                arrays.append(members[org_id])
+            members[org_id] = np.unique(np.concatenate(arrays))
+            parent_id = parents[org_id]
+            if parent_id >= 0:
+                category_counts[parent_id] += category_counts[org_id]
+                row_counts[parent_id] += row_counts[org_id]
+
+        sizes = np.array([len(m) for m in members], dtype=np.int64)
+        indptr = np.zeros(len(org_names) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+        indices = (
+            np.concatenate(members).astype(np.int64)
+            if members
+            else np.zeros(0, dtype=np.int64)
+        )
+        return OrgMembershipIndex(
+            org_names,
+            indptr,
+            indices,
+            categories,
+            category_counts,
+            row_counts,
+            self.user_ids,
+        )
+
+
+def build_membership_indexes(
+    df_A: pd.DataFrame, df_B: pd.DataFrame
+) -> tuple[OrgMembershipIndex, OrgMembershipIndex]:
+    """
+    前月と当月の所属インデックスをユーザーIDを共有して作成する関数。
+
+    Args:
+        df_A (pd.DataFrame): 前月組織データフレーム。
+        df_B (pd.DataFrame): 当月組織データフレーム。
+
+    Returns:
+        tuple[OrgMembershipIndex, OrgMembershipIndex]: 前月と当月の所属インデックス。
+    """
+    user_ids = {}
+    index_A = OrgMembershipIndex.from_dataframe(df_A, user_ids)
+    index_B = OrgMembershipIndex.from_dataframe(df_B, user_ids)
+    return index_A, index_B
+
+
+def build_org_dictionary(
+    index_A: OrgMembershipIndex, index_B: OrgMembershipIndex
+) -> tuple[pd.CategoricalDtype, np.ndarray]:
+    """
+    前月と当月の組織名をまとめた1つの辞書（カテゴリ型）を作成する関数。
+
+    前月の組織名を組織IDの順に並べ、その後に当月にだけある組織名を続ける。
+    前月組織のコードは組織IDと一致する。
+
+    Args:
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+
+    Returns:
+        tuple[pd.CategoricalDtype, np.ndarray]: 組織名のカテゴリ型と、
+            当月組織IDからコードへの対応配列。
+    """
+    categories = pd.Index(
+        list(dict.fromkeys(index_A.org_names + index_B.org_names)), dtype=object  # noqa: E501
+    )
+    curr_codes = categories.get_indexer(index_B.org_names).astype(np.int64)
+    return pd.CategoricalDtype(categories), curr_codes
+
+
+def build_pair_statistics(
+    index_A: OrgMembershipIndex,
+    index_B: OrgMembershipIndex,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    common: np.ndarray,
+) -> pd.DataFrame:
+    """
+    組織IDのペアと共通メンバー数から組織ペアの統計量テーブルを作成する関数。
+
+    各列は組織IDの配列から型付きの配列として一括で作成する。前月・当月の
+    組織名の列は、build_org_dictionaryで作成した1つの辞書を共有するカテゴリ型にする。
+
+    Args:
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+        rows (np.ndarray): 前月組織IDの配列。
+        cols (np.ndarray): 当月組織IDの配列。
+        common (np.ndarray): 共通メンバー数の配列。
+
+    Returns:
+        pd.DataFrame: 組織ペアの統計量のデータフレーム。
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    common = np.asarray(common, dtype=np.int64)
+    size_a = index_A.sizes[rows]
+    size_b = index_B.sizes[cols]
+    union = size_a + size_b - common
+
+    # 構成比率は組織ごとに一度だけ計算する
+    categories = list(dict.fromkeys(index_A.categories + index_B.categories))
+    ratios_A = index_A.composition_ratios(categories)
+    ratios_B = index_B.composition_ratios(categories)
+
+    org_dtype, curr_codes = build_org_dictionary(index_A, index_B)
+    return pd.DataFrame(
+        {
+            cst.PREV_ORG: pd.Categorical.from_codes(rows, dtype=org_dtype),
+            cst.CURR_ORG: pd.Categorical.from_codes(
+                curr_codes[cols], dtype=org_dtype
+            ),
+            cst.PREV_SIZE: size_a,
+            cst.CURR_SIZE: size_b,
+            cst.COMMON_MEMBERS: common,
+            cst.COMMON_RATIO: common / size_b,
+            cst.SIMILARITY_INDEX: common / union,
+            cst.RATIO_DIFF: calculate_ratio_difference(
+                ratios_A[rows], ratios_B[cols]
+            ),
+            cst.RANK_DIFF: index_A.ranks[rows] - index_B.ranks[cols],
+        }
+    )
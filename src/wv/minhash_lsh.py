@@ -0,0 +1,255 @@
+"""
+MinHashとLSHで類似した組織ペアの候補を近似的に求めるモジュール。
+"""
+
+import numpy as np
+import pandas as pd
+from membership_index import OrgMembershipIndex
+
+# ハッシュ関数 (a * x + b) mod p に使うメルセンヌ素数。
+# ユーザーIDと係数がともに2^31未満なら積がuint64に収まる。
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+# 署名の計算で一度に扱う組織数。メモリ使用量を抑えるために分割する
+SIGNATURE_BLOCK_ORGS = 1024
+
+
+def choose_band_parameters(
+    threshold: float, num_perm: int, recall_weight: float = 0.9
+) -> tuple[int, int]:
+    """
+    類似度の閾値に合わせてLSHのバンド数と1バンドあたりの行数を決める関数。
+
+    候補になる確率 1 - (1 - s^r)^b について、閾値未満での偽陽性と
+    閾値以上での偽陰性の面積の重み付き和が最小になる組み合わせを選ぶ。
+    偽陽性は後段の厳密計算で除かれるため、既定では偽陰性を重く見る。
+
+    Args:
+        threshold (float): Jaccard係数の閾値。
+        num_perm (int): 署名の長さ。
+        recall_weight (float): 偽陰性の重み（0〜1）。偽陽性の重みは残り。
+
+    Returns:
+        tuple[int, int]: (バンド数, 1バンドあたりの行数)。
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    step = grid[1] - grid[0]
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        probability = 1 - (1 - grid**rows) ** bands
+        false_positive = np.where(grid < threshold, probability, 0).sum()
+        false_negative = np.where(grid >= threshold, 1 - probability, 0).sum()  # noqa: E501
+        error = (
+            (1 - recall_weight) * false_positive + recall_weight * false_negative  # noqa: E501
+        ) * step
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    組織の所属ユーザー集合のMinHash署名とLSHによる候補ペア生成を行うクラス。
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        num_perm: int = 128,
+        seed: int = 0,
+        recall_weight: float = 0.9,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            threshold (float): 候補としたいJaccard係数の下限。
+            num_perm (int): 署名の長さ（ハッシュ関数の数）。
+            seed (int): ハッシュ関数の係数を決める乱数シード。
+            recall_weight (float): バンド設計で偽陰性に置く重み。
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_band_parameters(
+            threshold, num_perm, recall_weight
+        )
+        rng = np.random.default_rng(seed)
+        prime = int(MERSENNE_PRIME)
+        self.coef_a = rng.integers(1, prime, size=num_perm, dtype=np.uint64)
+        self.coef_b = rng.integers(0, prime, size=num_perm, dtype=np.uint64)
+        self.band_mix = rng.integers(
+            1, np.iinfo(np.int64).max, size=self.rows, dtype=np.uint64
+        )
+
+    def hash_users(self, n_users: int) -> np.ndarray:
+        """
+        全ユーザーIDのハッシュ値を計算する。
+
+        Args:
+            n_users (int): ユーザー数。
+
+        Returns:
+            np.ndarray: ユーザー×ハッシュ関数のハッシュ値行列。
+        """
+        user_ids = np.arange(n_users, dtype=np.uint64)[:, np.newaxis]
+        return (self.coef_a * user_ids + self.coef_b) % MERSENNE_PRIME
+
+    def signatures(
+        self, index: OrgMembershipIndex, user_hashes: np.ndarray
+    ) -> np.ndarray:
+        """
+        組織ごとのMinHash署名を計算する。
+
+        Args:
+            index (OrgMembershipIndex): 所属インデックス。
+            user_hashes (np.ndarray): hash_usersで計算したハッシュ値行列。
+
+        Returns:
+            np.ndarray: 組織×ハッシュ関数の署名行列。
+        """
+        signatures = np.full(
+            (len(index), self.num_perm), MERSENNE_PRIME, dtype=np.uint64
+        )
+        for start in range(0, len(index), SIGNATURE_BLOCK_ORGS):
+            stop = min(start + SIGNATURE_BLOCK_ORGS, len(index))
+            begin, end = index.indptr[start], index.indptr[stop]
+            if begin == end:
+                continue
+            hashes = user_hashes[index.indices[begin:end]]
+            offsets = index.indptr[start:stop] - begin
+            nonempty = index.sizes[start:stop] > 0
+            signatures[start:stop][nonempty] = np.minimum.reduceat(
+                hashes, offsets[nonempty], axis=0
+            )
+        return signatures
+
+    def band_keys(self, signatures: np.ndarray) -> list[np.ndarray]:
+        """
+        署名をバンドごとに1つの64bit値へまとめる。
+
+        Args:
+            signatures (np.ndarray): 署名行列。
+
+        Returns:
+            list[np.ndarray]: バンドごとの組織のキー配列のリスト。
+        """
+        keys = []
+        for band in range(self.bands):
+            block = signatures[:, band * self.rows:(band + 1) * self.rows]
+            # uint64の桁あふれは2^64を法とする計算としてそのまま使う
+            keys.append((block * self.band_mix).sum(axis=1, dtype=np.uint64))
+        return keys
+
+    def candidate_pairs(
+        self, index_A: OrgMembershipIndex, index_B: OrgMembershipIndex
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        いずれかのバンドが一致する前月組織と当月組織のペアを列挙する。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: 前月組織IDと当月組織IDの配列。
+                前月組織ID、当月組織IDの昇順に並ぶ。
+        """
+        n_users = max(len(index_A.user_ids), len(index_B.user_ids))
+        user_hashes = self.hash_users(n_users)
+        keys_A = self.band_keys(self.signatures(index_A, user_hashes))
+        keys_B = self.band_keys(self.signatures(index_B, user_hashes))
+
+        frames = []
+        for band_A, band_B in zip(keys_A, keys_B):
+            merged = pd.DataFrame(
+                {"key": band_A, "prev": np.arange(len(band_A))}
+            ).merge(
+                pd.DataFrame({"key": band_B, "curr": np.arange(len(band_B))}),
+                on="key",
+            )
+            frames.append(merged[["prev", "curr"]])
+        if not frames:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        pairs = (
+            pd.concat(frames, ignore_index=True)
+            .drop_duplicates()
+            .sort_values(["prev", "curr"])
+        )
+        return (
+            pairs["prev"].to_numpy(dtype=np.int64),
+            pairs["curr"].to_numpy(dtype=np.int64),
+        )
+
+
+def count_common_members(
+    index_A: OrgMembershipIndex,
+    index_B: OrgMembershipIndex,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> np.ndarray:
+    """
+    指定した組織ペアの共通メンバー数を正確に数える関数。
+
+    Args:
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+        rows (np.ndarray): 前月組織IDの配列。
+        cols (np.ndarray): 当月組織IDの配列。
+
+    Returns:
+        np.ndarray: 共通メンバー数の配列。
+    """
+    n_users = max(len(index_A.user_ids), len(index_B.user_ids))
+    matrix_A = index_A.to_matrix(n_users)[rows]
+    matrix_B = index_B.to_matrix(n_users)[cols]
+    return np.asarray(matrix_A.multiply(matrix_B).sum(axis=1)).ravel()
+
+
+def estimate_recall(
+    index_A: OrgMembershipIndex,
+    index_B: OrgMembershipIndex,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    threshold: float,
+    sample_size: int,
+    seed: int = 0,
+) -> float:
+    """
+    前月組織の標本について、厳密計算と比べた候補ペアの再現率を推定する関数。
+
+    標本の前月組織について疎行列の積で全ペアのJaccard係数を求め、
+    閾値以上のペアのうちLSHの候補に含まれる割合を返す。
+
+    Args:
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+        rows (np.ndarray): 候補ペアの前月組織IDの配列。
+        cols (np.ndarray): 候補ペアの当月組織IDの配列。
+        threshold (float): Jaccard係数の閾値。
+        sample_size (int): 標本とする前月組織の数。
+        seed (int): 標本抽出の乱数シード。
+
+    Returns:
+        float: 再現率の推定値。閾値以上のペアが標本にない場合は1.0。
+    """
+    rng = np.random.default_rng(seed)
+    sample = np.sort(
+        rng.choice(len(index_A), size=min(sample_size, len(index_A)), replace=False)  # noqa: E501
+    )
+    n_users = max(len(index_A.user_ids), len(index_B.user_ids))
+    overlap = (
+        index_A.to_matrix(n_users)[sample] @ index_B.to_matrix(n_users).T
+    ).tocoo()
+    exact_rows = sample[overlap.row]
+    union = index_A.sizes[exact_rows] + index_B.sizes[overlap.col] - overlap.data  # noqa: E501
+    similar = overlap.data / union >= threshold
+    if not similar.any():
+        return 1.0
+
+    found = set(zip(rows.tolist(), cols.tolist()))
+    expected = zip(exact_rows[similar].tolist(), overlap.col[similar].tolist())
+    hits = sum(pair in found for pair in expected)
+    return hits / int(similar.sum())
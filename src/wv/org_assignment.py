@@ -0,0 +1,132 @@
+"""
+組織ペアのスコアから前月組織と当月組織の1対1の割り当てを求めるモジュール。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+
+def assign_one_to_one(
+    df_results: pd.DataFrame,
+    score_column: str = cst.TOTAL_SCORE,
+    component_ids: np.ndarray = None,
+) -> np.ndarray:
+    """
+    総合スコアの合計が最大になる前月組織と当月組織の1対1の割り当てを求める関数。
+
+    組織ペアを重み付き二部グラフの辺とみなし、疎行列の割当問題として解く。
+    前月組織ごとに「割り当てなし」を表すダミーの当月組織を1つずつ加え、
+    コストを (最大スコア + 1 - スコア)、ダミーのコストを (最大スコア + 1) と
+    することで、スコア最大の割り当てを最小重みの完全マッチングとして求める。
+    スコアが0以下のペアは割り当てない。連結成分の番号を渡した場合、
+    ペアが1つだけの成分は割当問題を解かずにそのまま割り当てる。
+
+    Args:
+        df_results (pd.DataFrame): スコアが計算された組織データフレーム。
+        score_column (str): 割り当ての重みに使う列名。
+        component_ids (np.ndarray, optional): 行ごとの連結成分の番号。
+
+    Returns:
+        np.ndarray: 行ごとに割り当てられたペアならTrueとなる配列。
+    """
+    assigned = np.zeros(len(df_results), dtype=bool)
+    scores = df_results[score_column].to_numpy(dtype=np.float64)
+    positive = scores > 0
+    if component_ids is not None:
+        single = np.bincount(component_ids)[component_ids] == 1
+        assigned[single & positive] = True
+        positive &= ~single
+    edges = np.flatnonzero(positive)
+    if len(edges) == 0:
+        return assigned
+
+    prev_codes, prev_orgs = pd.factorize(df_results[cst.PREV_ORG].to_numpy()[edges])  # noqa: E501
+    curr_codes, curr_orgs = pd.factorize(df_results[cst.CURR_ORG].to_numpy()[edges])  # noqa: E501
+    n_prev, n_curr = len(prev_orgs), len(curr_orgs)
+
+    # コストはすべて1以上になるため、疎行列で明示的な0と区別がつく
+    offset = scores[edges].max() + 1
+    rows = np.concatenate([prev_codes, np.arange(n_prev)])
+    cols = np.concatenate([curr_codes, n_curr + np.arange(n_prev)])
+    costs = np.concatenate([offset - scores[edges], np.full(n_prev, offset)])
+    graph = sparse.csr_matrix((costs, (rows, cols)), shape=(n_prev, n_curr + n_prev))  # noqa: E501
+
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+    real = matched_cols < n_curr
+    chosen = pd.MultiIndex.from_arrays(
+        [matched_rows[real], matched_cols[real]]
+    )
+    assigned[edges[pd.MultiIndex.from_arrays([prev_codes, curr_codes]).isin(chosen)]] = True  # noqa: E501
+    return assigned
+
+
+def find_runner_ups(
+    df_results: pd.DataFrame,
+    key_column: str,
+    other_column: str,
+    score_column: str = cst.TOTAL_SCORE,
+) -> tuple[pd.Series, pd.Series]:
+    """
+    行ごとに、同じ組織の他のペアのうち最もスコアが高い相手組織とそのスコアを求める関数。
+
+    Args:
+        df_results (pd.DataFrame): スコアが計算された組織データフレーム。
+        key_column (str): 基準とする組織の列名。
+        other_column (str): 相手組織の列名。
+        score_column (str): 比較に使うスコアの列名。
+
+    Returns:
+        tuple[pd.Series, pd.Series]: 次点の相手組織とスコア。他のペアがない行は欠損値。
+    """
+    ranked = df_results[[key_column, other_column, score_column]].sort_values(
+        [key_column, score_column], ascending=[True, False], kind="stable"
+    )
+    position = ranked.groupby(key_column, sort=False).cumcount()
+    first = ranked[position == 0].set_index(key_column)
+    second = ranked[position == 1].set_index(key_column)
+
+    keys = df_results[key_column]
+    best_other = keys.map(first[other_column])
+    is_best = best_other.eq(df_results[other_column]).to_numpy()
+    # 自身が最高スコアのペアなら2番目、それ以外なら最高スコアのペアが次点
+    runner_up = best_other.where(~is_best, keys.map(second[other_column]))
+    runner_up_score = keys.map(first[score_column]).where(
+        ~is_best, keys.map(second[score_column])
+    )
+    return runner_up, runner_up_score
+
+
+def build_assignment_columns(
+    df_results: pd.DataFrame, component_ids: np.ndarray = None
+) -> pd.DataFrame:
+    """
+    割り当ての有無と、前月組織・当月組織ごとの次点の列を作成する関数。
+
+    Args:
+        df_results (pd.DataFrame): スコアが計算された組織データフレーム。
+        component_ids (np.ndarray, optional): 行ごとの連結成分の番号。
+
+    Returns:
+        pd.DataFrame: 割り当てと次点の列を持つデータフレーム。
+    """
+    prev_runner_up, prev_runner_up_score = find_runner_ups(
+        df_results, cst.PREV_ORG, cst.CURR_ORG
+    )
+    curr_runner_up, curr_runner_up_score = find_runner_ups(
+        df_results, cst.CURR_ORG, cst.PREV_ORG
+    )
+    return pd.DataFrame(
+        {
+            cst.ASSIGNED: assign_one_to_one(
+                df_results, component_ids=component_ids
+            ),
+            cst.PREV_RUNNER_UP: prev_runner_up,
+            cst.PREV_RUNNER_UP_SCORE: prev_runner_up_score,
+            cst.CURR_RUNNER_UP: curr_runner_up,
+            cst.CURR_RUNNER_UP_SCORE: curr_runner_up_score,
+        },
+        index=df_results.index,
+    )
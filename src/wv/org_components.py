@@ -0,0 +1,58 @@
+"""
+組織ペアのグラフを連結成分（クラスタ）に分割するモジュール。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+
+def label_components(df_results: pd.DataFrame) -> np.ndarray:
+    """
+    前月組織と当月組織を頂点、組織ペアを辺とするグラフの連結成分を求める関数。
+
+    同じ前月組織または当月組織を共有するペアは同じ成分になる。成分の番号は
+    結果の行に初めて現れた順に0から振る。
+
+    Args:
+        df_results (pd.DataFrame): 組織データフレーム。
+
+    Returns:
+        np.ndarray: 行ごとの成分番号の配列。
+    """
+    prev_codes, prev_orgs = pd.factorize(df_results[cst.PREV_ORG])
+    curr_codes, curr_orgs = pd.factorize(df_results[cst.CURR_ORG])
+    return label_pair_components(
+        prev_codes, curr_codes, len(prev_orgs), len(curr_orgs)
+    )
+
+
+def label_pair_components(
+    prev_codes: np.ndarray, curr_codes: np.ndarray, n_prev: int, n_curr: int
+) -> np.ndarray:
+    """
+    組織コードの組の並びから連結成分の番号を求める関数。
+
+    Args:
+        prev_codes (np.ndarray): 行ごとの前月組織のコード（0〜n_prev-1）。
+        curr_codes (np.ndarray): 行ごとの当月組織のコード（0〜n_curr-1）。
+        n_prev (int): 前月組織のコードの数。
+        n_curr (int): 当月組織のコードの数。
+
+    Returns:
+        np.ndarray: 行ごとの成分番号の配列。番号は行に初めて現れた順に振る。
+    """
+    if len(prev_codes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    n_vertices = n_prev + n_curr
+    graph = sparse.csr_matrix(
+        (np.ones(len(prev_codes), dtype=np.int8), (prev_codes, n_prev + curr_codes)),  # noqa: E501
+        shape=(n_vertices, n_vertices),
+    )
+    _, labels = connected_components(graph, directed=False)
+    # 成分の番号を結果に現れた順に振り直す
+    component_ids, _ = pd.factorize(labels[prev_codes])
+    return component_ids.astype(np.int64)
+
@@ -3,6 +3,9 @@
 """
 
 import constants as constants
+import numpy as np
+import pandas as pd
+from matcher_config import MatcherConfig, compile_matcher_config
 
 
 class OrganizationMatcher:
@@ -10,19 +13,26 @@ class OrganizationMatcher:
     組織の一致を判定するクラス。
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         コンストラクタ。
 
         Args:
-            config (dict): 設定辞書。
+            config (dict | MatcherConfig): 設定辞書または検証済みの設定。
         """
-        self.config = config
-        self.total_weight = (
-            config["weights"]["rank_weight"]
-            + config["weights"]["similarity_weight"]
-            + config["weights"]["member_weight"]
-        )
+        self.set_config(config)
+
+    def set_config(self, config) -> None:
+        """
+        判定に使う設定を差し替える。
+
+        設定は1つの属性にまとめて保持するため、計算中に差し替えても
+        各計算は差し替え前か後のどちらか一方の設定で行われる。
+
+        Args:
+            config (dict | MatcherConfig): 設定辞書または検証済みの設定。
+        """
+        self.matcher_config = compile_matcher_config(config)
 
     def get_thresholds(self, size: int) -> dict:
         """
@@ -34,25 +44,22 @@ class OrganizationMatcher:
         Returns:
             dict: 閾値辞書。
         """
-        thresholds = sorted(
-            self.config[constants.THRESHOLDS], key=lambda x: x[constants.SIZE]
-        )
-        for threshold in thresholds:
-            if size <= threshold[constants.SIZE]:
-                return threshold
-        return thresholds[-1]  # 最大サイズを超えた場合は最後の閾値を返す
+        return self.matcher_config.get_threshold(size)
 
-    def calculate_rank_score(self, rank_diff: int) -> float:
+    def calculate_rank_score(
+        self, rank_diff: int, settings: MatcherConfig = None
+    ) -> float:
         """
         ランク差のスコアを計算する。
 
         Args:
             rank_diff (int): ランク差。
+            settings (MatcherConfig, optional): 使用する設定。省略時は現在の設定。
 
         Returns:
             float: ランクスコア。
         """
-        base_rank_weight = self.config["weights"][constants.RANK_WEIGHT]
+        base_rank_weight = (settings or self.matcher_config).rank_weight
         if rank_diff == 0:
             return base_rank_weight
         elif rank_diff > 0:
@@ -80,10 +87,11 @@ class OrganizationMatcher:
         Returns:
             dict: スコア辞書。
         """
+        settings = self.matcher_config
         size_a = row_dict[constants.PREV_SIZE]
         size_b = row_dict[constants.CURR_SIZE]
-        thresholds_a = self.get_thresholds(size_a)
-        thresholds_b = self.get_thresholds(size_b)
+        thresholds_a = settings.get_threshold(size_a)
+        thresholds_b = settings.get_threshold(size_b)
 
         similarity_threshold = min(
             thresholds_a[constants.SIMILARITY_THRESHOLD],
@@ -95,16 +103,18 @@ class OrganizationMatcher:
         )
 
         # ランク差のスコアを設定
-        rank_score = self.calculate_rank_score(row_dict[constants.RANK_DIFF])
+        rank_score = self.calculate_rank_score(
+            row_dict[constants.RANK_DIFF], settings
+        )
 
         similarity_score = (
             row_dict[constants.SIMILARITY_INDEX] >= similarity_threshold
-        ) * self.config["weights"][constants.SIMILARITY_WEIGHT]
+        ) * settings.similarity_weight
         member_score = (
             row_dict[constants.COMMON_RATIO] >= member_ratio_threshold
-        ) * self.config["weights"][constants.MEMBER_WEIGHT]
+        ) * settings.member_weight
         total_score = rank_score + similarity_score + member_score
-        same_org = total_score >= self.total_weight
+        same_org = total_score >= settings.total_weight
 
         # 3人未満で同じ組織名の場合、同一組織と見なす
         if (
@@ -115,10 +125,173 @@ class OrganizationMatcher:
             same_org = True
 
         return {
-            "ランクスコア": rank_score,
-            "類似度スコア": similarity_score,
-            "メンバースコア": member_score,
-            "総合スコア": total_score,
-            "適用ルール": thresholds_a["comment"],
+            constants.RANK_SCORE: rank_score,
+            constants.SIMILARITY_SCORE: similarity_score,
+            constants.MEMBER_SCORE: member_score,
+            constants.TOTAL_SCORE: total_score,
+            constants.APPLIED_RULE: thresholds_a["comment"],
             constants.SAME_ORG: same_org,
         }
+
+    def get_threshold_indices(self, sizes: np.ndarray) -> np.ndarray:
+        """
+        組織サイズの配列に対応する閾値の位置を二分探索で取得する。
+
+        Args:
+            sizes (np.ndarray): 組織サイズの配列。
+
+        Returns:
+            np.ndarray: 設定の閾値の並び上の位置の配列。
+        """
+        return self.matcher_config.get_threshold_indices(sizes)
+
+    def calculate_rank_scores(
+        self, rank_diffs: np.ndarray, settings: MatcherConfig = None
+    ) -> np.ndarray:
+        """
+        ランク差の配列からランクスコアの配列を計算する。
+
+        Args:
+            rank_diffs (np.ndarray): ランク差の配列。
+            settings (MatcherConfig, optional): 使用する設定。省略時は現在の設定。
+
+        Returns:
+            np.ndarray: ランクスコアの配列。
+        """
+        base_rank_weight = (settings or self.matcher_config).rank_weight
+        rank_diffs = np.asarray(rank_diffs)
+        down = np.maximum(base_rank_weight - rank_diffs * 0.5, 0)
+        up = np.maximum(base_rank_weight - np.abs(rank_diffs), 0)
+        return np.where(
+            rank_diffs == 0,
+            base_rank_weight,
+            np.where(rank_diffs > 0, down, up),
+        ).astype(np.float64)
+
+    def can_reach_same_org(
+        self,
+        size_a: np.ndarray,
+        size_b: np.ndarray,
+        rank_diffs: np.ndarray,
+        same_name: np.ndarray,
+    ) -> np.ndarray:
+        """
+        人数とランク差だけから同一組織と判定され得るかを判定する。
+
+        類似度指数は min(|A|,|B|) / max(|A|,|B|) 以下、共通メンバー割合は
+        min(|A|,|B|) / |B| 以下になる。この上限で類似度スコアとメンバースコアを
+        満点と仮定しても総合スコアが重みの合計に届かないペアはFalseになる。
+
+        Args:
+            size_a (np.ndarray): 前月組織の人数の配列。
+            size_b (np.ndarray): 当月組織の人数の配列。
+            rank_diffs (np.ndarray): ランク差の配列。
+            same_name (np.ndarray): 前月と当月の組織名が同じかどうかの配列。
+
+        Returns:
+            np.ndarray: 同一組織と判定され得る場合にTrueとなる配列。
+        """
+        settings = self.matcher_config
+        if min(settings.weights.values()) < 0:
+            # 負の重みがあると上限の仮定が成り立たないため除外しない
+            return np.ones(len(size_a), dtype=bool)
+
+        index_a = settings.get_threshold_indices(size_a)
+        index_b = settings.get_threshold_indices(size_b)
+        smaller = np.minimum(size_a, size_b)
+        larger = np.maximum(size_a, size_b)
+        similarity_bound = np.divide(
+            smaller, larger, out=np.zeros(len(smaller)), where=larger > 0
+        )
+        member_bound = np.divide(
+            smaller, size_b, out=np.zeros(len(smaller)), where=size_b > 0
+        )
+
+        max_total_score = (
+            self.calculate_rank_scores(rank_diffs, settings)
+            + (
+                similarity_bound
+                >= np.minimum(
+                    settings.similarity_thresholds[index_a],
+                    settings.similarity_thresholds[index_b],
+                )
+            )
+            * settings.similarity_weight
+            + (
+                member_bound
+                >= np.minimum(
+                    settings.member_ratio_thresholds[index_a],
+                    settings.member_ratio_thresholds[index_b],
+                )
+            )
+            * settings.member_weight
+        )
+        # 3人未満で同じ組織名の場合はスコアによらず同一組織と見なされる
+        small_same_name = (size_a < 3) & (size_b != 0) & same_name
+        return (max_total_score >= settings.total_weight) | small_same_name
+
+    def calculate_similarity_scores(self, df_pairs: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+        """
+        組織ペアのテーブル全体のスコアを配列演算で一括計算する。
+
+        calculate_similarity_score_with_ratioを各行に適用した結果と同じ値を返す。
+
+        Args:
+            df_pairs (pd.DataFrame): 組織ペアの統計量データフレーム。
+
+        Returns:
+            pd.DataFrame: df_pairsと同じインデックスを持つスコアのデータフレーム。
+        """
+        settings = self.matcher_config
+        size_a = df_pairs[constants.PREV_SIZE].to_numpy()
+        size_b = df_pairs[constants.CURR_SIZE].to_numpy()
+        index_a = settings.get_threshold_indices(size_a)
+        index_b = settings.get_threshold_indices(size_b)
+
+        similarity_threshold = np.minimum(
+            settings.similarity_thresholds[index_a],
+            settings.similarity_thresholds[index_b],
+        )
+        member_ratio_threshold = np.minimum(
+            settings.member_ratio_thresholds[index_a],
+            settings.member_ratio_thresholds[index_b],
+        )
+
+        rank_score = self.calculate_rank_scores(
+            df_pairs[constants.RANK_DIFF].to_numpy(), settings
+        )
+        similarity_score = (
+            df_pairs[constants.SIMILARITY_INDEX].to_numpy() >= similarity_threshold  # noqa: E501
+        ) * settings.similarity_weight
+        member_score = (
+            df_pairs[constants.COMMON_RATIO].to_numpy() >= member_ratio_threshold  # noqa: E501
+        ) * settings.member_weight
+        total_score = rank_score + similarity_score + member_score
+        same_org = total_score >= settings.total_weight
+
+        # 3人未満で同じ組織名の場合、同一組織と見なす
+        prev_orgs = df_pairs[constants.PREV_ORG]
+        curr_orgs = df_pairs[constants.CURR_ORG]
+        if (
+            isinstance(prev_orgs.dtype, pd.CategoricalDtype)
+            and prev_orgs.dtype == curr_orgs.dtype
+        ):
+            # 組織名の辞書を共有していれば、コードの比較で済む
+            same_name = (
+                prev_orgs.cat.codes.to_numpy() == curr_orgs.cat.codes.to_numpy()  # noqa: E501
+            )
+        else:
+            same_name = prev_orgs.to_numpy(dtype=object) == curr_orgs.to_numpy(dtype=object)  # noqa: E501
+        same_org = same_org | ((size_a < 3) & (size_b != 0) & same_name)
+
+        return pd.DataFrame(
+            {
+                constants.RANK_SCORE: rank_score,
+                constants.SIMILARITY_SCORE: similarity_score,
+                constants.MEMBER_SCORE: member_score,
+                constants.TOTAL_SCORE: total_score,
+                constants.APPLIED_RULE: settings.threshold_comments[index_a],
+                constants.SAME_ORG: same_org,
+            },
+            index=df_pairs.index,
+        )
@@ -2,32 +2,151 @@
 組織の処理を行うモジュール。
 """
 
-from itertools import product
-
 import constants as cst
+import numpy as np
 import pandas as pd
+from incremental_state import (
+    MatchingState,
+    calculate_config_digest,
+    compute_org_fingerprints,
+    find_changed_orgs,
+)
+from matcher_config import MatcherConfig
+from membership_index import (
+    OrgMembershipIndex,
+    build_membership_indexes,
+    build_org_dictionary,
+    build_pair_statistics,
+)
+from minhash_lsh import MinHashLSH, count_common_members, estimate_recall
+from org_assignment import build_assignment_columns
+from org_components import label_components, label_pair_components
 from organization_matcher import OrganizationMatcher
+from overlap_engine import SparseOverlapEngine
+from parallel_scoring import (
+    resolve_worker_count,
+    score_in_parallel,
+    split_prev_orgs,
+)
+from results_store import ResultsStore, cascade_confirmation
+from run_report import DISABLED_REPORT, RunReport
+from spill_store import SpilledResults
 from utils import (
-    build_org_user_set,
-    calculate_employee_ratio,
+    build_composition_ratios,
     calculate_rank,
     calculate_ratio_difference,
 )
 
 
+def _calculate_result_digest(config: dict) -> str:
+    """
+    結果に影響する設定のハッシュ値を計算する関数。
+
+    Args:
+        config (dict): 設定辞書。
+
+    Returns:
+        str: SHA-256のハッシュ値。
+    """
+    processing = config.get("processing", {})
+    # 並列数や状態ファイルの場所は結果に影響しないため、比較対象から除く
+    return calculate_config_digest(
+        {
+            **config,
+            "processing": {
+                key: value
+                for key, value in processing.items()
+                if key
+                not in (
+                    "workers",
+                    "state_file",
+                    "confirmation",
+                    "review_store",
+                    "confirmation_journal",
+                    "journal_checkpoint_interval",
+                )
+            },
+        }
+    )
+
+
+def _renumber(codes: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    コードを初めて現れた順に0から振り直す関数。
+
+    Args:
+        codes (np.ndarray): コードの配列。
+
+    Returns:
+        tuple[np.ndarray, int]: 振り直したコードとコードの数。
+    """
+    renumbered, uniques = pd.factorize(codes)
+    return renumbered, len(uniques)
+
+
 class OrganizationProcessor:
     """
     組織の処理を行うクラス。
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, report: RunReport = None):
         """
         コンストラクタ。
 
         Args:
             config (dict): 設定辞書。
+            report (RunReport, optional): 段階ごとの計測値を記録する実行レポート。
+                省略時は計測しない。
         """
         self.matcher = OrganizationMatcher(config)
+        self.report = DISABLED_REPORT if report is None else report
+        processing = config.get("processing", {})
+        self.processing = processing
+        self.engine = processing.get("engine", "python")
+        if self.engine not in ("python", "sparse"):
+            raise ValueError(f"不明な計算エンジンです: {self.engine}")
+        self.workers = resolve_worker_count(processing.get("workers", 1))
+        self.candidate_mode = processing.get("candidates", "exact")
+        if self.candidate_mode not in ("exact", "minhash"):
+            raise ValueError(f"不明な候補生成方法です: {self.candidate_mode}")
+        self.minhash_config = processing.get("minhash", {})
+        self.keep_low_score_rows = processing.get("keep_low_score_rows", False)  # noqa: E501
+        self.confirmation = processing.get("confirmation", "cascade")
+        if self.confirmation not in ("cascade", "assignment"):
+            raise ValueError(f"不明な確定方法です: {self.confirmation}")
+        # 前回の結果を再利用する差分計算の状態ファイル。未設定なら毎回全件計算する
+        self.state_file = processing.get("state_file")
+        # 結果をディスクのパーティションに書き出す場合の保存先と分割数
+        self.spill_dir = processing.get("spill_dir")
+        self.spill_partitions = processing.get("spill_partitions", 16)
+        if self.spill_dir and (self.state_file or self.confirmation != "cascade"):  # noqa: E501
+            raise ValueError(
+                "spill_dirはstate_file、confirmation: assignmentと同時には使えません"  # noqa: E501
+            )
+        # 過去の確認結果を再利用する場合の保存先。未設定なら全てのペアを出力する
+        self.review_store = processing.get("review_store")
+        if self.spill_dir and self.review_store:
+            raise ValueError("spill_dirはreview_storeと同時には使えません")
+        self.config_digest = _calculate_result_digest(config)
+        # 直近の実行の集計値（候補ペア数、除外ペア数、近似モードの再現率など）
+        self.stats = {}
+        # 近似モードの候補ペア。同じ所属インデックスに対して繰り返し呼ぶ場合に再利用する
+        self._minhash_cache = None
+
+    def reload_matcher_config(self, config: dict, matcher_config: MatcherConfig = None) -> None:  # noqa: E501
+        """
+        重みと閾値の設定を読み込み直す関数。ConfigWatcherのon_reloadに渡して使う。
+
+        処理方法（processing）の設定は作成時のものを使い続ける。
+
+        Args:
+            config (dict): 新しい設定辞書。
+            matcher_config (MatcherConfig, optional): 検証済みの設定。省略時はconfigから作成する。
+        """
+        self.matcher.set_config(matcher_config or config)
+        self.config_digest = _calculate_result_digest(
+            {**config, "processing": self.processing}
+        )
 
     def process_all_organizations(
         self, df_A: pd.DataFrame, df_B: pd.DataFrame
@@ -42,28 +161,270 @@ class OrganizationProcessor:
         Returns:
             pd.DataFrame: 処理された組織データフレーム。
         """
-        # データフレームから組織とユーザーのマッピングを作成
-        org_users_A = build_org_user_set(
-            df_A, additional_columns=["org_code", "group_code", "type"]
-        )
-        org_users_B = build_org_user_set(df_B, additional_columns=["org_code", "type"])  # noqa: E501
+        self.stats = {}
+        # データフレームから組織とユーザーの所属インデックスを作成
+        index_A, index_B = build_membership_indexes(df_A, df_B)
 
-        # 結果リストを作成
-        results = []
-        for org_a, org_b in product(org_users_A.items(), org_users_B.items()):
-            result = self.process_organization_pair(org_a, org_b)
-            if result:
-                results.append(result)
+        # 結果データフレームを作成
+        df_results = self.build_results(index_A, index_B)
+        df_results[cst.COMPONENT_ID] = label_components(df_results)
 
         # 組織の一致判定と確定処理
-        df_results = pd.DataFrame(results)
-        df_results = self.update_organization_matches(df_results)
+        df_results = self.confirm_matches(df_results)
         return df_results
 
+    def build_results(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+        curr_mask: np.ndarray = None,
+    ) -> pd.DataFrame:
+        """
+        設定された計算エンジンで全組織ペアのスコア付き結果を作成する関数。
+
+        並列数が2以上の場合は前月組織を分割してプロセスプールで計算する。
+        keep_low_score_rowsが無効な場合、人数とランク差だけで同一組織と
+        判定され得ないと分かるペアは統計量を計算する前に除外する。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+            curr_mask (np.ndarray, optional): 対象とする当月組織をTrueとする
+                組織IDごとの配列。省略時は全組織。
+
+        Returns:
+            pd.DataFrame: スコアが計算された組織データフレーム。
+        """
+        if self.workers > 1 and self.candidate_mode == "exact":
+            return score_in_parallel(
+                self, index_A, index_B, self.workers, prev_ids, curr_mask
+            )
+        return self.score_prev_orgs(index_A, index_B, prev_ids, curr_mask)
+
+    def score_prev_orgs(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+        curr_mask: np.ndarray = None,
+    ) -> pd.DataFrame:
+        """
+        指定した前月組織について、組織ペアのスコア付き結果を1プロセスで作成する関数。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+            curr_mask (np.ndarray, optional): 対象とする当月組織をTrueとする
+                組織IDごとの配列。省略時は全組織。
+
+        Returns:
+            pd.DataFrame: スコアが計算された組織データフレーム。
+        """
+        rows, cols, common = self.find_overlapping_pairs(
+            index_A, index_B, prev_ids
+        )
+        if curr_mask is not None:
+            target = curr_mask[cols]
+            rows, cols, common = rows[target], cols[target], common[target]
+        self.count_stat("candidate_pairs", len(rows))
+
+        if not self.keep_low_score_rows:
+            # 人数だけで同一組織と判定され得ないと分かるペアを除外する
+            reachable = self.matcher.can_reach_same_org(
+                index_A.sizes[rows],
+                index_B.sizes[cols],
+                index_A.ranks[rows] - index_B.ranks[cols],
+                np.asarray(index_A.org_names, dtype=object)[rows]
+                == np.asarray(index_B.org_names, dtype=object)[cols],
+            )
+            self.count_stat("pruned_pairs", int((~reachable).sum()))
+            rows, cols, common = rows[reachable], cols[reachable], common[reachable]  # noqa: E501
+
+        self.count_stat("emitted_pairs", len(rows))
+        df_pairs = build_pair_statistics(index_A, index_B, rows, cols, common)
+        return self.score_pair_table(df_pairs)
+
+    def count_stat(self, name: str, value: int) -> None:
+        """
+        直近の実行の集計値に加算する関数。
+
+        Args:
+            name (str): 集計値の名前。
+            value (int): 加算する値。
+        """
+        self.stats[name] = self.stats.get(name, 0) + value
+
+    def find_overlapping_pairs(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        設定された方法で共通メンバーを持つ組織ペアを求める関数。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: 前月組織ID、当月組織ID、
+                共通メンバー数の配列。前月組織ID、当月組織IDの昇順に並ぶ。
+        """
+        if self.candidate_mode == "minhash":
+            rows, cols, common = self.find_minhash_candidates(index_A, index_B)  # noqa: E501
+            if prev_ids is not None:
+                target = np.isin(rows, prev_ids)
+                rows, cols, common = rows[target], cols[target], common[target]  # noqa: E501
+            return rows, cols, common
+        if self.engine == "sparse":
+            # 疎行列の積で全ペアの共通メンバー数を一括計算する
+            return SparseOverlapEngine().compute_overlaps(
+                index_A, index_B, prev_ids
+            )
+        return self.generate_candidate_pairs(index_A, index_B, prev_ids)
+
+    def generate_candidate_pairs(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        共通ユーザーを1人以上持つ組織ペアのみを候補として列挙する関数。
+
+        当月組織のユーザー→組織逆引きインデックスを作成し、前月組織ごとに
+        所属ユーザーから当月組織を引くことで、共通ユーザーのないペアを
+        生成せずに済ませる。引いた回数がそのまま共通メンバー数になる。
+        候補の並びは前月組織×当月組織の直積順と同じ。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: 前月組織ID、当月組織ID、
+                共通メンバー数の配列。
+        """
+        user_indptr, user_orgs = index_B.user_org_index()
+        if prev_ids is None:
+            prev_ids = range(len(index_A))
+
+        rows = []
+        cols = []
+        counts = []
+        for org_id in prev_ids:
+            users = index_A.members(org_id)
+            starts = user_indptr[users]
+            lengths = user_indptr[users + 1] - starts
+            total = lengths.sum()
+            if total == 0:
+                continue
+            # 各ユーザーの所属組織の範囲を1本の位置配列に展開する
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            positions = offsets + np.arange(total)
+            org_b_ids, common = np.unique(user_orgs[positions], return_counts=True)  # noqa: E501
+            rows.append(np.full(len(org_b_ids), org_id, dtype=np.int64))
+            cols.append(org_b_ids)
+            counts.append(common)
+
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(counts)  # noqa: E501
+
+    def find_minhash_candidates(
+        self, index_A: OrgMembershipIndex, index_B: OrgMembershipIndex
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        MinHashとLSHで共通メンバーを持つ組織ペアの候補を求める関数。
+
+        LSHの閾値には設定の類似度閾値のうち最も低い値を使う。候補ペアの
+        共通メンバー数は厳密に数え、標本による再現率の推定値をstatsに記録する。
+        パーティションや差分計算で前月組織を分けて呼び出しても署名とLSHを
+        作り直さないよう、同じ所属インデックスと設定の結果は保持して再利用する。
+        再現率は全ての前月組織から抽出した標本で1回だけ推定する。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: 前月組織ID、当月組織ID、
+                共通メンバー数の配列。
+        """
+        threshold = float(self.matcher.matcher_config.similarity_thresholds.min())  # noqa: E501
+        settings = (threshold, tuple(sorted(self.minhash_config.items())))
+        cache = self._minhash_cache
+        if (
+            cache is None
+            or cache["index_A"] is not index_A
+            or cache["index_B"] is not index_B
+            or cache["settings"] != settings
+        ):
+            cache = self._build_minhash_candidates(index_A, index_B, threshold)
+            cache.update(index_A=index_A, index_B=index_B, settings=settings)
+            self._minhash_cache = cache
+
+        self.stats["minhash_recall"] = cache["recall"]
+        return cache["rows"], cache["cols"], cache["common"]
+
+    def _build_minhash_candidates(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        threshold: float,
+    ) -> dict:
+        """
+        全ての前月組織についてMinHashとLSHの候補ペアと再現率の推定値を求める関数。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            threshold (float): LSHの閾値。
+
+        Returns:
+            dict: 前月組織ID（rows）、当月組織ID（cols）、共通メンバー数（common）の
+                配列と再現率の推定値（recall）。
+        """
+        seed = self.minhash_config.get("seed", 0)
+        lsh = MinHashLSH(
+            threshold,
+            self.minhash_config.get("num_perm", 128),
+            seed,
+            self.minhash_config.get("recall_weight", 0.9),
+        )
+        rows, cols = lsh.candidate_pairs(index_A, index_B)
+        common = count_common_members(index_A, index_B, rows, cols)
+        overlapping = common > 0
+        rows, cols, common = rows[overlapping], cols[overlapping], common[overlapping]  # noqa: E501
+
+        recall = estimate_recall(
+            index_A,
+            index_B,
+            rows,
+            cols,
+            threshold,
+            self.minhash_config.get("recall_sample", 200),
+            seed,
+        )
+        return {"rows": rows, "cols": cols, "common": common, "recall": recall}
+
     def process_organization_pair(self, org_a: tuple, org_b: tuple) -> dict:
         """
         組織ペアを処理する関数。
 
+        build_org_user_setで作成したマッピングの1組織ずつを受け取る。
+
         Args:
             org_a (tuple): 前月組織。
             org_b (tuple): 当月組織。
@@ -72,6 +433,29 @@ class OrganizationProcessor:
         Returns:
             dict: 処理された組織ペアのデータ。
         """
+        result = self.calculate_pair_statistics(org_a, org_b)
+        if not result:
+            return None
+
+        similarity_scores = self.matcher.calculate_similarity_score_with_ratio(result)  # noqa: E501
+        result.update(similarity_scores)
+        return result
+
+    def calculate_pair_statistics(
+        self, org_a: tuple, org_b: tuple, ratio_diff: float = None
+    ) -> dict:
+        """
+        組織ペアの共通メンバー数などの統計量を計算する関数。
+
+        Args:
+            org_a (tuple): 前月組織。
+            org_b (tuple): 当月組織。
+            ratio_diff (float, optional): 計算済みの構成比率差。
+                Noneの場合は2組織の構成比から計算する。
+
+        Returns:
+            dict: 組織ペアの統計量。共通メンバーがいない場合はNone。
+        """
         org_a_name, data_A = org_a
         org_b_name, data_B = org_b
         users_A = data_A["users"]
@@ -85,9 +469,11 @@ class OrganizationProcessor:
         union = users_A.union(users_B)
         intersection_size = len(intersection)
         union_size = len(union)
-        ratio_a = calculate_employee_ratio(data_A["info"])
-        ratio_b = calculate_employee_ratio(data_B["info"])
-        ratio_diff = calculate_ratio_difference(ratio_a, ratio_b)
+        if ratio_diff is None:
+            ratios_A, ratios_B = build_composition_ratios(
+                {org_a_name: data_A}, {org_b_name: data_B}
+            )
+            ratio_diff = float(calculate_ratio_difference(ratios_A[0], ratios_B[0]))  # noqa: E501
         rank_diff = calculate_rank(org_a_name) - calculate_rank(org_b_name)
         result = {
             cst.PREV_ORG: org_a_name,
@@ -102,14 +488,24 @@ class OrganizationProcessor:
             cst.RATIO_DIFF: ratio_diff,
             cst.RANK_DIFF: rank_diff,
         }
-
-        similarity_scores = self.matcher.calculate_similarity_score_with_ratio(result)  # noqa: E501
-        result.update(similarity_scores)
         return result
 
-    def update_organization_matches(self, df_results: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+    def score_pair_table(self, df_pairs: pd.DataFrame) -> pd.DataFrame:
         """
-        組織の一致判定と確定処理を行う関数。
+        組織ペアの統計量テーブルにスコア列を付与する関数。
+
+        Args:
+            df_pairs (pd.DataFrame): 組織ペアの統計量データフレーム。
+
+        Returns:
+            pd.DataFrame: スコア列が追加された組織データフレーム。
+        """
+        df_scores = self.matcher.calculate_similarity_scores(df_pairs)
+        return pd.concat([df_pairs, df_scores], axis=1)
+
+    def confirm_matches(self, df_results: pd.DataFrame) -> pd.DataFrame:
+        """
+        設定された確定方法で組織の一致判定と確定処理を行う関数。
 
         Args:
             df_results (pd.DataFrame): 組織データフレーム。
@@ -117,22 +513,59 @@ class OrganizationProcessor:
         Returns:
             pd.DataFrame: 更新された組織データフレーム。
         """
-        df_results[cst.CONFIRMED] = False
+        if self.confirmation == "assignment":
+            return self.update_organization_assignments(df_results)
+        return self.update_organization_matches(df_results)
 
-        # 同一組織と見なされている場合に一括でCONFIRMEDをTrueに更新
-        df_results.loc[df_results[cst.SAME_ORG], cst.CONFIRMED] = True
+    def update_organization_assignments(self, df_results: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+        """
+        1対1の割り当てに基づいて組織の確定処理を行う関数。
 
-        # 確定がTrueになった前月組織と当月組織の同じ名前のものをさらに更新
-        confirmed_prev = df_results[df_results[cst.CONFIRMED]][cst.PREV_ORG].unique()  # noqa: E501
-        confirmed_curr = df_results[df_results[cst.CONFIRMED]][cst.CURR_ORG].unique()  # noqa: E501
+        総合スコアの合計が最大になる1対1の割り当てを求め、割り当てられた
+        同一組織のペアを確定する。確定した組織の他のペアは、それ自体が
+        同一組織と判定されていなければ確定とし、判定されていれば
+        競合する候補として未確定のまま残す。行ごとに前月組織・当月組織の
+        次点の相手とスコアを付ける。
 
-        df_results.loc[df_results[cst.PREV_ORG].isin(confirmed_prev), cst.CONFIRMED] = (  # noqa: E501
-            True
-        )
-        df_results.loc[df_results[cst.CURR_ORG].isin(confirmed_curr), cst.CONFIRMED] = (  # noqa: E501
-            True
+        Args:
+            df_results (pd.DataFrame): 組織データフレーム。
+
+        Returns:
+            pd.DataFrame: 割り当てと次点の列が追加され、更新された組織データフレーム。
+        """
+        component_ids = (
+            df_results[cst.COMPONENT_ID].to_numpy()
+            if cst.COMPONENT_ID in df_results.columns
+            else None
         )
+        df_assignment = build_assignment_columns(df_results, component_ids)
+        for column in df_assignment.columns:
+            df_results[column] = df_assignment[column]
+
+        confirmed = df_results[cst.ASSIGNED] & df_results[cst.SAME_ORG]
+        confirmed_prev = df_results.loc[confirmed, cst.PREV_ORG].unique()
+        confirmed_curr = df_results.loc[confirmed, cst.CURR_ORG].unique()
+        resolved = (
+            df_results[cst.PREV_ORG].isin(confirmed_prev)
+            | df_results[cst.CURR_ORG].isin(confirmed_curr)
+        ) & ~df_results[cst.SAME_ORG]
+        df_results[cst.CONFIRMED] = confirmed | resolved
+        return df_results
 
+    def update_organization_matches(self, df_results: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+        """
+        組織の一致判定と確定処理を行う関数。
+
+        Args:
+            df_results (pd.DataFrame): 組織データフレーム。
+
+        Returns:
+            pd.DataFrame: 更新された組織データフレーム。
+        """
+        # 同一組織と見なされている場合に一括で確定にし、
+        # 確定になった前月組織と当月組織を含むペアをさらに確定にする
+        store = ResultsStore(df_results)
+        df_results[cst.CONFIRMED] = store.find_cascaded(store.same_org)
         return df_results
 
     def calculate_and_update_organization_scores(
@@ -150,22 +583,237 @@ class OrganizationProcessor:
         Returns:
             pd.DataFrame: スコアが計算され更新された組織データフレーム。
         """
-        org_users_A = build_org_user_set(df_A, additional_columns=[cst.TYPE])
-        org_users_B = build_org_user_set(df_B, additional_columns=[cst.TYPE])
+        with self.report.stage("build_membership_indexes") as stage:
+            index_A, index_B = build_membership_indexes(df_A, df_B)
+            stage["rows"] = len(df_A) + len(df_B)
+            stage["orgs"] = len(index_A) + len(index_B)
+        return self.calculate_and_update_index_scores(index_A, index_B)
 
-        # 結果リストを作成
-        results = []
-        for org_a, org_b in product(org_users_A.items(), org_users_B.items()):
-            result = self.process_organization_pair(org_a, org_b)
-            if result:
-                results.append(result)
+    def calculate_and_update_index_scores(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+    ) -> pd.DataFrame:
+        """
+        作成済みの所属インデックスから全ての組織のスコアを計算して更新する関数。
+
+        ファイルを分割して読み込んで作成した所属インデックスを渡す場合に使う。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+
+        Returns:
+            pd.DataFrame: スコアが計算され更新された組織データフレーム。
+        """
+        self.stats = {}
 
         # スコアを計算して各列に分解して代入
-        df_results = pd.DataFrame(results)
+        with self.report.stage("score_pairs") as stage:
+            if self.state_file:
+                df_results = self.build_results_incrementally(
+                    index_A, index_B, self.state_file
+                )
+            else:
+                df_results = self.build_results(index_A, index_B)
+            stage["rows"] = len(df_results)
+
+        # 共通メンバーでつながる組織のまとまりごとに番号を振る
+        with self.report.stage("label_components", rows=len(df_results)):
+            df_results[cst.COMPONENT_ID] = label_components(df_results)
 
         # 組織の一致判定と確定処理
-        df_results = self.update_organization_matches(df_results)
+        with self.report.stage("confirm_matches", rows=len(df_results)):
+            df_results = self.confirm_matches(df_results)
 
+        self.report.add_counters(self.stats)
+        return df_results
+
+    def calculate_and_spill_index_scores(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        directory: str = None,
+    ) -> SpilledResults:
+        """
+        結果をディスクのパーティションに書き出しながら全ての組織のスコアを計算して更新する関数。
+
+        前月組織を所属人数がおおよそ均等な連続した範囲に分け、範囲ごとに
+        スコアを計算してパーティションとして保存する（1回目）。その間に
+        メモリに残すのは行ごとの組織コードと同一組織の判定だけで、
+        これから連結成分と確定済みの組織を求める。続いてパーティションを
+        1つずつ読み込み、クラスタIDと確定の列を加えて保存し直す（2回目）。
+        結果はcalculate_and_update_index_scoresと同じになる。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            directory (str, optional): パーティションの保存先。省略時はspill_dir。
+
+        Returns:
+            SpilledResults: 保存したパーティション。
+        """
+        self.stats = {}
+        org_dtype, _ = build_org_dictionary(index_A, index_B)
+        spilled = SpilledResults(directory or self.spill_dir, org_dtype)
+
+        prev_codes = []
+        curr_codes = []
+        same_org = []
+        with self.report.stage("score_pairs") as stage:
+            for start, stop in split_prev_orgs(index_A.sizes, self.spill_partitions):  # noqa: E501
+                df_partition = self.build_results(
+                    index_A, index_B, np.arange(start, stop)
+                )
+                prev_codes.append(df_partition[cst.PREV_ORG].cat.codes.to_numpy())  # noqa: E501
+                curr_codes.append(df_partition[cst.CURR_ORG].cat.codes.to_numpy())  # noqa: E501
+                same_org.append(df_partition[cst.SAME_ORG].to_numpy(dtype=bool))  # noqa: E501
+                spilled.append_partition(df_partition)
+            stage["rows"] = len(spilled)
+            stage["partitions"] = len(spilled.partition_files)
+
+        if not spilled.partition_files:
+            spilled.append_partition(
+                self.build_results(index_A, index_B, np.arange(0))
+            )
+        prev_codes = np.concatenate(prev_codes or [np.zeros(0, dtype=np.int32)])  # noqa: E501
+        curr_codes = np.concatenate(curr_codes or [np.zeros(0, dtype=np.int32)])  # noqa: E501
+        same_org = np.concatenate(same_org or [np.zeros(0, dtype=bool)])
+
+        # 連結成分と確定はメモリ上の計算と同じく、結果に現れた順の組織コードで求める
+        prev_codes, n_prev = _renumber(prev_codes)
+        curr_codes, n_curr = _renumber(curr_codes)
+        with self.report.stage("label_components", rows=len(spilled)):
+            component_ids = label_pair_components(
+                prev_codes, curr_codes, n_prev, n_curr
+            )
+        with self.report.stage("confirm_matches", rows=len(spilled)):
+            confirmed = cascade_confirmation(
+                same_org, prev_codes, curr_codes, n_prev, n_curr
+            )
+            offset = 0
+            for number in range(len(spilled.partition_files)):
+                df_partition = spilled.read_partition(number)
+                stop = offset + len(df_partition)
+                df_partition[cst.COMPONENT_ID] = component_ids[offset:stop]
+                df_partition[cst.CONFIRMED] = confirmed[offset:stop]
+                spilled.write_partition(number, df_partition)
+                offset = stop
+
+        self.report.add_counters(self.stats)
+        return spilled
+
+    def build_results_incrementally(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        state_file: str,
+    ) -> pd.DataFrame:
+        """
+        前回の結果を再利用し、所属が変わった組織に関わるペアだけを計算する関数。
+
+        組織ペアの結果は2組織の所属内容と組織名だけで決まるため、前月組織と
+        当月組織がともに前回と同じ所属内容であれば前回の結果をそのまま使える。
+        所属が変わった前月組織は全ペアを、それ以外の前月組織は所属が変わった
+        当月組織とのペアだけを再計算し、残りは前回の結果を再利用する。
+        設定や区分が前回と異なる場合、状態ファイルがない場合は全件計算する。
+        計算後、今回の状態を保存する。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            state_file (str): 状態ファイルのパス。
+
+        Returns:
+            pd.DataFrame: スコアが計算された組織データフレーム。
+        """
+        prev_fingerprints = compute_org_fingerprints(index_A)
+        curr_fingerprints = compute_org_fingerprints(index_B)
+        categories = list(dict.fromkeys(index_A.categories + index_B.categories))  # noqa: E501
+        state = MatchingState.load(state_file)
+
+        if (
+            state is None
+            or state.config_digest != self.config_digest
+            or state.categories != categories
+        ):
+            df_results = self.build_results(index_A, index_B)
+        else:
+            changed_A = find_changed_orgs(
+                index_A, prev_fingerprints, state.prev_fingerprints
+            )
+            changed_B = find_changed_orgs(
+                index_B, curr_fingerprints, state.curr_fingerprints
+            )
+
+            # 所属が変わった当月組織のユーザーが所属する前月組織は、
+            # 所属が変わった当月組織とのペアだけを再計算する
+            touched = np.zeros(len(index_A), dtype=bool)
+            changed_users = np.unique(
+                np.concatenate(
+                    [index_B.members(org_id) for org_id in np.flatnonzero(changed_B)]  # noqa: E501
+                    + [np.zeros(0, dtype=np.int64)]
+                )
+            )
+            if len(changed_users):
+                user_indptr, user_orgs = index_A.user_org_index()
+                starts = user_indptr[changed_users]
+                lengths = user_indptr[changed_users + 1] - starts
+                offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)  # noqa: E501
+                touched[user_orgs[offsets + np.arange(lengths.sum())]] = True
+            touched &= ~changed_A
+
+            df_changed_prev = self.build_results(
+                index_A, index_B, np.flatnonzero(changed_A)
+            )
+            df_changed_curr = self.build_results(
+                index_A, index_B, np.flatnonzero(touched), changed_B
+            )
+
+            # 前回の結果から、前後とも所属が変わっていない組織のペアを再利用する
+            df_previous = state.results
+            prev_ids = df_previous[cst.PREV_ORG].astype(object).map(index_A.org_ids)  # noqa: E501
+            curr_ids = df_previous[cst.CURR_ORG].astype(object).map(index_B.org_ids)  # noqa: E501
+            reusable = prev_ids.notna() & curr_ids.notna()
+            prev_ids = prev_ids[reusable].astype(np.int64).to_numpy()
+            curr_ids = curr_ids[reusable].astype(np.int64).to_numpy()
+            keep = ~changed_A[prev_ids] & ~changed_B[curr_ids]
+            df_reused = df_previous[reusable][keep]
+            self.count_stat("reused_pairs", len(df_reused))
+            self.count_stat("changed_prev_orgs", int(changed_A.sum()))
+            self.count_stat("changed_curr_orgs", int(changed_B.sum()))
+
+            # 全件計算と同じく前月組織ID、当月組織IDの順に並べる
+            frames = [
+                frame
+                for frame in (df_changed_prev, df_changed_curr, df_reused)
+                if len(frame)
+            ]
+            df_results = pd.concat(
+                frames or [df_changed_prev], ignore_index=True
+            )
+            # 前回の行は前回の組織名の辞書を持つため、今回の辞書に揃える
+            org_dtype, curr_codes = build_org_dictionary(index_A, index_B)
+            for column in (cst.PREV_ORG, cst.CURR_ORG):
+                df_results[column] = df_results[column].astype(object).astype(org_dtype)  # noqa: E501
+            # 前月組織のコードは組織IDと一致する。当月組織はコードから組織IDを引く
+            curr_ids = np.zeros(len(org_dtype.categories), dtype=np.int64)
+            curr_ids[curr_codes] = np.arange(len(index_B))
+            order = np.lexsort(
+                (
+                    curr_ids[df_results[cst.CURR_ORG].cat.codes.to_numpy()],
+                    df_results[cst.PREV_ORG].cat.codes.to_numpy(),
+                )
+            )
+            df_results = df_results.iloc[order].reset_index(drop=True)
+
+        MatchingState(
+            self.config_digest,
+            categories,
+            prev_fingerprints,
+            curr_fingerprints,
+            df_results,
+        ).save(state_file)
         return df_results
 
     def find_disjoint_organizations(results, df_A, df_B):
@@ -0,0 +1,76 @@
+"""
+疎行列を用いて組織間の共通メンバー数を一括計算するモジュール。
+"""
+
+import numpy as np
+import pandas as pd
+from membership_index import OrgMembershipIndex, build_pair_statistics
+
+
+class SparseOverlapEngine:
+    """
+    組織×ユーザーの接続行列の積から組織ペアの重なりを計算するクラス。
+
+    前月組織の接続行列Aと当月組織の接続行列Bから A・Bᵀ を計算すると、
+    各要素が組織ペアの共通メンバー数になる。和集合の人数は各組織の人数
+    （行和）から求められるため、ペアごとの集合演算は不要になる。
+    接続行列は所属インデックスのCSR配列をそのまま使う。
+    """
+
+    def compute_overlaps(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        共通メンバーを持つ全組織ペアと共通メンバー数を求める関数。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: 前月組織ID、当月組織ID、
+                共通メンバー数の配列。前月組織×当月組織の直積順に並ぶ。
+        """
+        # 前月と当月はユーザーIDを共有しているので列数をそろえる
+        n_users = max(len(index_A.user_ids), len(index_B.user_ids))
+        if prev_ids is None:
+            prev_ids = np.arange(len(index_A))
+        matrix_A = index_A.to_matrix(n_users)[prev_ids]
+        matrix_B = index_B.to_matrix(n_users)
+
+        overlap = (matrix_A @ matrix_B.T).tocsr()
+        overlap.eliminate_zeros()
+        overlap.sort_indices()
+        overlap = overlap.tocoo()
+        return (
+            np.asarray(prev_ids, dtype=np.int64)[overlap.row],
+            overlap.col.astype(np.int64),
+            overlap.data.astype(np.int64),
+        )
+
+    def compute_pair_statistics(
+        self,
+        index_A: OrgMembershipIndex,
+        index_B: OrgMembershipIndex,
+        prev_ids: np.ndarray = None,
+    ) -> pd.DataFrame:
+        """
+        共通メンバーを持つ全組織ペアの統計量を計算する関数。
+
+        Args:
+            index_A (OrgMembershipIndex): 前月の所属インデックス。
+            index_B (OrgMembershipIndex): 当月の所属インデックス。
+            prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+                省略時は全組織。
+
+        Returns:
+            pd.DataFrame: process_organization_pairと同じ列構成（スコア列を除く）の
+                組織ペアのデータフレーム。行は前月組織×当月組織の直積順に並ぶ。
+        """
+        rows, cols, common = self.compute_overlaps(index_A, index_B, prev_ids)  # noqa: E501
+        return build_pair_statistics(index_A, index_B, rows, cols, common)
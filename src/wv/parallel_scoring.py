@@ -0,0 +1,161 @@
+"""
+組織ペアのスコア計算を複数プロセスで分担して行うモジュール。
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ワーカーが参照する読み取り専用のデータ。
+# fork で起動したワーカーは親プロセスのメモリをそのまま参照するため、
+# 所属インデックスをタスクごとにpickleして送らずに済む。
+_SHARED: dict = {}
+
+# ワーカー1つあたりの分割数。サイズの偏りをならすために多めに分割する
+SHARDS_PER_WORKER = 4
+
+
+def resolve_worker_count(workers) -> int:
+    """
+    設定値からワーカー数を決める関数。
+
+    Args:
+        workers (int | None): 設定されたワーカー数。0またはNoneはCPU数を使う。
+
+    Returns:
+        int: ワーカー数。
+    """
+    if not workers:
+        return os.cpu_count() or 1
+    if workers < 0:
+        raise ValueError(f"ワーカー数が不正です: {workers}")
+    return int(workers)
+
+
+def split_prev_orgs(sizes: np.ndarray, n_shards: int) -> list[tuple[int, int]]:  # noqa: E501
+    """
+    前月組織を所属人数の合計がおおよそ均等になる連続した範囲に分割する関数。
+
+    範囲は組織IDの昇順に並ぶため、各範囲の結果を順に連結すれば
+    一括で計算した場合と同じ並びになる。
+
+    Args:
+        sizes (np.ndarray): 前月組織ごとの人数。
+        n_shards (int): 分割数。
+
+    Returns:
+        list[tuple[int, int]]: 組織IDの範囲 [start, stop) のリスト。
+    """
+    n_orgs = len(sizes)
+    if n_orgs == 0:
+        return []
+    cumulative = np.cumsum(sizes)
+    targets = cumulative[-1] * np.arange(1, n_shards) / n_shards
+    bounds = np.searchsorted(cumulative, targets, side="right")
+    bounds = np.unique(np.concatenate([[0], bounds, [n_orgs]]))
+    return [
+        (int(start), int(stop))
+        for start, stop in zip(bounds[:-1], bounds[1:])
+        if start < stop
+    ]
+
+
+def _init_worker(shared: dict) -> None:
+    """
+    forkが使えない環境で、ワーカーごとに一度だけ共有データを受け取る関数。
+
+    Args:
+        shared (dict): 共有データ。
+    """
+    _SHARED.update(shared)
+
+
+def _score_shard(prev_ids: np.ndarray) -> tuple[pd.DataFrame, dict]:
+    """
+    前月組織の1範囲分のスコアを計算する関数。
+
+    Args:
+        prev_ids (np.ndarray): 前月組織IDの昇順の配列。
+
+    Returns:
+        tuple[pd.DataFrame, dict]: スコアが計算された組織データフレームと、
+            その範囲の集計値。
+    """
+    processor = _SHARED["processor"]
+    processor.stats = {}
+    df_results = processor.score_prev_orgs(
+        _SHARED["index_A"], _SHARED["index_B"], prev_ids, _SHARED["curr_mask"]
+    )
+    return df_results, processor.stats
+
+
+def score_in_parallel(
+    processor,
+    index_A,
+    index_B,
+    workers: int,
+    prev_ids: np.ndarray = None,
+    curr_mask: np.ndarray = None,
+) -> pd.DataFrame:
+    """
+    前月組織を分割し、プロセスプールでスコアを計算して結合する関数。
+
+    結果は範囲の順に結合するため、ワーカー数によらず同じ結果になる。
+
+    Args:
+        processor (OrganizationProcessor): スコア計算に使う処理クラス。
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+        workers (int): ワーカー数。
+        prev_ids (np.ndarray, optional): 対象とする前月組織IDの昇順の配列。
+            省略時は全組織。
+        curr_mask (np.ndarray, optional): 対象とする当月組織をTrueとする
+            組織IDごとの配列。省略時は全組織。
+
+    Returns:
+        pd.DataFrame: スコアが計算された組織データフレーム。
+    """
+    if prev_ids is None:
+        prev_ids = np.arange(len(index_A))
+    shards = [
+        prev_ids[start:stop]
+        for start, stop in split_prev_orgs(
+            index_A.sizes[prev_ids], workers * SHARDS_PER_WORKER
+        )
+    ]
+    if len(shards) <= 1:
+        return processor.score_prev_orgs(index_A, index_B, prev_ids, curr_mask)  # noqa: E501
+
+    # 逆引きインデックスはワーカーで作り直さないよう先に作成しておく
+    index_B.user_org_index()
+    shared = {
+        "processor": processor,
+        "index_A": index_A,
+        "index_B": index_B,
+        "curr_mask": curr_mask,
+    }
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _SHARED.update(shared)
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared,)
+        )
+
+    try:
+        with executor:
+            outputs = list(executor.map(_score_shard, shards))
+    finally:
+        _SHARED.clear()
+
+    # ワーカー側の集計値は親プロセスの処理クラスに合算する
+    for _, stats in outputs:
+        for name, value in stats.items():
+            processor.count_stat(name, value)
+    return pd.concat([frame for frame, _ in outputs], ignore_index=True)
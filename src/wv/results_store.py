@@ -0,0 +1,394 @@
+"""
+組織ペアの結果を組織名の索引付きで保持し、確認結果を反映するモジュール。
+
+結果の行は前月組織・当月組織・組織ペアごとに引けるよう、組織のコード順に並べた
+行の位置（CSR形式）を索引として持つ。確認結果の反映は該当する組織の行だけを
+更新するため、結果全体をマスクで走査する必要がない。
+"""
+
+from collections.abc import Iterable
+
+import constants as cst
+import numpy as np
+import pandas as pd
+
+
+def cascade_confirmation(
+    confirmed: np.ndarray,
+    prev_codes: np.ndarray,
+    curr_codes: np.ndarray,
+    n_prev: int,
+    n_curr: int,
+) -> np.ndarray:
+    """
+    確定した行と、その前月組織・当月組織を含む行を確定とする関数。
+
+    組織ごとに確定済みかを数えて引くため、組織名の集合との照合は不要。
+    確定の広がりは1段階だけで、広がった先の行から先には広げない。
+
+    Args:
+        confirmed (np.ndarray): 行ごとの確定の配列。
+        prev_codes (np.ndarray): 行ごとの前月組織のコード（0〜n_prev-1、欠損値は-1）。
+        curr_codes (np.ndarray): 行ごとの当月組織のコード（0〜n_curr-1、欠損値は-1）。
+        n_prev (int): 前月組織のコードの数。
+        n_curr (int): 当月組織のコードの数。
+
+    Returns:
+        np.ndarray: 行ごとの確定の配列。
+    """
+    confirmed_prev = _flag_orgs(prev_codes[confirmed], n_prev)
+    confirmed_curr = _flag_orgs(curr_codes[confirmed], n_curr)
+    return confirmed | confirmed_prev[prev_codes] | confirmed_curr[curr_codes]
+
+
+def _flag_orgs(codes: np.ndarray, n_orgs: int) -> np.ndarray:
+    """
+    コードに含まれる組織をTrueとする配列を作成する関数。
+
+    Args:
+        codes (np.ndarray): 組織のコードの配列（欠損値は-1）。
+        n_orgs (int): 組織のコードの数。
+
+    Returns:
+        np.ndarray: 組織ごとの真偽値の配列。欠損値のコード-1で引くとFalseになるよう、
+            末尾に1つ余分に持つ。
+    """
+    flags = np.zeros(n_orgs + 1, dtype=bool)
+    flags[codes[codes >= 0]] = True
+    return flags
+
+
+def _group_rows(codes: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:  # noqa: E501
+    """
+    コードごとの行の位置をCSR形式にまとめる関数。
+
+    Args:
+        codes (np.ndarray): 行ごとのコード（欠損値は-1）。
+        n_groups (int): コードの数。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: コードごとの開始位置と、行の位置を
+            コード順に連結した配列。コードiの行は rows[indptr[i]:indptr[i + 1]]。
+    """
+    valid = np.flatnonzero(codes >= 0)
+    rows = valid[np.argsort(codes[valid], kind="stable")]
+    indptr = np.concatenate(
+        [[0], np.cumsum(np.bincount(codes[valid], minlength=n_groups))]
+    )
+    return indptr, rows
+
+
+class ResultsStore:
+    """
+    組織ペアの結果を索引付きで保持し、確認結果を反映するクラス。
+
+    同一組織と確定の列は配列として保持し、to_frameで結果データフレームに書き戻す。
+    """
+
+    def __init__(self, df_results: pd.DataFrame):
+        """
+        コンストラクタ。
+
+        Args:
+            df_results (pd.DataFrame): 結果データフレーム。
+        """
+        self.df_results = df_results
+        self.prev_codes, prev_orgs = pd.factorize(df_results[cst.PREV_ORG])
+        self.curr_codes, curr_orgs = pd.factorize(df_results[cst.CURR_ORG])
+        self.n_prev = len(prev_orgs)
+        self.n_curr = len(curr_orgs)
+        self.prev_ids = {org: code for code, org in enumerate(prev_orgs)}
+        self.curr_ids = {org: code for code, org in enumerate(curr_orgs)}
+        self.prev_indptr, self.prev_rows = _group_rows(self.prev_codes, self.n_prev)  # noqa: E501
+        self.curr_indptr, self.curr_rows = _group_rows(self.curr_codes, self.n_curr)  # noqa: E501
+        # 組織ペアの索引は初めて使うときに作成する
+        self._pair_index = None
+
+        self.same_org = df_results[cst.SAME_ORG].to_numpy(copy=True)
+        if cst.CONFIRMED in df_results.columns:
+            self.confirmed = df_results[cst.CONFIRMED].to_numpy(copy=True)
+        else:
+            self.confirmed = np.zeros(len(df_results), dtype=bool)
+        # rejectで同一組織ではないと確定した行。確定の広がりの元にはしない
+        self.rejected = np.zeros(len(df_results), dtype=bool)
+
+    def __len__(self) -> int:
+        """
+        結果の行数を返す。
+
+        Returns:
+            int: 行数。
+        """
+        return len(self.df_results)
+
+    def _get_pair_index(self) -> tuple[dict, np.ndarray, np.ndarray]:
+        """
+        組織ペアの索引を返す。
+
+        組織ペアは前月組織のコードと当月組織のコードを1つの整数にまとめて引く。
+
+        Returns:
+            tuple[dict, np.ndarray, np.ndarray]: 整数から組織ペアのコードへの辞書と、
+                組織ペアごとの開始位置、行の位置を連結した配列。
+        """
+        if self._pair_index is None:
+            has_pair = (self.prev_codes >= 0) & (self.curr_codes >= 0)
+            pair_codes, pair_keys = pd.factorize(
+                self.prev_codes[has_pair] * self.n_curr + self.curr_codes[has_pair]  # noqa: E501
+            )
+            codes = np.full(len(self.df_results), -1, dtype=np.int64)
+            codes[has_pair] = pair_codes
+            self._pair_index = (
+                {key: code for code, key in enumerate(pair_keys.tolist())},
+                *_group_rows(codes, len(pair_keys)),
+            )
+        return self._pair_index
+
+    def rows_for_prev(self, prev_org) -> np.ndarray:
+        """
+        前月組織の行の位置を返す。
+
+        Args:
+            prev_org: 前月組織名。
+
+        Returns:
+            np.ndarray: 行の位置の配列。該当がなければ空の配列。
+        """
+        code = self.prev_ids.get(prev_org)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.prev_rows[self.prev_indptr[code] : self.prev_indptr[code + 1]]  # noqa: E501
+
+    def rows_for_curr(self, curr_org) -> np.ndarray:
+        """
+        当月組織の行の位置を返す。
+
+        Args:
+            curr_org: 当月組織名。
+
+        Returns:
+            np.ndarray: 行の位置の配列。該当がなければ空の配列。
+        """
+        code = self.curr_ids.get(curr_org)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.curr_rows[self.curr_indptr[code] : self.curr_indptr[code + 1]]  # noqa: E501
+
+    def rows_for_pair(self, prev_org, curr_org) -> np.ndarray:
+        """
+        組織ペアの行の位置を返す。
+
+        Args:
+            prev_org: 前月組織名。
+            curr_org: 当月組織名。
+
+        Returns:
+            np.ndarray: 行の位置の配列。該当がなければ空の配列。
+        """
+        prev_code = self.prev_ids.get(prev_org)
+        curr_code = self.curr_ids.get(curr_org)
+        if prev_code is None or curr_code is None:
+            return np.zeros(0, dtype=np.int64)
+        pair_ids, pair_indptr, pair_rows = self._get_pair_index()
+        code = pair_ids.get(prev_code * self.n_curr + curr_code)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        return pair_rows[pair_indptr[code] : pair_indptr[code + 1]]
+
+    def rows_for_orgs(self, prev_orgs: Iterable, curr_orgs: Iterable) -> np.ndarray:  # noqa: E501
+        """
+        いずれかの前月組織または当月組織を含む行の位置を返す。
+
+        Args:
+            prev_orgs (Iterable): 前月組織名。
+            curr_orgs (Iterable): 当月組織名。
+
+        Returns:
+            np.ndarray: 重複を除いた行の位置の配列（昇順）。
+        """
+        rows = [self.rows_for_prev(org) for org in prev_orgs]
+        rows += [self.rows_for_curr(org) for org in curr_orgs]
+        if not rows:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(rows))
+
+    def confirm(self, prev_org, curr_org) -> np.ndarray:
+        """
+        組織ペアを同一組織として確定する。
+
+        更新するのは前月組織または当月組織を含む行だけで、それらの行は
+        apply_confirmationsに1つのペアを渡した場合と同じ値になる。確定は、
+        同じ組織を持つ確定済みの行があるかで決め直す。それ以外の行は変更しない
+        （apply_confirmationsは最後に結果全体の確定を広げ直す）。
+
+        Args:
+            prev_org: 前月組織名。
+            curr_org: 当月組織名。
+
+        Returns:
+            np.ndarray: 更新した行の位置の配列。
+        """
+        affected = self.rows_for_orgs([prev_org], [curr_org])
+        self.same_org[affected] = False
+        self.confirmed[affected] = False
+        self.rejected[affected] = False
+        pair_rows = self.rows_for_pair(prev_org, curr_org)
+        self.same_org[pair_rows] = True
+        self.confirmed[pair_rows] = True
+        self._recascade(affected)
+        return affected
+
+    def reject(self, prev_org, curr_org) -> np.ndarray:
+        """
+        組織ペアを同一組織ではないとして確定する。
+
+        同一組織ではないと確定した行は、確定を広げる元にはしない。前月組織または
+        当月組織を含む行のうち、同一組織として確定した行と同一組織ではないと
+        確定した行以外は、確定の広がりで確定していた可能性があるため、
+        残りの確定済みの行から決め直す。
+
+        Args:
+            prev_org: 前月組織名。
+            curr_org: 当月組織名。
+
+        Returns:
+            np.ndarray: 更新した行の位置の配列。
+        """
+        pair_rows = self.rows_for_pair(prev_org, curr_org)
+        self.same_org[pair_rows] = False
+        self.confirmed[pair_rows] = True
+        self.rejected[pair_rows] = True
+
+        affected = self.rows_for_orgs([prev_org], [curr_org])
+        decided = (self.same_org[affected] & self.confirmed[affected]) | self.rejected[affected]  # noqa: E501
+        cascaded = affected[~decided]
+        self.confirmed[cascaded] = False
+        self._recascade(cascaded)
+        return np.union1d(pair_rows, cascaded)
+
+    def reassign(self, prev_org, old_curr_org, new_curr_org) -> np.ndarray:
+        """
+        前月組織の対応先を別の当月組織に付け替える。
+
+        Args:
+            prev_org: 前月組織名。
+            old_curr_org: これまでの対応先の当月組織名。
+            new_curr_org: 新しい対応先の当月組織名。
+
+        Returns:
+            np.ndarray: 更新した行の位置の配列。
+        """
+        rejected = self.reject(prev_org, old_curr_org)
+        confirmed = self.confirm(prev_org, new_curr_org)
+        return np.union1d(rejected, confirmed)
+
+    def apply_confirmations(self, confirmed_pairs: pd.DataFrame) -> None:
+        """
+        確認された組織ペアをまとめて反映する。
+
+        1. 確認された前月組織または当月組織を含む行を未確定にし、同一組織もFalseにする。
+        2. 確認された組織ペアの行を確定にし、同一組織をTrueにする。
+        3. 2の時点で確定している行と前月組織または当月組織が同じ行を確定にする。
+
+        Args:
+            confirmed_pairs (pd.DataFrame): 前月組織と当月組織の列を持つデータフレーム。
+        """
+        affected = self.rows_for_orgs(
+            confirmed_pairs[cst.PREV_ORG].dropna().unique(),
+            confirmed_pairs[cst.CURR_ORG].dropna().unique(),
+        )
+        self.same_org[affected] = False
+        self.confirmed[affected] = False
+        self.rejected[affected] = False
+        for prev_org, curr_org in (
+            confirmed_pairs[[cst.PREV_ORG, cst.CURR_ORG]]
+            .dropna()
+            .drop_duplicates()
+            .itertuples(index=False, name=None)
+        ):
+            pair_rows = self.rows_for_pair(prev_org, curr_org)
+            self.same_org[pair_rows] = True
+            self.confirmed[pair_rows] = True
+        self.cascade()
+
+    def find_cascaded(self, confirmed: np.ndarray) -> np.ndarray:
+        """
+        確定した行と前月組織または当月組織が同じ行を求める。
+
+        Args:
+            confirmed (np.ndarray): 広げる元の行ごとの確定。
+
+        Returns:
+            np.ndarray: 確定した行と、それと組織が同じ行でTrueとなる配列。
+        """
+        return cascade_confirmation(
+            np.asarray(confirmed).astype(bool),
+            self.prev_codes,
+            self.curr_codes,
+            self.n_prev,
+            self.n_curr,
+        )
+
+    def cascade(self) -> None:
+        """
+        現在確定している行と前月組織または当月組織が同じ行を確定にする。
+
+        同一組織ではないと確定した行からは広げない。
+        """
+        self.confirmed[self.find_cascaded(self._cascade_sources())] = True
+
+    def _cascade_sources(self) -> np.ndarray:
+        """
+        確定を広げる元となる行を返す。
+
+        Returns:
+            np.ndarray: 確定していて、同一組織ではないと確定した行ではない行でTrueとなる配列。
+        """
+        return self.confirmed.astype(bool) & ~self.rejected
+
+    def _recascade(self, rows: np.ndarray) -> None:
+        """
+        指定した行の確定を、同じ組織を持つ確定済みの行（同一組織ではないと
+        確定した行を除く）があるかで決め直す。
+
+        Args:
+            rows (np.ndarray): 決め直す行の位置の配列。
+        """
+        confirmed = self._cascade_sources()
+        prev_codes = self.prev_codes[rows]
+        curr_codes = self.curr_codes[rows]
+        prev_flags = {
+            code: bool(
+                confirmed[
+                    self.prev_rows[self.prev_indptr[code] : self.prev_indptr[code + 1]]  # noqa: E501
+                ].any()
+            )
+            for code in np.unique(prev_codes[prev_codes >= 0]).tolist()
+        }
+        curr_flags = {
+            code: bool(
+                confirmed[
+                    self.curr_rows[self.curr_indptr[code] : self.curr_indptr[code + 1]]  # noqa: E501
+                ].any()
+            )
+            for code in np.unique(curr_codes[curr_codes >= 0]).tolist()
+        }
+        cascaded = np.array(
+            [
+                prev_flags.get(prev, False) or curr_flags.get(curr, False)
+                for prev, curr in zip(prev_codes.tolist(), curr_codes.tolist())
+            ],
+            dtype=bool,
+        )
+        self.confirmed[rows[cascaded]] = True
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        同一組織と確定の列を結果データフレームに書き戻して返す。
+
+        Returns:
+            pd.DataFrame: 更新された結果データフレーム。
+        """
+        self.df_results[cst.SAME_ORG] = self.same_org
+        self.df_results[cst.CONFIRMED] = self.confirmed
+        return self.df_results
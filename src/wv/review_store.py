@@ -0,0 +1,217 @@
+"""
+過去の確認結果を組織ペアと所属内容の指紋ごとに保存し、翌月の確認に再利用するモジュール。
+
+組織ペアの結果には前月組織と当月組織の所属内容の指紋を列として加えて出力する。
+確認済みのワークブックから指紋付きで確認結果を記録しておき、翌月に組織ペアと
+両方の指紋が一致する行は前回の確認結果をそのまま反映して未確定シートから除く。
+全体シートには確認結果を反映する元として全ての行を出力する。
+所属が変わった組織を含むペアや新しいペアだけを確認すればよい。
+"""
+
+import os
+import pickle
+from datetime import datetime
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from incremental_state import compute_org_fingerprints
+from integrity_check import CHECK_COLUMN, CHECK_CONFIRMED, CHECK_VALUES
+from membership_index import OrgMembershipIndex
+from results_store import ResultsStore
+
+# 保存形式を変更した場合は値を上げ、古い確認結果を使わないようにする
+REVIEW_STORE_VERSION = 1
+
+# 確認結果を引くキーの列
+KEY_COLUMNS = [
+    cst.PREV_ORG,
+    cst.CURR_ORG,
+    cst.PREV_FINGERPRINT,
+    cst.CURR_FINGERPRINT,
+]
+
+# 確認結果を記録した日時の列
+REVIEWED_AT = "確認日時"
+
+
+def format_fingerprints(fingerprints: dict[str, int]) -> dict[str, str]:
+    """
+    指紋を16進数の文字列にする関数。
+
+    Excelの数値は64bit整数を正確に保持できないため、文字列として出力する。
+
+    Args:
+        fingerprints (dict[str, int]): 組織名から指紋への辞書。
+
+    Returns:
+        dict[str, str]: 組織名から16桁の16進数の文字列への辞書。
+    """
+    return {org: f"{value:016x}" for org, value in fingerprints.items()}
+
+
+def add_pair_fingerprints(
+    df_results: pd.DataFrame, index_A: OrgMembershipIndex, index_B: OrgMembershipIndex  # noqa: E501
+) -> pd.DataFrame:
+    """
+    組織ペアの結果に前月組織と当月組織の所属内容の指紋の列を加える関数。
+
+    Args:
+        df_results (pd.DataFrame): 組織ペアの結果。
+        index_A (OrgMembershipIndex): 前月の所属インデックス。
+        index_B (OrgMembershipIndex): 当月の所属インデックス。
+
+    Returns:
+        pd.DataFrame: 指紋の列を加えた結果。
+    """
+    prev_fingerprints = format_fingerprints(compute_org_fingerprints(index_A))
+    curr_fingerprints = format_fingerprints(compute_org_fingerprints(index_B))
+    df_results[cst.PREV_FINGERPRINT] = (
+        df_results[cst.PREV_ORG].astype(object).map(prev_fingerprints)
+    )
+    df_results[cst.CURR_FINGERPRINT] = (
+        df_results[cst.CURR_ORG].astype(object).map(curr_fingerprints)
+    )
+    return df_results
+
+
+class ReviewStore:
+    """
+    組織ペアごとの最新の確認結果を、確認したときの所属内容の指紋とともに保持するクラス。
+    """
+
+    def __init__(self, decisions: pd.DataFrame = None):
+        """
+        コンストラクタ。
+
+        Args:
+            decisions (pd.DataFrame, optional): 組織ペア・指紋・確認・確認日時の列を
+                持つデータフレーム。省略時は空。
+        """
+        if decisions is None:
+            decisions = pd.DataFrame(columns=KEY_COLUMNS + [CHECK_COLUMN, REVIEWED_AT])  # noqa: E501
+        self.decisions = decisions.reset_index(drop=True)
+
+    def __len__(self) -> int:
+        """
+        記録している確認結果の件数を返す。
+
+        Returns:
+            int: 件数。
+        """
+        return len(self.decisions)
+
+    def find_prior_decisions(self, df_results: pd.DataFrame) -> pd.Series:
+        """
+        組織ペアと両方の指紋が一致する前回の確認結果を行ごとに返す。
+
+        Args:
+            df_results (pd.DataFrame): 指紋の列を持つ組織ペアの結果。
+
+        Returns:
+            pd.Series: df_resultsと同じインデックスを持つ確認結果。一致しない行は欠損値。
+        """
+        stored = pd.MultiIndex.from_frame(self.decisions[KEY_COLUMNS].astype(object))  # noqa: E501
+        keys = pd.MultiIndex.from_arrays(
+            [df_results[column].astype(object) for column in KEY_COLUMNS]
+        )
+        positions = stored.get_indexer(keys)
+        decisions = self.decisions[CHECK_COLUMN].to_numpy(dtype=object)
+        found = positions >= 0
+        values = np.full(len(df_results), None, dtype=object)
+        values[found] = decisions[positions[found]]
+        return pd.Series(values, index=df_results.index, name=CHECK_COLUMN)
+
+    def record(self, checked_df: pd.DataFrame) -> int:
+        """
+        確認済みの行の確認結果を記録する。同じ組織ペアの以前の記録は置き換える。
+
+        指紋の列がない行や、確認列が "⚪︎" と "-" 以外の行は記録しない。
+
+        Args:
+            checked_df (pd.DataFrame): 組織ペア・指紋・確認の列を持つデータフレーム。
+
+        Returns:
+            int: 記録した件数。
+        """
+        if not set(KEY_COLUMNS) <= set(checked_df.columns):
+            return 0
+        rows = checked_df[KEY_COLUMNS + [CHECK_COLUMN]].dropna()
+        rows = rows[rows[CHECK_COLUMN].isin(CHECK_VALUES)].drop_duplicates(
+            [cst.PREV_ORG, cst.CURR_ORG], keep="last"
+        )
+        rows = rows.astype(object).assign(
+            **{REVIEWED_AT: datetime.now().isoformat(timespec="seconds")}
+        )
+        self.decisions = pd.concat(
+            [self.decisions.astype(object), rows], ignore_index=True
+        ).drop_duplicates([cst.PREV_ORG, cst.CURR_ORG], keep="last")
+        self.decisions = self.decisions.reset_index(drop=True)
+        return len(rows)
+
+    def save(self, file_path: str) -> None:
+        """
+        確認結果をファイルに保存する。
+
+        書き込み途中で中断しても前回のファイルが壊れないよう、
+        一時ファイルに書いてから置き換える。
+
+        Args:
+            file_path (str): 保存先のファイルパス。
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = file_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(
+                {"version": REVIEW_STORE_VERSION, "decisions": self.decisions},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReviewStore":
+        """
+        ファイルから確認結果を読み込む。
+
+        Args:
+            file_path (str): 確認結果のファイルパス。
+
+        Returns:
+            ReviewStore: 読み込んだ確認結果。ファイルがない場合や
+                保存形式が異なる場合は空。
+        """
+        if not os.path.exists(file_path):
+            return cls()
+        with open(file_path, "rb") as file:
+            data = pickle.load(file)
+        if data.get("version") != REVIEW_STORE_VERSION:
+            return cls()
+        return cls(data["decisions"])
+
+
+def apply_prior_decisions(df_results: pd.DataFrame, store: ReviewStore) -> np.ndarray:  # noqa: E501
+    """
+    所属内容が変わっていない組織ペアに前回の確認結果を反映する関数。
+
+    前回 "⚪︎" と確認されたペアは、確認済みのワークブックを反映する場合と
+    同じ手順で確定にする。前回 "-" と確認されたペアは判定を変えない。
+
+    Args:
+        df_results (pd.DataFrame): 指紋の列を持つ組織ペアの結果。
+        store (ReviewStore): 過去の確認結果。
+
+    Returns:
+        np.ndarray: 前回の確認結果がある行でTrueとなる配列。未確定シートから除く行。
+    """
+    prior = store.find_prior_decisions(df_results)
+    reviewed = prior.notna().to_numpy()
+    confirmed_pairs = df_results.loc[
+        (prior == CHECK_CONFIRMED).to_numpy(), [cst.PREV_ORG, cst.CURR_ORG]
+    ]
+    if len(confirmed_pairs):
+        results_store = ResultsStore(df_results)
+        results_store.apply_confirmations(confirmed_pairs)
+        results_store.to_frame()
+    return reviewed
@@ -0,0 +1,161 @@
+"""
+処理の段階ごとの実行時間・メモリ使用量・件数を記録し、JSONの実行レポートとして出力するモジュール。
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windowsにはresourceモジュールがない
+    resource = None
+
+
+def get_report_path(workbook_path: str) -> str:
+    """
+    出力ワークブックと同じ場所に置く実行レポートのパスを返す関数。
+
+    Args:
+        workbook_path (str): 出力ワークブックのパス。
+
+    Returns:
+        str: 実行レポートのパス（拡張子を .report.json に置き換えたもの）。
+    """
+    return os.path.splitext(workbook_path)[0] + ".report.json"
+
+
+class RunReport:
+    """
+    処理の段階ごとの計測値を記録するクラス。
+
+    無効な場合、stageは何もしないコンテキストを返すため、計測のコストはかからない。
+    メモリ使用量は段階終了時点のプロセスの最大常駐メモリ（peak_rss_mb）を記録する。
+    trace_memoryを有効にすると、tracemallocでPythonのメモリ確保を追跡し、
+    段階ごとの最大値（peak_memory_mb）も記録する。追跡中は処理が数倍遅くなり、
+    並列処理のワーカープロセス内の確保は含まない。
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        """
+        コンストラクタ。
+
+        Args:
+            enabled (bool): 計測を行うかどうか。
+            trace_memory (bool): 段階ごとの最大メモリ使用量をtracemallocで計測するかどうか。
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.counters = {}
+        self._stack = []
+
+    def stage(self, name: str, **fields):
+        """
+        段階の計測を行うコンテキストを返す。
+
+        コンテキストが返す辞書に "rows" などの値を設定すると、段階の記録に追加される。
+
+        Args:
+            name (str): 段階の名前。
+            **fields: 段階の記録に追加する値。
+
+        Returns:
+            ContextManager[dict]: 段階の記録の辞書を返すコンテキスト。
+        """
+        if not self.enabled:
+            return nullcontext({})
+        return self._measure(name, fields)
+
+    @contextmanager
+    def _measure(self, name: str, fields: dict):
+        """
+        段階の実行時間と最大メモリ使用量を計測する。
+
+        Args:
+            name (str): 段階の名前。
+            fields (dict): 段階の記録に追加する値。
+
+        Yields:
+            dict: 段階の記録。
+        """
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        record = {"stage": name, "depth": len(self._stack), **fields}
+        self.stages.append(record)
+        # 内側の段階が最大値をリセットしても外側の最大値を失わないよう、
+        # 内側の最大値を外側に引き継ぐ
+        frame = {"peak": 0}
+        self._stack.append(frame)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if resource is not None:
+                # Linuxのru_maxrssはKB単位
+                record["peak_rss_mb"] = (
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                )
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+                record["peak_memory_mb"] = peak / (1 << 20)
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)  # noqa: E501
+            if started_tracing:
+                tracemalloc.stop()
+
+    def add_counters(self, counters: dict) -> None:
+        """
+        件数などの集計値を加算する。
+
+        Args:
+            counters (dict): 集計値の名前と値の辞書。
+        """
+        if not self.enabled:
+            return
+        for name, value in counters.items():
+            # 件数は加算し、再現率などの比率は最新の値で上書きする
+            if isinstance(value, int) and not isinstance(value, bool):
+                self.counters[name] = self.counters.get(name, 0) + value
+            else:
+                self.counters[name] = value
+
+    def to_dict(self) -> dict:
+        """
+        実行レポートを辞書に変換する。
+
+        Returns:
+            dict: 実行レポート。
+        """
+        return {
+            "started_at": self.started_at,
+            "python": platform.python_version(),
+            "stages": self.stages,
+            "counters": self.counters,
+        }
+
+    def write(self, file_path: str) -> None:
+        """
+        実行レポートをJSONファイルに書き出す。無効な場合は何もしない。
+
+        Args:
+            file_path (str): 書き出し先のパス。
+        """
+        if not self.enabled:
+            return
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+# 計測しない場合に使う共通のインスタンス
+DISABLED_REPORT = RunReport(enabled=False)
@@ -0,0 +1,153 @@
+"""
+組織ペアの結果を前月組織の範囲ごとのパーティションとしてディスクに保存するモジュール。
+
+結果全体がメモリに収まらない場合に使う。パーティションはParquet形式で、
+組織名の列は共有する組織名辞書のコードとして保存する。
+"""
+
+import os
+from collections.abc import Iterator
+
+import constants as cst
+import numpy as np
+import pandas as pd
+
+# 組織名をコードで保存する列
+ORG_COLUMNS = [cst.PREV_ORG, cst.CURR_ORG]
+
+
+class SpilledResults:
+    """
+    ディスクに保存した組織ペアの結果のパーティションを管理するクラス。
+
+    パーティションは前月組織IDの昇順に並び、順に連結すると
+    メモリ上で計算した結果と同じ並びになる。
+    """
+
+    def __init__(self, directory: str, org_dtype: pd.CategoricalDtype):
+        """
+        コンストラクタ。
+
+        Args:
+            directory (str): パーティションを保存するディレクトリ。
+            org_dtype (pd.CategoricalDtype): 前月・当月で共有する組織名の辞書。
+        """
+        self.directory = directory
+        self.org_dtype = org_dtype
+        self.partition_files = []
+        self.n_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        """
+        保存した行数を返す。
+
+        Returns:
+            int: 全パーティションの行数の合計。
+        """
+        return self.n_rows
+
+    def append_partition(self, df_partition: pd.DataFrame) -> None:
+        """
+        パーティションを1つ追加して保存する。
+
+        Args:
+            df_partition (pd.DataFrame): 組織ペアの結果の一部。
+        """
+        file_path = os.path.join(
+            self.directory, f"part-{len(self.partition_files):05d}.parquet"
+        )
+        self.partition_files.append(file_path)
+        self.n_rows += len(df_partition)
+        self.write_partition(len(self.partition_files) - 1, df_partition)
+
+    def write_partition(self, number: int, df_partition: pd.DataFrame) -> None:  # noqa: E501
+        """
+        パーティションを上書き保存する。
+
+        Args:
+            number (int): パーティションの番号。
+            df_partition (pd.DataFrame): 組織ペアの結果の一部。
+        """
+        df_partition = df_partition.copy()
+        for column in ORG_COLUMNS:
+            df_partition[column] = (
+                df_partition[column].astype(self.org_dtype).cat.codes.astype(np.int32)  # noqa: E501
+            )
+        df_partition.to_parquet(self.partition_files[number], index=False)
+
+    def read_partition(self, number: int, columns: list[str] = None) -> pd.DataFrame:  # noqa: E501
+        """
+        パーティションを読み込む。
+
+        Args:
+            number (int): パーティションの番号。
+            columns (list[str], optional): 読み込む列名のリスト。省略時は全列。
+
+        Returns:
+            pd.DataFrame: 組織名の列をカテゴリ型に戻したデータフレーム。
+        """
+        df_partition = pd.read_parquet(self.partition_files[number], columns=columns)  # noqa: E501
+        for column in ORG_COLUMNS:
+            if column in df_partition.columns:
+                df_partition[column] = pd.Categorical.from_codes(
+                    df_partition[column].to_numpy(), dtype=self.org_dtype
+                )
+        return df_partition
+
+    def iter_partitions(self, columns: list[str] = None) -> Iterator[pd.DataFrame]:  # noqa: E501
+        """
+        パーティションを順に読み込む。
+
+        Args:
+            columns (list[str], optional): 読み込む列名のリスト。省略時は全列。
+
+        Yields:
+            pd.DataFrame: パーティションのデータフレーム。
+        """
+        for number in range(len(self.partition_files)):
+            yield self.read_partition(number, columns)
+
+    def read_rows(self, mask_column: str, value: bool = True) -> pd.DataFrame:
+        """
+        指定した列の値が一致する行だけを全パーティションから読み込む。
+
+        Args:
+            mask_column (str): 真偽値の列名。
+            value (bool): 取り出す値。
+
+        Returns:
+            pd.DataFrame: 該当する行のデータフレーム。
+        """
+        return _concat_partitions(
+            df_partition[df_partition[mask_column] == value]
+            for df_partition in self.iter_partitions()
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        全パーティションを1つのデータフレームにまとめる。メモリに収まる場合の確認用。
+
+        Returns:
+            pd.DataFrame: 組織ペアの結果。
+        """
+        return _concat_partitions(self.iter_partitions())
+
+
+def _concat_partitions(partitions: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """
+    パーティションを連結する関数。
+
+    空のパーティションは文字列の列の型が定まらないため、行のあるものだけを連結する。
+
+    Args:
+        partitions (Iterator[pd.DataFrame]): パーティションのデータフレーム。
+
+    Returns:
+        pd.DataFrame: 連結したデータフレーム。
+    """
+    frames = list(partitions)
+    if not frames:
+        return pd.DataFrame()
+    non_empty = [df_partition for df_partition in frames if len(df_partition)]  # noqa: E501
+    return pd.concat(non_empty or frames[:1], ignore_index=True)
@@ -0,0 +1,272 @@
+"""
+人事データのファイルを分割して読み込み、所属インデックスへ順に取り込むモジュール。
+
+CSV・Parquet・Excelに対応する。ファイル全体をデータフレームとして
+保持せず、一定行数ずつ読み込んで所属インデックスに追加するため、
+メモリ使用量は分割の行数と組織・ユーザー数で決まる。
+"""
+
+import os
+from collections.abc import Iterator
+
+import constants as cst
+import pandas as pd
+from membership_index import MembershipIndexBuilder, OrgMembershipIndex
+from openpyxl import load_workbook
+
+# 一度に読み込む行数の既定値
+DEFAULT_CHUNK_ROWS = 100_000
+
+# 所属インデックスの作成に使う列
+MEMBERSHIP_COLUMNS = [cst.ORG, cst.USER, cst.TYPE]
+
+# Excelのセルで欠損値として扱う文字列（pd.read_excelの既定のna_valuesと同じ）
+EXCEL_NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+def iter_table_chunks(
+    file_path: str,
+    columns: list[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sheet_name: str = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    CSV・Parquet・Excelファイルを一定行数ずつ読み込む関数。
+
+    Excelはシートの1行目を列名として扱い、pd.read_excelと同じく末尾の空の行を除いて
+    欠損値の文字列を欠損値にする。
+
+    Args:
+        file_path (str): 読み込むファイルのパス。
+        columns (list[str], optional): 読み込む列名のリスト。
+            ファイルにない列は無視する。省略時は全列。
+        chunk_rows (int): 一度に読み込む行数。
+        sheet_name (str, optional): Excelのシート名。省略時は最初のシート。
+
+    Yields:
+        pd.DataFrame: 読み込んだ行のデータフレーム。
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        yield from _iter_csv_chunks(file_path, columns, chunk_rows)
+    elif extension == ".parquet":
+        yield from _iter_parquet_chunks(file_path, columns, chunk_rows)
+    elif extension in (".xlsx", ".xlsm"):
+        yield from _iter_excel_chunks(file_path, columns, chunk_rows, sheet_name)  # noqa: E501
+    else:
+        raise ValueError(f"対応していないファイル形式です: {file_path}")
+
+
+def _iter_csv_chunks(
+    file_path: str, columns: list[str], chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    CSVファイルを一定行数ずつ読み込む。
+
+    Args:
+        file_path (str): CSVファイルのパス。
+        columns (list[str]): 読み込む列名のリスト。Noneなら全列。
+        chunk_rows (int): 一度に読み込む行数。
+
+    Yields:
+        pd.DataFrame: 読み込んだ行のデータフレーム。
+    """
+    usecols = None if columns is None else (lambda column: column in columns)
+    with pd.read_csv(file_path, usecols=usecols, chunksize=chunk_rows) as reader:  # noqa: E501
+        yield from reader
+
+
+def _iter_parquet_chunks(
+    file_path: str, columns: list[str], chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Parquetファイルを一定行数ずつ読み込む。pyarrowが必要。
+
+    Args:
+        file_path (str): Parquetファイルのパス。
+        columns (list[str]): 読み込む列名のリスト。Noneなら全列。
+        chunk_rows (int): 一度に読み込む行数。
+
+    Yields:
+        pd.DataFrame: 読み込んだ行のデータフレーム。
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    if columns is not None:
+        columns = [
+            column for column in columns if column in parquet_file.schema_arrow.names  # noqa: E501
+        ]
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):  # noqa: E501
+        yield batch.to_pandas()
+
+
+def _iter_excel_chunks(
+    file_path: str, columns: list[str], chunk_rows: int, sheet_name: str = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Excelファイルを読み取り専用モードで一定行数ずつ読み込む。
+
+    pd.read_excelと同じく、末尾の空の行（書式だけが残った行など）は読み込まず、
+    EXCEL_NA_VALUESの文字列は欠損値にする。途中の空の行は欠損値の行として残す。
+    データフレームのインデックスはシート上の行番号（見出しが1行目）とする。
+    データの行がない場合は見出しの列だけを持つ空のデータフレームを1つ返す。
+
+    Args:
+        file_path (str): Excelファイルのパス。
+        columns (list[str]): 読み込む列名のリスト。Noneなら全列。
+        chunk_rows (int): 一度に読み込む行数。
+        sheet_name (str, optional): シート名。Noneなら最初のシート。
+
+    Yields:
+        pd.DataFrame: 読み込んだ行のデータフレーム。
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = (
+            workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]  # noqa: E501
+        )
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = [
+            i
+            for i, name in enumerate(header)
+            if name is not None and (columns is None or name in columns)
+        ]
+        names = [header[i] for i in positions]
+
+        buffer = []
+        row_numbers = []
+        # 空の行は後にデータの行が続く場合だけ残すため、行番号を保留しておく
+        pending_empty = []
+        yielded = False
+        for row_number, row in enumerate(rows, start=2):
+            if all(value is None or value == "" for value in row):
+                pending_empty.append(row_number)
+                continue
+            for empty_row_number in pending_empty:
+                buffer.append([None] * len(positions))
+                row_numbers.append(empty_row_number)
+            pending_empty = []
+            buffer.append([_excel_value(row, i) for i in positions])
+            row_numbers.append(row_number)
+            while len(buffer) >= chunk_rows:
+                yield pd.DataFrame(
+                    buffer[:chunk_rows], columns=names, index=row_numbers[:chunk_rows]  # noqa: E501
+                )
+                yielded = True
+                buffer = buffer[chunk_rows:]
+                row_numbers = row_numbers[chunk_rows:]
+        if buffer or not yielded:
+            yield pd.DataFrame(buffer, columns=names, index=row_numbers)
+    finally:
+        workbook.close()
+
+
+def _excel_value(row: tuple, position: int):
+    """
+    Excelの行から1つのセルの値を取り出すヘルパー関数。
+
+    Args:
+        row (tuple): セルの値のタプル。
+        position (int): 列の位置。
+
+    Returns:
+        セルの値。列がない場合やEXCEL_NA_VALUESの文字列の場合はNone。
+    """
+    value = row[position] if position < len(row) else None
+    if isinstance(value, str) and value in EXCEL_NA_VALUES:
+        return None
+    return value
+
+
+def read_table(
+    file_path: str,
+    columns: list[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sheet_name: str = None,
+) -> pd.DataFrame:
+    """
+    CSV・Parquet・Excelファイルを分割して読み込み、1つのデータフレームにする関数。
+
+    Args:
+        file_path (str): 読み込むファイルのパス。
+        columns (list[str], optional): 読み込む列名のリスト。省略時は全列。
+        chunk_rows (int): 一度に読み込む行数。
+        sheet_name (str, optional): Excelのシート名。省略時は最初のシート。
+
+    Returns:
+        pd.DataFrame: 読み込んだデータフレーム。
+    """
+    chunks = list(iter_table_chunks(file_path, columns, chunk_rows, sheet_name))  # noqa: E501
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def build_membership_index_from_file(
+    file_path: str,
+    user_ids: dict = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> OrgMembershipIndex:
+    """
+    ファイルを分割して読み込みながら所属インデックスを作成する関数。
+
+    Args:
+        file_path (str): 組織・ユーザー・区分の列を持つファイルのパス。
+        user_ids (dict, optional): 前月と当月で共有するユーザーIDのマッピング。
+        chunk_rows (int): 一度に読み込む行数。
+
+    Returns:
+        OrgMembershipIndex: 所属インデックス。
+    """
+    builder = MembershipIndexBuilder(user_ids)
+    for chunk in iter_table_chunks(file_path, MEMBERSHIP_COLUMNS, chunk_rows):
+        builder.add_chunk(chunk)
+    return builder.build()
+
+
+def build_membership_indexes_from_files(
+    file_path_A: str,
+    file_path_B: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> tuple[OrgMembershipIndex, OrgMembershipIndex]:
+    """
+    前月と当月のファイルからユーザーIDを共有して所属インデックスを作成する関数。
+
+    Args:
+        file_path_A (str): 前月組織データのファイルパス。
+        file_path_B (str): 当月組織データのファイルパス。
+        chunk_rows (int): 一度に読み込む行数。
+
+    Returns:
+        tuple[OrgMembershipIndex, OrgMembershipIndex]: 前月と当月の所属インデックス。
+    """
+    user_ids = {}
+    index_A = build_membership_index_from_file(file_path_A, user_ids, chunk_rows)  # noqa: E501
+    index_B = build_membership_index_from_file(file_path_B, user_ids, chunk_rows)  # noqa: E501
+    return index_A, index_B
@@ -0,0 +1,217 @@
+"""
+組織マッチングの検証とベンチマーク用に、架空の組織データを生成するモジュール。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+
+# 雇用区分ごとの構成比
+EMPLOYEE_TYPE_WEIGHTS = {
+    cst.FULL_TIME: 0.7,
+    cst.PART_TIME: 0.2,
+    cst.CONTRACT_EMPLOYEE: 0.1,
+}
+
+
+def generate_org_tree(
+    n_orgs: int, depth: int, fan_out: int, rng: np.random.Generator
+) -> list[str]:
+    """
+    組織階層の組織名を生成する関数。
+
+    組織数がn_orgsに達するまで、最上位組織とその配下の組織を追加する。
+
+    Args:
+        n_orgs (int): 生成する組織数の目安。
+        depth (int): 階層の深さ。
+        fan_out (int): 1組織あたりの子組織数の上限。
+        rng (np.random.Generator): 乱数生成器。
+
+    Returns:
+        list[str]: 「部/課/係」のようにスラッシュで区切った組織名のリスト。
+    """
+    orgs = []
+    department = 0
+    while len(orgs) < n_orgs:
+        level = [f"部{department}"]
+        department += 1
+        for rank in range(1, depth + 1):
+            orgs.extend(level)
+            if rank == depth:
+                break
+            level = [
+                f"{parent}/{rank + 1}階層{i}"
+                for parent in level
+                for i in range(rng.integers(1, fan_out + 1))
+            ]
+    return orgs
+
+
+def generate_month(
+    n_users: int,
+    depth: int = 3,
+    fan_out: int = 4,
+    org_size: int = 20,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    1か月分の組織所属データを生成する関数。
+
+    ユーザーは下位の組織ほど多く所属するように割り当てる。
+
+    Args:
+        n_users (int): ユーザー数。
+        depth (int): 階層の深さ。
+        fan_out (int): 1組織あたりの子組織数の上限。
+        org_size (int): 1組織あたりの直接所属人数の目安。
+        seed (int): 乱数シード。
+
+    Returns:
+        pd.DataFrame: org, user, type の列を持つデータフレーム。
+    """
+    rng = np.random.default_rng(seed)
+    orgs = generate_org_tree(max(1, n_users // org_size), depth, fan_out, rng)
+    orgs = np.array(orgs, dtype=object)
+    ranks = np.array([org.count("/") + 1 for org in orgs])
+    weights = ranks.astype(float) ** 2
+    org_choice = rng.choice(len(orgs), size=n_users, p=weights / weights.sum())
+    types = rng.choice(
+        list(EMPLOYEE_TYPE_WEIGHTS),
+        size=n_users,
+        p=list(EMPLOYEE_TYPE_WEIGHTS.values()),
+    )
+    return pd.DataFrame(
+        {
+            cst.ORG: orgs[org_choice],
+            cst.USER: [f"u{i}" for i in range(n_users)],
+            cst.TYPE: types,
+        }
+    )
+
+
+def rename_org(df: pd.DataFrame, old: str, new: str) -> pd.DataFrame:
+    """
+    組織名を変更する関数。配下の組織名も合わせて変更する。
+
+    Args:
+        df (pd.DataFrame): 組織所属データ。
+        old (str): 変更前の組織名。
+        new (str): 変更後の組織名。
+
+    Returns:
+        pd.DataFrame: 変更後の組織所属データ。
+    """
+    df = df.copy()
+    orgs = df[cst.ORG]
+    target = (orgs == old) | orgs.str.startswith(old + "/")
+    df.loc[target, cst.ORG] = new + orgs[target].str.slice(len(old))
+    return df
+
+
+def simulate_next_month(
+    df: pd.DataFrame,
+    churn: float = 0.05,
+    renames: int = 2,
+    splits: int = 1,
+    merges: int = 1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    前月データから組織改編と異動を加えた翌月のデータを生成する関数。
+
+    Args:
+        df (pd.DataFrame): 前月の組織所属データ。
+        churn (float): 異動・退職・入社するユーザーの割合。
+        renames (int): 名称変更する組織の数。
+        splits (int): 分割する組織の数。
+        merges (int): 統合する組織の数。
+        seed (int): 乱数シード。
+
+    Returns:
+        pd.DataFrame: 翌月の組織所属データ。
+    """
+    rng = np.random.default_rng(seed)
+    df = df.copy().reset_index(drop=True)
+    n_changes = int(len(df) * churn)
+
+    # 異動
+    movers = rng.choice(len(df), size=n_changes, replace=False)
+    df.loc[movers, cst.ORG] = rng.choice(df[cst.ORG].unique(), size=n_changes)  # noqa: E501
+
+    # 退職と入社
+    leavers = rng.choice(len(df), size=n_changes // 2, replace=False)
+    df = df.drop(index=leavers)
+    start = len(df) + len(leavers)
+    joiners = pd.DataFrame(
+        {
+            cst.ORG: rng.choice(df[cst.ORG].unique(), size=n_changes // 2),
+            cst.USER: [f"u{start + i}" for i in range(n_changes // 2)],
+            cst.TYPE: rng.choice(
+                list(EMPLOYEE_TYPE_WEIGHTS),
+                size=n_changes // 2,
+                p=list(EMPLOYEE_TYPE_WEIGHTS.values()),
+            ),
+        }
+    )
+    df = pd.concat([df, joiners], ignore_index=True)
+
+    # 分割：所属ユーザーの半数を新しい兄弟組織へ移す
+    for i in range(splits):
+        org = rng.choice(df[cst.ORG].unique())
+        members = df.index[df[cst.ORG] == org]
+        moved = members[rng.random(len(members)) < 0.5]
+        df.loc[moved, cst.ORG] = f"{org}分割{i}"
+
+    # 統合：兄弟組織の所属ユーザーをもう一方へ移す
+    for _ in range(merges):
+        orgs = pd.Series(df[cst.ORG].unique())
+        parents = orgs.str.rpartition("/")[0]
+        siblings = orgs.groupby(parents).filter(lambda group: len(group) > 1)
+        if siblings.empty:
+            break
+        parent = rng.choice(parents[siblings.index].unique())
+        absorbed, survivor = orgs[parents == parent].iloc[:2]
+        df = rename_org(df, absorbed, survivor)
+
+    # 名称変更
+    for i in range(renames):
+        org = rng.choice(df[cst.ORG].unique())
+        parent, _, name = org.rpartition("/")
+        new_name = f"{name}改{i}"
+        df = rename_org(df, org, f"{parent}/{new_name}" if parent else new_name)  # noqa: E501
+
+    return df.reset_index(drop=True)
+
+
+def generate_month_pair(
+    n_users: int,
+    depth: int = 3,
+    fan_out: int = 4,
+    org_size: int = 20,
+    churn: float = 0.05,
+    renames: int = 2,
+    splits: int = 1,
+    merges: int = 1,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    前月と当月の組織所属データを生成する関数。
+
+    Args:
+        n_users (int): 前月のユーザー数。
+        depth (int): 階層の深さ。
+        fan_out (int): 1組織あたりの子組織数の上限。
+        org_size (int): 1組織あたりの直接所属人数の目安。
+        churn (float): 異動・退職・入社するユーザーの割合。
+        renames (int): 名称変更する組織の数。
+        splits (int): 分割する組織の数。
+        merges (int): 統合する組織の数。
+        seed (int): 乱数シード。
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: 前月と当月の組織所属データ。
+    """
+    df_A = generate_month(n_users, depth, fan_out, org_size, seed)
+    df_B = simulate_next_month(df_A, churn, renames, splits, merges, seed + 1)
+    return df_A, df_B
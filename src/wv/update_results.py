@@ -2,59 +2,46 @@
 結果を更新するモジュール。
 """
 
-import constants as constants
 import pandas as pd
+from confirmation_journal import ConfirmationJournal
+from results_store import ResultsStore
 
 
 def update_results_with_confirmation(
-    df_results: pd.DataFrame, checked_df: pd.DataFrame
+    df_results: pd.DataFrame,
+    checked_df: pd.DataFrame,
+    journal: ConfirmationJournal = None,
 ) -> pd.DataFrame:
     """
     チェックされたデータフレームに基づいてresultsを更新する関数。
 
+    確認された組織ペアごとに結果全体を走査する代わりに、組織名の索引を持つ
+    ResultsStoreで該当する組織の行だけを更新する。更新は次の順に行う。
+
+    1. 確認された前月組織または当月組織を含む行を未確定にし、同一組織もFalseにする。
+    2. 確認された組織ペアと一致する行を確定にし、同一組織をTrueにする。
+    3. 2の時点で確定している行と前月組織または当月組織が同じ行を確定にする。
+
     Args:
         df_results (pd.DataFrame): 結果データフレーム。
         checked_df (pd.DataFrame): チェック済みのデータフレーム。
+        journal (ConfirmationJournal, optional): 確認結果を追記するジャーナル。
+            指定した場合は更新する前に確認結果を1つのバッチとして追記する。
+            直前のバッチと確認結果が同じ場合は、df_resultsをジャーナルから
+            再構築した状態とみなして更新しない。
 
     Returns:
         pd.DataFrame: 更新された結果データフレーム。
     """
+    # 同じワークブックを再度チェックした場合は、確認結果を二重に適用しない
+    if journal is not None and journal.append(checked_df) is None:
+        return df_results
+
     # 確認列が "⚪︎" の行を取得
     confirmed_rows = checked_df[checked_df["確認"] == "⚪︎"]
 
-    # 既存の確定データを一旦未確定にして同一組織もFalseにする（確認が "⚪︎" になった組織のみ）
-    for _, row in confirmed_rows.iterrows():
-        prev_org = row[constants.PREV_ORG]
-        curr_org = row[constants.CURR_ORG]
-
-        # 該当する組織ペアを未確定にして同一組織をFalseに設定
-        df_results.loc[
-            (df_results[constants.PREV_ORG] == prev_org)
-            | (df_results[constants.CURR_ORG] == curr_org),
-            [constants.SAME_ORG, constants.CONFIRMED],
-        ] = False
-
-    # confirmed_rowsの同一組織と判定された組織ペアをresultsに反映
-    for _, row in confirmed_rows.iterrows():
-        prev_org = row[constants.PREV_ORG]
-        curr_org = row[constants.CURR_ORG]
-
-        # 該当する組織ペアを確定と同一組織に設定
-        df_results.loc[
-            (df_results[constants.PREV_ORG] == prev_org)
-            & (df_results[constants.CURR_ORG] == curr_org),
-            [constants.SAME_ORG, constants.CONFIRMED],
-        ] = True
-
-    # 同名組織の確定を再度行う
-    for i, row in df_results.iterrows():
-        if row[constants.CONFIRMED]:
-            prev_org = row[constants.PREV_ORG]
-            curr_org = row[constants.CURR_ORG]
-            df_results.loc[
-                (df_results[constants.PREV_ORG] == prev_org)
-                | (df_results[constants.CURR_ORG] == curr_org),
-                constants.CONFIRMED,
-            ] = True
-
-    return df_results
+    store = ResultsStore(df_results)
+    store.apply_confirmations(confirmed_rows)
+    if journal is not None:
+        journal.maybe_checkpoint(store)
+    return store.to_frame()
@@ -2,9 +2,10 @@
 ユーティリティ関数を提供するモジュール。
 """
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 import constants as constants
+import numpy as np
 import pandas as pd
 
 
@@ -47,26 +48,103 @@ def build_org_user_set(
     return org_users
 
 
-# 社員と派遣社員の比率を計算する関数
-def calculate_employee_ratio(info):
+# 組織に現れる区分の一覧を作成する関数
+def collect_categories(
+    org_users_list: list[dict], column: str = constants.TYPE
+) -> list:
     """
-    社員と派遣社員、契約社員の比率を計算する関数。
+    組織の情報に現れる区分の一覧を作成する関数。
+
+    既定の雇用区分を先頭に置き、それ以外の区分は出現順に追加する。
+
+    Args:
+        org_users_list (list[dict]): 組織とユーザーのマッピングのリスト。
+        column (str): 区分を表す列名。
+
+    Returns:
+        list: 区分のリスト。
+    """
+    categories = dict.fromkeys(constants.EMPLOYEE_TYPES)
+    for org_users in org_users_list:
+        for data in org_users.values():
+            for value in data["info"][column]:
+                if isinstance(value, str):
+                    categories.setdefault(value)
+    return list(categories)
+
+
+# 組織ごとの区分別人数ベクトルを作成する関数
+def build_composition_vectors(
+    org_users: dict, categories: list, column: str = constants.TYPE
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    組織ごとの区分別人数を一度だけ数えて行列にする関数。
+
+    Args:
+        org_users (dict): 組織とユーザーのマッピング。
+        categories (list): 区分のリスト。列の並びになる。
+        column (str): 区分を表す列名。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 組織×区分の人数行列と、組織ごとの
+            総数（区分に含まれない値も数える）の配列。
+    """
+    category_index = {category: i for i, category in enumerate(categories)}
+    counts = np.zeros((len(org_users), len(categories)), dtype=np.int64)
+    totals = np.zeros(len(org_users), dtype=np.int64)
+    for row, data in enumerate(org_users.values()):
+        values = data["info"][column]
+        totals[row] = len(values)
+        for value, count in Counter(values).items():
+            if value in category_index:
+                counts[row, category_index[value]] = count
+    return counts, totals
+
+
+# 区分別人数から構成比を計算する関数
+def calculate_composition_ratios(
+    counts: np.ndarray, totals: np.ndarray
+) -> np.ndarray:
+    """
+    区分別人数の行列を構成比の行列に変換する関数。
 
     Args:
-        info (defaultdict): 組織の情報。
+        counts (np.ndarray): 組織×区分の人数行列。
+        totals (np.ndarray): 組織ごとの総数の配列。
 
     Returns:
-        dict: 社員、派遣社員、契約社員の比率。
+        np.ndarray: 組織×区分の構成比行列。総数が0の組織は0とする。
     """
-    total = len(info[constants.TYPE])
-    full_time = info[constants.TYPE].count(constants.FULL_TIME)
-    part_time = info[constants.TYPE].count(constants.PART_TIME)
-    contract_employee = info[constants.TYPE].count(constants.CONTRACT_EMPLOYEE)
-    return {
-        "full_time_ratio": full_time / total if total > 0 else 0,
-        "part_time_ratio": part_time / total if total > 0 else 0,
-        "contract_employee_ratio": contract_employee / total if total > 0 else 0,  # noqa: E501
-    }
+    ratios = np.zeros(counts.shape, dtype=np.float64)
+    nonzero = totals > 0
+    ratios[nonzero] = counts[nonzero] / totals[nonzero, np.newaxis]
+    return ratios
+
+
+# 前月と当月の組織の構成比を共通の区分で計算する関数
+def build_composition_ratios(
+    org_users_A: dict, org_users_B: dict, column: str = constants.TYPE
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    前月と当月の組織ごとの構成比を共通の区分の並びで計算する関数。
+
+    Args:
+        org_users_A (dict): 前月組織とユーザーのマッピング。
+        org_users_B (dict): 当月組織とユーザーのマッピング。
+        column (str): 区分を表す列名。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 前月と当月の組織×区分の構成比行列。
+            行はそれぞれのマッピングの挿入順に並ぶ。
+    """
+    categories = collect_categories([org_users_A, org_users_B], column)
+    ratios_A = calculate_composition_ratios(
+        *build_composition_vectors(org_users_A, categories, column)
+    )
+    ratios_B = calculate_composition_ratios(
+        *build_composition_vectors(org_users_B, categories, column)
+    )
+    return ratios_A, ratios_B
 
 
 # 組織の構成比率の差を計算する関数
@@ -74,21 +152,24 @@ def calculate_ratio_difference(ratio_a, ratio_b):
     """
     構成比の違いを計算する関数。
 
+    最後の軸を区分とみなすため、組織ペアごとの構成比を行に並べた行列を渡せば
+    全ペア分をまとめて計算できる。
+
     Args:
-        ratio_a (dict): 比率A。
-        ratio_b (dict): 比率B。
+        ratio_a (np.ndarray): 比率A。
+        ratio_b (np.ndarray): 比率B。
 
     Returns:
-        float: 構成比の違い。
+        float | np.ndarray: 構成比の違い。
     """
-    full_time_diff = abs(ratio_a["full_time_ratio"] - ratio_b["full_time_ratio"])  # noqa: E501
-    part_time_diff = abs(ratio_a["part_time_ratio"] - ratio_b["part_time_ratio"])  # noqa: E501
-    contract_employee_diff = abs(
-        ratio_a["contract_employee_ratio"] - ratio_b["contract_employee_ratio"]
-    )
+    diffs = np.abs(np.asarray(ratio_a) - np.asarray(ratio_b))
 
     # 各比率の差の平均を計算し、100から引いて100%表記の似ている度合いを示す
-    avg_diff = (full_time_diff + part_time_diff + contract_employee_diff) / 3
+    # 区分の順に足し合わせ、従来の計算と同じ丸め結果にする
+    total_diff = diffs[..., 0]
+    for i in range(1, diffs.shape[-1]):
+        total_diff = total_diff + diffs[..., i]
+    avg_diff = total_diff / diffs.shape[-1]
     similarity_percentage = 1 - avg_diff
     return similarity_percentage
 
@@ -0,0 +1,13 @@
+"""
+テスト共通の設定。
+
+src/wv のモジュールは同じディレクトリからの絶対インポートで互いを参照するため、
+テストからも同じ方法でインポートできるようにパスを追加する。
+"""
+
+import os
+import sys
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "wv")  # noqa: E501
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
@@ -0,0 +1,176 @@
+"""
+confirmation_journal による確認結果の追記と、チェックポイントからの再構築のテスト。
+"""
+
+import json
+import os
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from confirmation_journal import ConfirmationJournal
+from update_results import update_results_with_confirmation
+
+
+def make_results(rng: np.random.Generator, n_rows: int, n_orgs: int) -> pd.DataFrame:  # noqa: E501
+    """
+    ランダムな結果のスナップショットを作成する。
+
+    Args:
+        rng (np.random.Generator): 乱数生成器。
+        n_rows (int): 結果の行数。
+        n_orgs (int): 組織の種類数。
+
+    Returns:
+        pd.DataFrame: 結果データフレーム。
+    """
+    orgs = np.array([f"組織{i}" for i in range(n_orgs)], dtype=object)
+    return pd.DataFrame(
+        {
+            cst.PREV_ORG: orgs[rng.integers(0, n_orgs, n_rows)],
+            cst.CURR_ORG: orgs[rng.integers(0, n_orgs, n_rows)],
+            cst.SAME_ORG: rng.random(n_rows) < 0.3,
+            cst.CONFIRMED: rng.random(n_rows) < 0.1,
+        }
+    )
+
+
+def make_checked(rng: np.random.Generator, df_results: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+    """
+    結果の一部の行を確認したチェック済みのデータフレームを作成する。
+
+    Args:
+        rng (np.random.Generator): 乱数生成器。
+        df_results (pd.DataFrame): 結果データフレーム。
+
+    Returns:
+        pd.DataFrame: チェック済みのデータフレーム。
+    """
+    checked_df = df_results.sample(
+        5, random_state=int(rng.integers(1 << 30))
+    )[[cst.PREV_ORG, cst.CURR_ORG]].reset_index(drop=True)
+    checked_df.insert(0, "確認", rng.choice(["⚪︎", "-"], len(checked_df)))
+    return checked_df
+
+
+def test_replay_matches_sequential_updates(tmp_path):
+    """
+    チェックポイントをまたいで再構築した状態は、確認結果を順に適用した状態と一致する。
+    """
+    rng = np.random.default_rng(0)
+    snapshot = make_results(rng, 200, 30)
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    expected = snapshot.copy()
+    for _ in range(7):
+        checked_df = make_checked(rng, snapshot)
+        journal = ConfirmationJournal(journal_path, checkpoint_interval=3)
+        current = journal.replay(snapshot.copy())
+        expected = update_results_with_confirmation(expected, checked_df)
+        current = update_results_with_confirmation(current, checked_df, journal)  # noqa: E501
+        pd.testing.assert_frame_equal(current, expected)
+
+    assert os.path.exists(journal_path + ".checkpoint")
+    replayed = ConfirmationJournal(journal_path, checkpoint_interval=3).replay(
+        snapshot.copy()
+    )
+    pd.testing.assert_frame_equal(replayed, expected)
+
+
+def test_same_workbook_is_appended_once(tmp_path):
+    """
+    同じ確認結果を再度チェックしても追記せず、結果も二重に更新しない。
+    """
+    rng = np.random.default_rng(1)
+    snapshot = make_results(rng, 100, 20)
+    checked_df = make_checked(rng, snapshot)
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    journal = ConfirmationJournal(journal_path, checkpoint_interval=1)
+    first = update_results_with_confirmation(
+        journal.replay(snapshot.copy()), checked_df, journal
+    )
+
+    journal = ConfirmationJournal(journal_path, checkpoint_interval=1)
+    assert journal.append(checked_df) is None
+    second = update_results_with_confirmation(
+        journal.replay(snapshot.copy()), checked_df, journal
+    )
+    assert journal.next_batch == 1
+    pd.testing.assert_frame_equal(second, first)
+    with open(journal_path, "rb") as file:
+        assert len(file.readlines()) == 1
+
+
+def test_reverting_to_an_earlier_workbook_is_applied(tmp_path):
+    """
+    A、B、Aの順に確認した場合、2回目のAは元に戻す確認として追記して適用する。
+    """
+    rng = np.random.default_rng(3)
+    snapshot = make_results(rng, 100, 20)
+    workbook_a = make_checked(rng, snapshot).assign(確認="⚪︎")
+    workbook_b = make_checked(rng, snapshot).assign(確認="⚪︎")
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    expected = snapshot.copy()
+    for checked_df in [workbook_a, workbook_b, workbook_a]:
+        journal = ConfirmationJournal(journal_path, checkpoint_interval=2)
+        current = journal.replay(snapshot.copy())
+        assert journal.append(checked_df) is not None
+        expected = update_results_with_confirmation(expected, checked_df)
+
+    assert journal.next_batch == 3
+    replayed = ConfirmationJournal(journal_path).replay(snapshot.copy())
+    pd.testing.assert_frame_equal(replayed, expected)
+    assert not current.equals(expected)
+
+
+def test_only_confirmed_pairs_are_recorded(tmp_path):
+    """
+    ジャーナルには "⚪︎" と確認した組織ペアだけを記録する。
+    """
+    rng = np.random.default_rng(4)
+    snapshot = make_results(rng, 100, 20)
+    checked_df = make_checked(rng, snapshot)
+    checked_df["確認"] = ["⚪︎", "-", "-", "⚪︎", "-"]
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    ConfirmationJournal(journal_path).append(checked_df)
+    with open(journal_path, encoding="utf-8") as file:
+        entry = json.loads(file.readline())
+    assert "rejected" not in entry
+    assert entry["confirmed"] == (
+        checked_df.loc[[0, 3], [cst.PREV_ORG, cst.CURR_ORG]].values.tolist()
+    )
+
+
+def test_checkpoint_is_ignored_when_journal_is_replaced(tmp_path):
+    """
+    チェックポイントの位置までの内容が異なるジャーナルに置き換えられた場合は、
+    チェックポイントを使わずに先頭から再構築する。
+    """
+    rng = np.random.default_rng(2)
+    snapshot = make_results(rng, 100, 20)
+    batches = [make_checked(rng, snapshot) for _ in range(2)]
+    journal_path = str(tmp_path / "journal.jsonl")
+    other_path = str(tmp_path / "other.jsonl")
+
+    journal = ConfirmationJournal(journal_path, checkpoint_interval=2)
+    journal.replay(snapshot.copy())
+    for checked_df in batches:
+        journal.append(checked_df)
+    journal.replay(snapshot.copy())
+    assert os.path.exists(journal_path + ".checkpoint")
+
+    # 同じ確認結果を逆の順に追記した、同じ長さで内容が異なるジャーナルに置き換える
+    other = ConfirmationJournal(other_path)
+    for checked_df in reversed(batches):
+        other.append(checked_df)
+    assert os.path.getsize(other_path) == os.path.getsize(journal_path)
+    os.replace(other_path, journal_path)
+
+    expected = snapshot.copy()
+    for checked_df in reversed(batches):
+        expected = update_results_with_confirmation(expected, checked_df)
+    replayed = ConfirmationJournal(journal_path).replay(snapshot.copy())
+    pd.testing.assert_frame_equal(replayed, expected)
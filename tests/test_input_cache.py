@@ -0,0 +1,36 @@
+"""
+input_cache のキャッシュ経由の読み込みが元ファイルの読み込みと同じ結果になることのテスト。
+"""
+
+import os
+
+import pandas as pd
+from input_cache import CACHE_DIR_NAME, read_excel_cached
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+
+def test_cached_read_matches_source_without_trailing_empty_rows(tmp_path):
+    """
+    初回とキャッシュ利用時で同じ内容になり、末尾の空の行や欠損値の文字列は
+    pd.read_excelと同じく扱われる。
+    """
+    file_path = tmp_path / "input.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "未確定"
+    ws.append(["確認", "前月の組織", "当月の組織"])
+    ws.append(["⚪︎", "a", "x"])
+    ws.append(["-", "NA", "y"])
+    for row in range(4, 7):
+        ws.cell(row, 1).font = Font(bold=True)
+    wb.save(file_path)
+
+    expected = pd.read_excel(file_path, sheet_name="未確定")
+    first = read_excel_cached(str(file_path), sheet_name="未確定")
+    assert os.listdir(tmp_path / CACHE_DIR_NAME)
+    second = read_excel_cached(str(file_path), sheet_name="未確定")
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(first) == len(expected) == 2
+    assert first["前月の組織"].isna().tolist() == [False, True]
@@ -0,0 +1,132 @@
+"""
+integrity_check の違反の検出のテスト。
+"""
+
+import pandas as pd
+import pytest
+from integrity_check import (
+    CHECK_COLUMNS,
+    IntegrityError,
+    check_results_integrity,
+    find_integrity_violations,
+)
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+HEADER = ["確認", "前月の組織", "当月の組織"]
+
+
+def write_sheet(file_path, rows, formatted_rows: int = 0) -> str:
+    """
+    未確定シートに行を書き込み、末尾に書式だけの空の行を加えたワークブックを保存する。
+
+    Args:
+        file_path: 保存先のパス。
+        rows (list[list]): 見出しを含む行のリスト。
+        formatted_rows (int): 末尾に加える書式だけの行数。
+
+    Returns:
+        str: 保存したファイルのパス。
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "未確定"
+    for row in rows:
+        ws.append(row)
+    for number in range(formatted_rows):
+        ws.cell(len(rows) + number + 1, 1).font = Font(bold=True)
+        ws.cell(len(rows) + number + 1, 2).value = ""
+    wb.save(file_path)
+    return str(file_path)
+
+
+def test_trailing_formatted_rows_are_ignored(tmp_path):
+    """
+    末尾の書式だけの空の行は違反にならない。
+    """
+    file_path = write_sheet(
+        tmp_path / "checked.xlsx",
+        [HEADER, ["⚪︎", "a", "x"], ["-", "b", "y"]],
+        formatted_rows=3,
+    )
+    df = check_results_integrity(file_path)
+    assert len(df) == 2
+
+
+def test_violations_report_sheet_row_numbers(tmp_path):
+    """
+    違反は複数のチャンクにまたがってもExcel上の行番号で報告する。
+    """
+    file_path = write_sheet(
+        tmp_path / "checked.xlsx",
+        [
+            HEADER,
+            ["⚪︎", "a", "x"],
+            [None, None, None],
+            ["?", "b", "y"],
+            ["⚪︎", "a", "z"],
+        ],
+        formatted_rows=2,
+    )
+    _, violations = find_integrity_violations(file_path, chunk_rows=2)
+    assert [(v.row, v.column) for v in violations] == [
+        (2, "前月の組織"),
+        (3, "確認"),
+        (4, "確認"),
+        (5, "前月の組織"),
+    ]
+
+
+def test_header_only_sheet_without_check_column_is_rejected(tmp_path):
+    """
+    データの行がなく確認列もないシートは違反になる。
+    """
+    file_path = write_sheet(tmp_path / "checked.xlsx", [["前月の組織", "当月の組織"]])  # noqa: E501
+    with pytest.raises(IntegrityError) as error:
+        check_results_integrity(file_path)
+    assert error.value.violations[0].column == "確認"
+
+
+def test_header_only_sheet_with_check_column_is_accepted(tmp_path):
+    """
+    データの行がなくても確認列があれば違反にならない。
+    """
+    file_path = write_sheet(tmp_path / "checked.xlsx", [HEADER])
+    df = check_results_integrity(file_path)
+    assert df.empty
+    assert "確認" in df.columns
+
+
+def test_returns_the_whole_sheet_like_read_excel(tmp_path):
+    """
+    読み込む列を指定しない場合は、pd.read_excelで読み込んだシートと同じ列・型・値を返す。
+    """
+    file_path = write_sheet(
+        tmp_path / "checked.xlsx",
+        [
+            HEADER + ["前月の人数", "類似度指数", "備考"],
+            ["⚪︎", "a", "x", 3, 0.5, None],
+            ["-", "b", "y", 10, None, "メモ"],
+            ["-", "c", "z", None, 1.0, None],
+            ["⚪︎", "d", "w", 7, 0.25, None],
+        ],
+    )
+    expected = pd.read_excel(file_path, sheet_name="未確定")
+    pd.testing.assert_frame_equal(check_results_integrity(file_path), expected)
+    df, violations = find_integrity_violations(file_path, chunk_rows=1)
+    assert violations == []
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_columns_limit_the_returned_columns(tmp_path):
+    """
+    読み込む列を指定した場合は、指定した列のうちシートにある列と確認列だけを返す。
+    """
+    file_path = write_sheet(
+        tmp_path / "checked.xlsx",
+        [HEADER + ["備考"], ["⚪︎", "a", "x", "メモ"]],
+    )
+    df = check_results_integrity(file_path, columns=CHECK_COLUMNS)
+    assert list(df.columns) == HEADER
+    df = check_results_integrity(file_path, columns=["前月の組織"])
+    assert list(df.columns) == ["確認", "前月の組織"]
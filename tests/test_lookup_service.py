@@ -0,0 +1,48 @@
+"""
+lookup_service の再読み込みの制限とサンプルデータの扱いのテスト。
+"""
+
+import asyncio
+import json
+import sys
+
+import pytest
+from lookup_service import LookupService, RequestError
+from main import load_config
+
+
+def test_reload_rejects_client_file_paths():
+    """
+    /reload でファイルを指定しても読み込まず、400を返す。
+    """
+    service = LookupService(load_config())
+    body = json.dumps({"prev_file": "/etc/passwd", "curr_file": "/etc/hosts"})
+
+    with pytest.raises(RequestError) as error:
+        asyncio.run(service.handle_request("POST", "/reload", body.encode()))
+    assert error.value.status == 400
+    assert service.match_lookup is None
+
+
+def test_reload_uses_startup_files():
+    """
+    /reload は起動時のデータ（ここではサンプルデータ）から読み込み直す。
+    """
+    service = LookupService(load_config())
+
+    async def scenario():
+        await service.handle_request("POST", "/reload", b"")
+        return await service.handle_request("GET", "/prev?org=営業部", b"")
+
+    response = asyncio.run(scenario())
+    assert service.prev_file is None
+    assert response["org"] == "営業部"
+
+
+def test_importing_main_does_not_build_sample_frames():
+    """
+    mainをインポートしただけではサンプルのデータフレームを作成しない。
+    """
+    main = sys.modules["main"]
+    assert not hasattr(main, "df_A")
+    assert not hasattr(main, "df_B")
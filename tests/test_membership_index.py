@@ -0,0 +1,45 @@
+"""
+membership_index による所属インデックスの作成のテスト。
+"""
+
+import constants as cst
+import pandas as pd
+from membership_index import OrgMembershipIndex, build_membership_indexes
+
+
+def test_rows_with_missing_user_are_dropped():
+    """
+    ユーザーが欠損している行は、他のユーザーのIDとして取り込まれない。
+    """
+    df = pd.DataFrame(
+        {
+            cst.ORG: ["組織/x", "組織/x", "組織/y"],
+            cst.USER: ["u1", None, "u2"],
+            cst.TYPE: [cst.FULL_TIME, cst.FULL_TIME, cst.FULL_TIME],
+        }
+    )
+    index = OrgMembershipIndex.from_dataframe(df)
+    x = index.org_ids["組織/x"]
+    y = index.org_ids["組織/y"]
+
+    assert list(index.members(x)) == [index.user_ids["u1"]]
+    assert list(index.members(y)) == [index.user_ids["u2"]]
+    assert set(index.members(x)).isdisjoint(index.members(y))
+    assert index.row_counts[x] == 1
+    assert None not in index.user_ids
+
+
+def test_missing_users_do_not_create_overlap_between_months():
+    """
+    前月と当月の欠損ユーザー同士が同じユーザーとして重なりを作らない。
+    """
+    df_A = pd.DataFrame(
+        {cst.ORG: ["組織/x", "組織/x"], cst.USER: ["u1", None], cst.TYPE: [cst.FULL_TIME] * 2}  # noqa: E501
+    )
+    df_B = pd.DataFrame(
+        {cst.ORG: ["組織/y", "組織/y"], cst.USER: ["u2", None], cst.TYPE: [cst.FULL_TIME] * 2}  # noqa: E501
+    )
+    index_A, index_B = build_membership_indexes(df_A, df_B)
+    prev = index_A.members(index_A.org_ids["組織/x"])
+    curr = index_B.members(index_B.org_ids["組織/y"])
+    assert set(prev).isdisjoint(curr)
@@ -0,0 +1,143 @@
+"""
+org_assignment による1対1の割り当てと次点の計算のテスト。
+"""
+
+import copy
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from main import load_config
+from org_assignment import assign_one_to_one, build_assignment_columns
+from organization_processor import OrganizationProcessor
+
+
+def make_results(edges, same_org=None) -> pd.DataFrame:
+    """
+    (前月組織, 当月組織, 総合スコア) のリストから結果データフレームを作成する。
+
+    Args:
+        edges (list[tuple]): (前月組織, 当月組織, 総合スコア) のリスト。
+        same_org (list[bool], optional): 同一組織の列。省略時は全てTrue。
+
+    Returns:
+        pd.DataFrame: 結果データフレーム。
+    """
+    return pd.DataFrame(
+        {
+            cst.PREV_ORG: [prev for prev, _, _ in edges],
+            cst.CURR_ORG: [curr for _, curr, _ in edges],
+            cst.TOTAL_SCORE: [float(score) for _, _, score in edges],
+            cst.SAME_ORG: same_org or [True] * len(edges),
+        }
+    )
+
+
+def assigned_pairs(df_results: pd.DataFrame, assigned: np.ndarray) -> set:
+    """
+    割り当てられた組織ペアの集合を返す。
+
+    Args:
+        df_results (pd.DataFrame): 結果データフレーム。
+        assigned (np.ndarray): 割り当てられた行でTrueとなる配列。
+
+    Returns:
+        set: (前月組織, 当月組織) の集合。
+    """
+    rows = df_results[assigned]
+    return set(zip(rows[cst.PREV_ORG], rows[cst.CURR_ORG]))
+
+
+def test_assignment_maximizes_total_score():
+    """
+    スコアの高いペアから貪欲に選ぶのではなく、スコアの合計が最大の1対1の割り当てを選ぶ。
+    """
+    df_results = make_results(
+        [("a", "x", 10), ("a", "y", 9), ("b", "x", 9), ("b", "y", 1)]
+    )
+    assigned = assign_one_to_one(df_results)
+    assert assigned_pairs(df_results, assigned) == {("a", "y"), ("b", "x")}
+
+
+def test_prev_org_without_viable_curr_org_is_left_unassigned():
+    """
+    割り当てると合計が下がる前月組織は、ダミーの当月組織に回して割り当てない。
+    """
+    # b-xを割り当てるためにa-xをa-yに替えると合計は 1 + 8 < 10 になる
+    df_results = make_results([("a", "x", 10), ("a", "y", 1), ("b", "x", 8)])
+    assigned = assign_one_to_one(df_results)
+    assert assigned_pairs(df_results, assigned) == {("a", "x")}
+
+    # 当月組織を取り合う前月組織は、スコアの高い方だけが割り当てられる
+    df_results = make_results([("a", "x", 2), ("c", "x", 5)])
+    assigned = assign_one_to_one(df_results)
+    assert assigned_pairs(df_results, assigned) == {("c", "x")}
+
+
+def test_pairs_without_positive_score_are_not_assigned():
+    """
+    スコアが0以下のペアは、相手がいなくても割り当てない。
+    """
+    df_results = make_results([("a", "x", 0), ("b", "y", -1), ("c", "z", 3)])
+    assigned = assign_one_to_one(df_results)
+    assert assigned_pairs(df_results, assigned) == {("c", "z")}
+
+    component_ids = np.array([0, 1, 2])
+    assigned = assign_one_to_one(df_results, component_ids=component_ids)
+    assert assigned_pairs(df_results, assigned) == {("c", "z")}
+
+
+def test_single_pair_components_match_full_solve():
+    """
+    連結成分の番号を渡した場合も、渡さない場合と同じ割り当てになる。
+    """
+    df_results = make_results(
+        [("a", "x", 10), ("a", "y", 9), ("b", "x", 9), ("b", "y", 1), ("c", "z", 4)]  # noqa: E501
+    )
+    component_ids = np.array([0, 0, 0, 0, 1])
+    expected = assign_one_to_one(df_results)
+    actual = assign_one_to_one(df_results, component_ids=component_ids)
+    np.testing.assert_array_equal(actual, expected)
+    assert assigned_pairs(df_results, actual) == {("a", "y"), ("b", "x"), ("c", "z")}  # noqa: E501
+
+
+def test_runner_up_columns():
+    """
+    行ごとに、同じ組織の他のペアのうち最もスコアが高い相手とそのスコアを付ける。
+    """
+    df_results = make_results(
+        [("a", "x", 10), ("a", "y", 7), ("a", "z", 3), ("b", "y", 5)]
+    )
+    columns = build_assignment_columns(df_results)
+
+    # 前月組織aの最高スコアのペアの次点は2番目、それ以外のペアの次点は最高スコアのペア
+    assert columns[cst.PREV_RUNNER_UP].tolist()[:3] == ["y", "x", "x"]
+    assert columns[cst.PREV_RUNNER_UP_SCORE].tolist()[:3] == [7.0, 10.0, 10.0]
+    # 他のペアがない前月組織bには次点がない
+    assert pd.isna(columns[cst.PREV_RUNNER_UP].iloc[3])
+    assert pd.isna(columns[cst.PREV_RUNNER_UP_SCORE].iloc[3])
+    # 当月組織yは前月組織aとbの2つのペアを持つ
+    assert columns[cst.CURR_RUNNER_UP].iloc[1] == "b"
+    assert columns[cst.CURR_RUNNER_UP_SCORE].iloc[1] == 5.0
+    assert columns[cst.CURR_RUNNER_UP].iloc[3] == "a"
+    assert columns[cst.CURR_RUNNER_UP_SCORE].iloc[3] == 7.0
+    assert pd.isna(columns[cst.CURR_RUNNER_UP].iloc[0])
+    assert list(columns[cst.ASSIGNED]) == [True, False, False, True]
+
+
+def test_assignment_confirmation_mode():
+    """
+    割り当てられた同一組織のペアを確定し、確定した組織の同一組織でない他のペアも確定にする。
+    """
+    config = copy.deepcopy(load_config())
+    config["processing"]["confirmation"] = "assignment"
+    processor = OrganizationProcessor(config)
+    df_results = make_results(
+        [("a", "x", 10), ("a", "y", 9), ("b", "x", 9), ("a", "z", 2)],
+        same_org=[True, True, True, False],
+    )
+    df_results = processor.confirm_matches(df_results)
+
+    assert list(df_results[cst.ASSIGNED]) == [False, True, True, False]
+    # a-xは同一組織と判定されているため、競合する候補として未確定のまま残る
+    assert list(df_results[cst.CONFIRMED]) == [False, True, True, True]
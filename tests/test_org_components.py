@@ -0,0 +1,66 @@
+"""
+org_components による組織ペアのグラフの連結成分のテスト。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from org_components import label_components, label_pair_components
+
+
+def test_two_separate_clusters():
+    """
+    前月組織または当月組織を共有するペアは同じ成分になり、つながらないペアは別の成分になる。
+    成分の番号は行に初めて現れた順に振る。
+    """
+    df_results = pd.DataFrame(
+        {
+            cst.PREV_ORG: ["p", "q", "a", "q", "b", "r"],
+            cst.CURR_ORG: ["x", "y", "a", "x", "a", "z"],
+        }
+    )
+    component_ids = label_components(df_results)
+    # p-x、q-y、q-xは前月組織qと当月組織xでつながる。a-a、b-aは当月組織aでつながる
+    np.testing.assert_array_equal(component_ids, [0, 0, 1, 0, 1, 2])
+    assert component_ids.dtype == np.int64
+
+
+def test_prev_and_curr_orgs_with_the_same_name_are_different_vertices():
+    """
+    前月組織と当月組織の名前が同じでも、別の頂点として扱う。
+    """
+    df_results = pd.DataFrame(
+        {cst.PREV_ORG: ["a", "b"], cst.CURR_ORG: ["b", "c"]}
+    )
+    np.testing.assert_array_equal(label_components(df_results), [0, 1])
+
+
+def test_label_pair_components_matches_label_components():
+    """
+    組織コードから求めた成分番号は、組織名から求めた成分番号と一致する。
+    """
+    rng = np.random.default_rng(0)
+    df_results = pd.DataFrame(
+        {
+            cst.PREV_ORG: [f"p{i}" for i in rng.integers(0, 40, 60)],
+            cst.CURR_ORG: [f"c{i}" for i in rng.integers(0, 40, 60)],
+        }
+    )
+    prev_codes, prev_orgs = pd.factorize(df_results[cst.PREV_ORG])
+    curr_codes, curr_orgs = pd.factorize(df_results[cst.CURR_ORG])
+    component_ids = label_pair_components(
+        prev_codes, curr_codes, len(prev_orgs), len(curr_orgs)
+    )
+    np.testing.assert_array_equal(component_ids, label_components(df_results))
+    assert component_ids.max() + 1 == len(np.unique(component_ids))
+    # 同じ前月組織・当月組織の行は同じ成分になる
+    for column in [cst.PREV_ORG, cst.CURR_ORG]:
+        assert (pd.Series(component_ids).groupby(df_results[column]).nunique() == 1).all()  # noqa: E501
+
+
+def test_empty_results():
+    """
+    組織ペアがない場合は空の配列を返す。
+    """
+    df_results = pd.DataFrame({cst.PREV_ORG: [], cst.CURR_ORG: []})
+    assert len(label_components(df_results)) == 0
@@ -0,0 +1,149 @@
+"""
+OrganizationMatcher の配列演算によるスコア計算が、1行ずつの計算と一致することのテスト。
+"""
+
+import copy
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from main import load_config
+from membership_index import build_membership_indexes
+from organization_matcher import OrganizationMatcher
+from organization_processor import OrganizationProcessor
+from synthetic_data import generate_month_pair
+
+# スコアの計算に使う統計量の列
+STAT_COLUMNS = [
+    cst.PREV_ORG,
+    cst.CURR_ORG,
+    cst.PREV_SIZE,
+    cst.CURR_SIZE,
+    cst.SIMILARITY_INDEX,
+    cst.COMMON_RATIO,
+    cst.RANK_DIFF,
+]
+
+# スコアの列
+SCORE_COLUMNS = [
+    cst.RANK_SCORE,
+    cst.SIMILARITY_SCORE,
+    cst.MEMBER_SCORE,
+    cst.TOTAL_SCORE,
+    cst.APPLIED_RULE,
+    cst.SAME_ORG,
+]
+
+
+def score_row_by_row(matcher: OrganizationMatcher, df_pairs: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+    """
+    calculate_similarity_score_with_ratioで1行ずつスコアを計算する。
+
+    Args:
+        matcher (OrganizationMatcher): 判定クラス。
+        df_pairs (pd.DataFrame): 組織ペアの統計量データフレーム。
+
+    Returns:
+        pd.DataFrame: df_pairsと同じインデックスを持つスコアのデータフレーム。
+    """
+    rows = [
+        matcher.calculate_similarity_score_with_ratio(row)
+        for row in df_pairs.to_dict("records")
+    ]
+    return pd.DataFrame(rows, index=df_pairs.index, columns=SCORE_COLUMNS)
+
+
+def assert_scores_match(matcher: OrganizationMatcher, df_pairs: pd.DataFrame) -> pd.DataFrame:  # noqa: E501
+    """
+    配列演算と1行ずつの計算のスコアが、値・型・並びまで一致することを確認する。
+
+    Args:
+        matcher (OrganizationMatcher): 判定クラス。
+        df_pairs (pd.DataFrame): 組織ペアの統計量データフレーム。
+
+    Returns:
+        pd.DataFrame: 配列演算で計算したスコア。
+    """
+    expected = score_row_by_row(matcher, df_pairs)
+    actual = matcher.calculate_similarity_scores(df_pairs)
+    # 1行ずつの計算は整数と小数が混ざるため、配列演算の型にそろえて比べる
+    expected = expected.astype(actual.dtypes.to_dict())
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    return actual
+
+
+def make_boundary_pairs(config: dict) -> pd.DataFrame:
+    """
+    閾値の境界の人数・割合とランク差を組み合わせた統計量のテーブルを作成する。
+
+    Args:
+        config (dict): 設定辞書。
+
+    Returns:
+        pd.DataFrame: 組織ペアの統計量データフレーム。
+    """
+    thresholds = config["thresholds"]
+    sizes = sorted(
+        {0, 1, 2, 3}
+        | {t["size"] + offset for t in thresholds for offset in (-1, 0, 1)}
+    )
+    ratios = sorted(
+        {0.0, 1.0}
+        | {t["similarity_threshold"] for t in thresholds}
+        | {t["member_ratio_threshold"] for t in thresholds}
+    )
+    rows = []
+    for size_a in sizes:
+        for size_b in sizes:
+            for ratio in ratios:
+                for rank_diff in (-2, -1, 0, 1, 3):
+                    for same_name in (False, True):
+                        rows.append(
+                            {
+                                cst.PREV_ORG: "組織/a",
+                                cst.CURR_ORG: "組織/a" if same_name else "組織/b",  # noqa: E501
+                                cst.PREV_SIZE: size_a,
+                                cst.CURR_SIZE: size_b,
+                                cst.SIMILARITY_INDEX: ratio,
+                                cst.COMMON_RATIO: ratios[-1 - ratios.index(ratio)],  # noqa: E501
+                                cst.RANK_DIFF: rank_diff,
+                            }
+                        )
+    return pd.DataFrame(rows, columns=STAT_COLUMNS)
+
+
+def test_vector_scores_match_scalar_scores_on_threshold_boundaries():
+    """
+    人数が閾値と等しい場合や、割合が閾値と等しい場合も1行ずつの計算と一致する。
+    """
+    config = load_config()
+    matcher = OrganizationMatcher(config)
+    df_pairs = make_boundary_pairs(config)
+    sizes = {t["size"] for t in config["thresholds"]}
+    assert sizes <= set(df_pairs[cst.PREV_SIZE])
+
+    scores = assert_scores_match(matcher, df_pairs)
+    # 全ての閾値の区分が適用され、同一組織の判定が両方の値をとっている
+    comments = {t["comment"] for t in config["thresholds"]}
+    assert comments <= set(scores[cst.APPLIED_RULE])
+    assert scores[cst.SAME_ORG].any() and not scores[cst.SAME_ORG].all()
+
+
+def test_vector_scores_match_scalar_scores_on_synthetic_pairs():
+    """
+    合成した2か月分の所属データの組織ペアで、1行ずつの計算と一致する。
+    """
+    config = copy.deepcopy(load_config())
+    config["processing"]["keep_low_score_rows"] = True
+    df_A, df_B = generate_month_pair(3_000, seed=3)
+    index_A, index_B = build_membership_indexes(df_A, df_B)
+    processor = OrganizationProcessor(config)
+    df_pairs = processor.build_results(index_A, index_B)[STAT_COLUMNS]
+    # カテゴリ型の組織名と、文字列の組織名の両方で比べる
+    assert isinstance(df_pairs[cst.PREV_ORG].dtype, pd.CategoricalDtype)
+    df_pairs.index = np.arange(len(df_pairs))[::-1]
+
+    scores = assert_scores_match(processor.matcher, df_pairs)
+    assert_scores_match(processor.matcher, df_pairs.astype({cst.PREV_ORG: object, cst.CURR_ORG: object}))  # noqa: E501
+    assert len(set(scores[cst.APPLIED_RULE])) > 1
+    assert scores[cst.SAME_ORG].any()
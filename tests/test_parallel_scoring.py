@@ -0,0 +1,54 @@
+"""
+parallel_scoring による並列計算が、並列化しない計算と同じ結果になることのテスト。
+"""
+
+import copy
+
+import pandas as pd
+import pytest
+from main import load_config
+from membership_index import build_membership_indexes
+from organization_processor import OrganizationProcessor
+from parallel_scoring import SHARDS_PER_WORKER, split_prev_orgs
+from synthetic_data import generate_month_pair
+
+
+def calculate_results(df_A: pd.DataFrame, df_B: pd.DataFrame, **processing) -> tuple[pd.DataFrame, dict]:  # noqa: E501
+    """
+    処理の設定を上書きして組織ペアの結果を計算する。
+
+    Args:
+        df_A (pd.DataFrame): 前月組織データフレーム。
+        df_B (pd.DataFrame): 当月組織データフレーム。
+        **processing: 上書きするprocessingの設定。
+
+    Returns:
+        tuple[pd.DataFrame, dict]: 結果データフレームと集計値。
+    """
+    config = copy.deepcopy(load_config())
+    config["processing"].update(processing)
+    index_A, index_B = build_membership_indexes(df_A, df_B)
+    processor = OrganizationProcessor(config)
+    df_results = processor.calculate_and_update_index_scores(index_A, index_B)
+    return df_results, processor.stats
+
+
+@pytest.mark.parametrize("engine", ["python", "sparse"])
+@pytest.mark.parametrize("keep_low_score_rows", [False, True])
+def test_parallel_results_match_single_process(engine, keep_low_score_rows):
+    """
+    複数プロセスで計算した結果は、行の並び・値・型・集計値まで1プロセスの結果と一致する。
+    """
+    df_A, df_B = generate_month_pair(3_000, seed=5)
+    workers = 3
+    index_A, _ = build_membership_indexes(df_A, df_B)
+    assert len(split_prev_orgs(index_A.sizes, workers * SHARDS_PER_WORKER)) > 1
+
+    expected, expected_stats = calculate_results(
+        df_A, df_B, engine=engine, keep_low_score_rows=keep_low_score_rows, workers=1  # noqa: E501
+    )
+    actual, actual_stats = calculate_results(
+        df_A, df_B, engine=engine, keep_low_score_rows=keep_low_score_rows, workers=workers  # noqa: E501
+    )
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    assert actual_stats == expected_stats
@@ -0,0 +1,116 @@
+"""
+ResultsStore の確認結果の反映と確定の広がりのテスト。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+from results_store import ResultsStore
+
+
+def make_results(pairs, same_org=None, confirmed=None) -> pd.DataFrame:
+    """
+    組織ペアのリストから結果データフレームを作成する。
+
+    Args:
+        pairs (list[tuple]): (前月組織, 当月組織) のリスト。
+        same_org (list[bool], optional): 同一組織の列。省略時は全てFalse。
+        confirmed (list[bool], optional): 確定の列。省略時は全てFalse。
+
+    Returns:
+        pd.DataFrame: 結果データフレーム。
+    """
+    n_rows = len(pairs)
+    return pd.DataFrame(
+        {
+            cst.PREV_ORG: [prev for prev, _ in pairs],
+            cst.CURR_ORG: [curr for _, curr in pairs],
+            cst.SAME_ORG: same_org or [False] * n_rows,
+            cst.CONFIRMED: confirmed or [False] * n_rows,
+        }
+    )
+
+
+def confirmed_pairs(*pairs) -> pd.DataFrame:
+    """
+    確認された組織ペアのデータフレームを作成する。
+
+    Args:
+        *pairs (tuple): (前月組織, 当月組織)。
+
+    Returns:
+        pd.DataFrame: 前月組織と当月組織の列を持つデータフレーム。
+    """
+    return pd.DataFrame(list(pairs), columns=[cst.PREV_ORG, cst.CURR_ORG])
+
+
+def test_rejected_pair_is_not_a_cascade_source():
+    """
+    同一組織ではないと確定したペアから、後の一括反映で確定が広がらない。
+    """
+    store = ResultsStore(
+        make_results([("a", "x"), ("a", "y"), ("b", "x"), ("c", "z")])
+    )
+    store.reject("a", "x")
+    store.apply_confirmations(confirmed_pairs(("c", "z")))
+
+    assert store.confirmed.tolist() == [True, False, False, True]
+    assert store.same_org.tolist() == [False, False, False, True]
+
+
+def test_reject_withdraws_confirmation_cascaded_from_the_pair():
+    """
+    確定を取り消したペアから広がっていた確定は、他に広がりの元がなければ外れる。
+    """
+    store = ResultsStore(
+        make_results([("a", "x"), ("a", "y"), ("b", "x"), ("b", "y")])
+    )
+    store.confirm("a", "x")
+    assert store.confirmed.tolist() == [True, True, True, False]
+
+    updated = store.reject("a", "x")
+    assert updated.tolist() == [0, 1, 2]
+    assert store.confirmed.tolist() == [True, False, False, False]
+    assert store.same_org.tolist() == [False, False, False, False]
+
+
+def test_reject_keeps_cascade_from_other_confirmed_pairs():
+    """
+    同じ組織を持つ別の確定済みのペアがあれば、その確定の広がりは残る。
+    """
+    store = ResultsStore(
+        make_results([("a", "x"), ("a", "y"), ("b", "x"), ("b", "y")])
+    )
+    store.apply_confirmations(confirmed_pairs(("a", "x"), ("b", "y")))
+    store.reject("a", "x")
+
+    assert store.confirmed.tolist() == [True, True, True, True]
+    assert store.same_org.tolist() == [False, False, False, True]
+
+
+def test_single_confirm_matches_batch_on_affected_rows():
+    """
+    1件ずつのconfirmは、更新した行について一括反映と同じ値になる。
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n_rows = int(rng.integers(1, 60))
+        orgs = [f"o{i}" for i in range(int(rng.integers(1, 10)))]
+        pairs = [
+            (orgs[rng.integers(len(orgs))], orgs[rng.integers(len(orgs))])
+            for _ in range(n_rows)
+        ]
+        df_results = make_results(
+            pairs,
+            (rng.random(n_rows) < 0.3).tolist(),
+            (rng.random(n_rows) < 0.2).tolist(),
+        )
+        prev_org, curr_org = pairs[rng.integers(n_rows)]
+
+        single = ResultsStore(df_results.copy())
+        affected = single.confirm(prev_org, curr_org)
+        batch = ResultsStore(df_results.copy())
+        batch.apply_confirmations(confirmed_pairs((prev_org, curr_org)))
+
+        assert (single.confirmed[affected] == batch.confirmed[affected]).all()
+        assert (single.same_org[affected] == batch.same_org[affected]).all()
@@ -0,0 +1,72 @@
+"""
+review_store による前回の確認結果の再利用と、その出力のテスト。
+"""
+
+import constants as cst
+import pandas as pd
+from export_to_excel import export_to_excel
+from integrity_check import check_results_integrity
+from main import load_config, load_sample_data
+from membership_index import build_membership_indexes
+from organization_processor import OrganizationProcessor
+from review_store import ReviewStore, add_pair_fingerprints, apply_prior_decisions  # noqa: E501
+
+
+def calculate_results(df_A: pd.DataFrame, df_B: pd.DataFrame) -> pd.DataFrame:
+    """
+    所属データから指紋の列を持つ組織ペアの結果を計算する。
+
+    Args:
+        df_A (pd.DataFrame): 前月組織データフレーム。
+        df_B (pd.DataFrame): 当月組織データフレーム。
+
+    Returns:
+        pd.DataFrame: 結果データフレーム。
+    """
+    index_A, index_B = build_membership_indexes(df_A, df_B)
+    processor = OrganizationProcessor(load_config())
+    df_results = processor.calculate_and_update_index_scores(index_A, index_B)
+    return add_pair_fingerprints(df_results, index_A, index_B)
+
+
+def review_all(file_path: str) -> None:
+    """
+    出力したワークブックの未確定シートの全ての行を "-" と確認したことにする。
+
+    Args:
+        file_path (str): ワークブックのパス。
+    """
+    sheets = pd.read_excel(file_path, sheet_name=None)
+    sheets["未確定"].insert(0, "確認", "-")
+    with pd.ExcelWriter(file_path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def test_reviewed_pairs_leave_only_the_unconfirmed_sheet(tmp_path):
+    """
+    確認済みで所属が変わっていないペアは未確定シートから除かれ、全体シートには残る。
+    """
+    df_A, df_B = load_sample_data()
+    first_path = str(tmp_path / "first.xlsx")
+    df_results = calculate_results(df_A, df_B)
+    export_to_excel(df_results, first_path)
+    review_all(first_path)
+
+    store = ReviewStore()
+    recorded = store.record(check_results_integrity(first_path))
+    assert recorded == int((~df_results[cst.CONFIRMED]).sum())
+
+    # 1人の所属だけを変えた翌月
+    df_B.loc[df_B[cst.USER] == "u13", cst.ORG] = "営業部"
+    df_next = calculate_results(df_A, df_B)
+    reviewed = apply_prior_decisions(df_next, store)
+    assert 0 < reviewed.sum() < len(df_next)
+
+    second_path = str(tmp_path / "second.xlsx")
+    export_to_excel(df_next, second_path, reviewed=reviewed)
+    sheets = pd.read_excel(second_path, sheet_name=None)
+    assert len(sheets["全体"]) == len(df_next)
+    expected = df_next[~df_next[cst.CONFIRMED].to_numpy(dtype=bool) & ~reviewed]  # noqa: E501
+    assert sheets["未確定"][cst.PREV_ORG].tolist() == expected[cst.PREV_ORG].astype(str).tolist()  # noqa: E501
+    assert sheets["未確定"][cst.CURR_ORG].tolist() == expected[cst.CURR_ORG].astype(str).tolist()  # noqa: E501
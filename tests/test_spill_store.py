@@ -0,0 +1,47 @@
+"""
+結果をパーティションに書き出す計算と出力が、メモリ上の計算と出力と一致することのテスト。
+"""
+
+import copy
+import os
+
+import pandas as pd
+from export_to_excel import export_partitions_to_excel, export_to_excel
+from main import load_config
+from membership_index import build_membership_indexes
+from organization_processor import OrganizationProcessor
+from synthetic_data import generate_month_pair
+
+
+def test_spilled_results_match_in_memory_results(tmp_path):
+    """
+    パーティションに書き出した結果を連結すると、メモリ上で計算した結果と同じ組織ペア・
+    値・並びになり、出力したワークブックの全てのシートの行も一致する。
+    """
+    df_A, df_B = generate_month_pair(3_000, seed=7)
+    config = copy.deepcopy(load_config())
+    index_A, index_B = build_membership_indexes(df_A, df_B)
+    expected = OrganizationProcessor(config).calculate_and_update_index_scores(
+        index_A, index_B
+    )
+
+    spill_dir = str(tmp_path / "spill")
+    config["processing"]["spill_dir"] = spill_dir
+    config["processing"]["spill_partitions"] = 4
+    processor = OrganizationProcessor(config)
+    spilled = processor.calculate_and_spill_index_scores(index_A, index_B)
+
+    assert len(spilled.partition_files) > 1
+    assert all(os.path.dirname(path) == spill_dir for path in spilled.partition_files)  # noqa: E501
+    pd.testing.assert_frame_equal(spilled.to_frame(), expected, check_exact=True)  # noqa: E501
+
+    memory_path = str(tmp_path / "memory.xlsx")
+    spilled_path = str(tmp_path / "spilled.xlsx")
+    export_to_excel(expected, memory_path)
+    export_partitions_to_excel(spilled.iter_partitions, spilled_path)
+    memory_sheets = pd.read_excel(memory_path, sheet_name=None)
+    spilled_sheets = pd.read_excel(spilled_path, sheet_name=None)
+    assert list(spilled_sheets) == list(memory_sheets)
+    for name, df_sheet in memory_sheets.items():
+        assert len(df_sheet) > 0
+        pd.testing.assert_frame_equal(spilled_sheets[name], df_sheet, check_exact=True)  # noqa: E501
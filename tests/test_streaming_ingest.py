@@ -0,0 +1,90 @@
+"""
+streaming_ingest のExcel読み込みが pd.read_excel と同じ行と値を返すことのテスト。
+"""
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from streaming_ingest import iter_table_chunks, read_table
+
+
+def write_workbook(file_path, rows, formatted_rows: int = 0) -> None:
+    """
+    1枚目のシートに行を書き込み、末尾に書式だけの空の行を加えたワークブックを保存する。
+
+    Args:
+        file_path: 保存先のパス。
+        rows (list[list]): 見出しを含む行のリスト。
+        formatted_rows (int): 末尾に加える書式だけの行数。
+    """
+    wb = Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    for number in range(formatted_rows):
+        ws.cell(len(rows) + number + 1, 1).font = Font(bold=True)
+    wb.save(file_path)
+
+
+def to_records(df: pd.DataFrame) -> list[list]:
+    """
+    欠損値をNoneにそろえた行のリストに変換する。
+
+    Args:
+        df (pd.DataFrame): データフレーム。
+
+    Returns:
+        list[list]: 行のリスト。
+    """
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+def test_trailing_empty_rows_and_na_strings_match_read_excel(tmp_path):
+    """
+    末尾の空の行は除き、途中の空の行は残し、欠損値の文字列は欠損値にする。
+    """
+    file_path = tmp_path / "input.xlsx"
+    write_workbook(
+        file_path,
+        [
+            ["確認", "前月の組織", "当月の組織"],
+            ["⚪︎", "a", "NA"],
+            [None, None, None],
+            ["-", "N/A", "b"],
+            [None, "", None],
+        ],
+        formatted_rows=3,
+    )
+    expected = pd.read_excel(file_path)
+    actual = read_table(str(file_path), chunk_rows=1)
+    assert list(actual.columns) == list(expected.columns)
+    assert to_records(actual) == to_records(expected)
+    assert to_records(actual) == [
+        ["⚪︎", "a", None],
+        [None, None, None],
+        ["-", None, "b"],
+    ]
+
+
+def test_chunk_index_is_sheet_row_number(tmp_path):
+    """
+    データフレームのインデックスはシート上の行番号になる。
+    """
+    file_path = tmp_path / "input.xlsx"
+    write_workbook(
+        file_path, [["org", "user"], ["a", "u1"], [None, None], ["b", "u2"]]
+    )
+    chunks = list(iter_table_chunks(str(file_path), chunk_rows=2))
+    assert [chunk.index.tolist() for chunk in chunks] == [[2, 3], [4]]
+
+
+def test_header_only_sheet_returns_header_columns(tmp_path):
+    """
+    データの行がないシートは見出しの列を持つ空のデータフレームになる。
+    """
+    file_path = tmp_path / "input.xlsx"
+    write_workbook(file_path, [["org", "user", "type"]], formatted_rows=2)
+    chunks = list(iter_table_chunks(str(file_path), ["org", "user"]))
+    assert len(chunks) == 1
+    assert list(chunks[0].columns) == ["org", "user"]
+    assert chunks[0].empty
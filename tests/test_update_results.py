@@ -0,0 +1,183 @@
+"""
+update_results_with_confirmation が元のiterrowsによる実装と同じ結果になることのテスト。
+"""
+
+import constants as cst
+import numpy as np
+import pandas as pd
+import pytest
+from update_results import update_results_with_confirmation
+
+
+def reference_update_results(
+    df_results: pd.DataFrame, checked_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    書き換える前のupdate_results_with_confirmationの実装。比較の基準に使う。
+
+    Args:
+        df_results (pd.DataFrame): 結果データフレーム。
+        checked_df (pd.DataFrame): チェック済みのデータフレーム。
+
+    Returns:
+        pd.DataFrame: 更新された結果データフレーム。
+    """
+    confirmed_rows = checked_df[checked_df["確認"] == "⚪︎"]
+
+    for _, row in confirmed_rows.iterrows():
+        prev_org = row[cst.PREV_ORG]
+        curr_org = row[cst.CURR_ORG]
+        df_results.loc[
+            (df_results[cst.PREV_ORG] == prev_org)
+            | (df_results[cst.CURR_ORG] == curr_org),
+            [cst.SAME_ORG, cst.CONFIRMED],
+        ] = False
+
+    for _, row in confirmed_rows.iterrows():
+        prev_org = row[cst.PREV_ORG]
+        curr_org = row[cst.CURR_ORG]
+        df_results.loc[
+            (df_results[cst.PREV_ORG] == prev_org)
+            & (df_results[cst.CURR_ORG] == curr_org),
+            [cst.SAME_ORG, cst.CONFIRMED],
+        ] = True
+
+    for _, row in df_results.iterrows():
+        if row[cst.CONFIRMED]:
+            prev_org = row[cst.PREV_ORG]
+            curr_org = row[cst.CURR_ORG]
+            df_results.loc[
+                (df_results[cst.PREV_ORG] == prev_org)
+                | (df_results[cst.CURR_ORG] == curr_org),
+                cst.CONFIRMED,
+            ] = True
+
+    return df_results
+
+
+def make_case(
+    rng: np.random.Generator, n_rows: int, n_orgs: int, categorical: bool, missing: bool  # noqa: E501
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    ランダムな結果データフレームとチェック済みのデータフレームを作成する。
+
+    チェック済みのデータフレームには、結果にある組織ペア、結果にない組織、
+    欠損値の組織、"⚪︎" 以外の確認値を含める。
+
+    Args:
+        rng (np.random.Generator): 乱数生成器。
+        n_rows (int): 結果の行数。
+        n_orgs (int): 組織の種類数。
+        categorical (bool): 組織の列をカテゴリ型にする場合はTrue。
+        missing (bool): 組織の列に欠損値を含める場合はTrue。
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: 結果とチェック済みのデータフレーム。
+    """
+    orgs = np.array([f"組織{i}" for i in range(n_orgs)], dtype=object)
+    prev = orgs[rng.integers(0, n_orgs, n_rows)]
+    curr = orgs[rng.integers(0, n_orgs, n_rows)]
+    if missing:
+        prev[rng.random(n_rows) < 0.05] = None
+        curr[rng.random(n_rows) < 0.05] = None
+    df_results = pd.DataFrame(
+        {
+            cst.PREV_ORG: prev,
+            cst.CURR_ORG: curr,
+            cst.TOTAL_SCORE: rng.random(n_rows),
+            cst.SAME_ORG: rng.random(n_rows) < 0.3,
+            cst.CONFIRMED: rng.random(n_rows) < 0.2,
+        }
+    )
+    if rng.random() < 0.5:
+        # 結果の行番号が連番でない場合も確認する
+        df_results.index = rng.permutation(n_rows)
+    if categorical:
+        dtype = pd.CategoricalDtype(orgs)
+        df_results[cst.PREV_ORG] = df_results[cst.PREV_ORG].astype(dtype)
+        df_results[cst.CURR_ORG] = df_results[cst.CURR_ORG].astype(dtype)
+
+    n_checked = max(1, n_rows // 10)
+    existing = (
+        df_results.sample(min(n_rows, n_checked), random_state=int(rng.integers(1 << 30)))  # noqa: E501
+        [[cst.PREV_ORG, cst.CURR_ORG]]
+        .astype(object)
+    )
+    unknown = pd.DataFrame(
+        {
+            cst.PREV_ORG: orgs[rng.integers(0, n_orgs, n_checked)],
+            cst.CURR_ORG: [f"新組織{i}" for i in range(n_checked)],
+        }
+    )
+    checked_df = pd.concat([existing, unknown], ignore_index=True)
+    checked_df.insert(
+        0, "確認", rng.choice(["⚪︎", "-"], len(checked_df), p=[0.7, 0.3])
+    )
+    if missing:
+        checked_df.loc[rng.random(len(checked_df)) < 0.1, cst.PREV_ORG] = None
+    return df_results, checked_df
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+@pytest.mark.parametrize("missing", [False, True])
+def test_matches_reference_on_random_frames(categorical, missing):
+    """
+    ランダムな結果に対して元の実装と同じ結果になる。
+    """
+    rng = np.random.default_rng(int(categorical) * 2 + int(missing))
+    for _ in range(40):
+        df_results, checked_df = make_case(
+            rng,
+            int(rng.integers(0, 150)),
+            int(rng.integers(1, 30)),
+            categorical,
+            missing,
+        )
+        expected = reference_update_results(df_results.copy(), checked_df)
+        actual = update_results_with_confirmation(df_results.copy(), checked_df)  # noqa: E501
+        pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_orgs_missing_from_results_are_ignored():
+    """
+    結果にない組織の確認は、その組織を含む行がないため何も変えない。
+    """
+    df_results = pd.DataFrame(
+        {
+            cst.PREV_ORG: ["a", "b"],
+            cst.CURR_ORG: ["x", "y"],
+            cst.SAME_ORG: [True, False],
+            cst.CONFIRMED: [True, False],
+        }
+    )
+    checked_df = pd.DataFrame(
+        {"確認": ["⚪︎"], cst.PREV_ORG: ["c"], cst.CURR_ORG: ["z"]}
+    )
+    expected = reference_update_results(df_results.copy(), checked_df)
+    actual = update_results_with_confirmation(df_results.copy(), checked_df)
+    pd.testing.assert_frame_equal(actual, expected)
+    pd.testing.assert_frame_equal(actual, df_results)
+
+
+def test_cascade_uses_snapshot_of_confirmed_rows():
+    """
+    確定の連鎖は確認を反映した時点で確定している行から1段だけ行う。
+
+    (a, x) の確定で (a, y) が確定になっても、(a, y) からさらに (b, y) へは連鎖しない。
+    """
+    df_results = pd.DataFrame(
+        {
+            cst.PREV_ORG: ["a", "a", "b", "c"],
+            cst.CURR_ORG: ["x", "y", "y", "z"],
+            cst.SAME_ORG: [False, False, False, False],
+            cst.CONFIRMED: [False, False, False, False],
+        }
+    )
+    checked_df = pd.DataFrame(
+        {"確認": ["⚪︎"], cst.PREV_ORG: ["a"], cst.CURR_ORG: ["x"]}
+    )
+    expected = reference_update_results(df_results.copy(), checked_df)
+    actual = update_results_with_confirmation(df_results.copy(), checked_df)
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual[cst.CONFIRMED].tolist() == [True, True, False, False]
+    assert actual[cst.SAME_ORG].tolist() == [True, False, False, False]